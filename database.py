@@ -1,8 +1,15 @@
+from collections import deque
 from dotenv import load_dotenv
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
 
 # Load environment variables
 load_dotenv()
@@ -18,11 +25,297 @@ print("======================================")
 if DATABASE_URL is None:
     raise ValueError("DATABASE_URL is not set in environment variables.")
 
-# Handle SQLite special case
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(DATABASE_URL)
+# Pool defaults per dialect; every value can be overridden with the env var of the same name.
+# MySQL closes idle connections after wait_timeout, so they are recycled well before that
+# and pinged on checkout.
+POOL_DEFAULTS = {
+    "default": {"DB_POOL_SIZE": 10, "DB_MAX_OVERFLOW": 20, "DB_POOL_RECYCLE": 1800, "DB_POOL_PRE_PING": True, "DB_POOL_TIMEOUT": 30},
+    "sqlite": {"DB_POOL_SIZE": 5, "DB_MAX_OVERFLOW": 10, "DB_POOL_RECYCLE": -1, "DB_POOL_PRE_PING": False, "DB_POOL_TIMEOUT": 30},
+}
+# sqlite only: queue (pool of connections, WAL lets readers run next to the writer),
+# static (one shared connection) or null (new connection per checkout)
+DB_SQLITE_POOL = os.getenv("DB_SQLITE_POOL", "queue").lower()
+# sqlite only: "production" applies the pragmas below on every new connection, "off" keeps sqlite defaults
+DB_SQLITE_PROFILE = os.getenv("DB_SQLITE_PROFILE", "production").lower()
+DB_SQLITE_SYNCHRONOUS = os.getenv("DB_SQLITE_SYNCHRONOUS", "NORMAL").upper()
+# ms a statement waits on a lock held by another connection / process before "database is locked"
+DB_SQLITE_BUSY_TIMEOUT = int(os.getenv("DB_SQLITE_BUSY_TIMEOUT", "15000"))
+# negative: KiB, so -65536 is a 64 MB page cache per connection
+DB_SQLITE_CACHE_SIZE = int(os.getenv("DB_SQLITE_CACHE_SIZE", "-65536"))
+DB_SQLITE_MMAP_SIZE = int(os.getenv("DB_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+# serialize write transactions of this process through SQLiteWriteQueue (reads are not queued)
+DB_SQLITE_WRITE_QUEUE = os.getenv("DB_SQLITE_WRITE_QUEUE", "true").lower() in ("1", "true", "yes")
+# checkout samples kept for the latency percentiles in /metrics/db-pool
+DB_POOL_METRICS_SAMPLES = int(os.getenv("DB_POOL_METRICS_SAMPLES", "1000"))
+
+
+def _pool_setting(dialect: str, name: str):
+    default = POOL_DEFAULTS.get(dialect, POOL_DEFAULTS["default"])[name]
+    raw = os.getenv(name)
+    if raw is None or raw == "":
+        return default
+    if isinstance(default, bool):
+        return raw.lower() in ("1", "true", "yes")
+    return int(raw)
+
+
+class PoolMetrics:
+    """Counters filled by the pool event listeners below (per process)."""
+
+    def __init__(self, samples: int = DB_POOL_METRICS_SAMPLES):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=samples)
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        # checkouts that found the pool exhausted and had to wait for a checkin
+        self.waits = 0
+        self.timeouts = 0
+        self.max_latency_ms = 0.0
+
+    def record_get(self, latency_ms: float, waited: bool, timed_out: bool = False) -> None:
+        with self._lock:
+            self._latencies.append(latency_ms)
+            self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+            if waited:
+                self.waits += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def increment(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = sorted(self._latencies)
+            counters = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+            }
+            max_latency = self.max_latency_ms
+
+        def percentile(p: float) -> float:
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))], 3) if samples else 0.0
+
+        counters["checkout_latency_ms"] = {
+            "samples": len(samples),
+            "avg": round(sum(samples) / len(samples), 3) if samples else 0.0,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": round(max_latency, 3),
+        }
+        return counters
+
+
+pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long getting a connection took and whether it had to wait."""
+
+    def _do_get(self):
+        # max_overflow -1 means unlimited: a new connection is opened instead of waiting
+        waited = self._max_overflow > -1 and self.checkedout() >= self.size() + self._max_overflow
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_get((time.perf_counter() - start) * 1000, True, timed_out=True)
+            raise
+        pool_metrics.record_get((time.perf_counter() - start) * 1000, waited)
+        return connection
+
+
+def _engine_options(url) -> dict:
+    dialect = url.get_backend_name()
+    if dialect == "sqlite":
+        options = {"connect_args": {"check_same_thread": False}}
+        if DB_SQLITE_PROFILE == "production":
+            # pysqlite's own busy handler, same as PRAGMA busy_timeout
+            options["connect_args"]["timeout"] = DB_SQLITE_BUSY_TIMEOUT / 1000
+        in_memory = url.database in (None, "", ":memory:")
+        if in_memory or DB_SQLITE_POOL == "static":
+            options["poolclass"] = StaticPool
+            return options
+        if DB_SQLITE_POOL == "null":
+            options["poolclass"] = NullPool
+            return options
+    else:
+        options = {}
+
+    options.update(
+        poolclass=TimedQueuePool,
+        pool_size=_pool_setting(dialect, "DB_POOL_SIZE"),
+        max_overflow=_pool_setting(dialect, "DB_MAX_OVERFLOW"),
+        pool_recycle=_pool_setting(dialect, "DB_POOL_RECYCLE"),
+        pool_pre_ping=_pool_setting(dialect, "DB_POOL_PRE_PING"),
+        pool_timeout=_pool_setting(dialect, "DB_POOL_TIMEOUT"),
+    )
+    return options
+
+
+class SQLiteWriteQueue:
+    """
+    Single writer slot for SQLite. A connection takes it right before its
+    first write statement and gives it back when it returns to the pool, so
+    write transactions of this process run one at a time in arrival order instead
+    of racing for SQLite's file lock (and failing with "database is locked"
+    once busy_timeout runs out). Reads never wait here; with WAL they run
+    next to the writer. The slot belongs to the connection, not the thread:
+    the request's session may be committed / closed on another worker
+    thread than the one that wrote.
+    """
+
+    def __init__(self, timeout: float):
+        self._lock = threading.Lock()
+        self._timeout = timeout
+        self._busy = False
+        # one event per waiting writer; release() hands the slot straight to the first one
+        self._waiters: "deque[threading.Event]" = deque()
+        self.transactions = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.max_wait_ms = 0.0
+
+    def acquire(self) -> None:
+        """Wait for the writer slot; raises TimeoutError after the busy timeout."""
+        start = time.perf_counter()
+        with self._lock:
+            if not self._busy:
+                self._busy = True
+                self.transactions += 1
+                return
+            turn = threading.Event()
+            self._waiters.append(turn)
+            self.waits += 1
+
+        if not turn.wait(self._timeout):
+            with self._lock:
+                if turn in self._waiters:
+                    self._waiters.remove(turn)
+                    self.timeouts += 1
+                    raise TimeoutError(f"SQLite writer queue: no write slot after {self._timeout:g}s")
+            # handed over between the timeout and taking the lock
+
+        with self._lock:
+            self.transactions += 1
+            self.max_wait_ms = max(self.max_wait_ms, (time.perf_counter() - start) * 1000)
+
+    def release(self) -> None:
+        with self._lock:
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self._busy = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "transactions": self.transactions,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "writing": self._busy,
+                "queued": len(self._waiters),
+                "max_wait_ms": round(self.max_wait_ms, 3),
+            }
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(make_url(DATABASE_URL)))
+
+_SQLITE_WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "ALTER", "DROP", "SAVEPOINT")
+# connection_record.info key set while the connection holds the writer slot
+_WRITER_KEY = "sqlite_writer"
+
+sqlite_write_queue: Optional[SQLiteWriteQueue] = None
+if engine.dialect.name == "sqlite" and DB_SQLITE_WRITE_QUEUE and not isinstance(engine.pool, StaticPool):
+    # a StaticPool shares one connection (and so one transaction) between all sessions: nothing to queue
+    sqlite_write_queue = SQLiteWriteQueue(timeout=DB_SQLITE_BUSY_TIMEOUT / 1000)
+
+
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    pool_metrics.increment("connects")
+    if engine.dialect.name == "sqlite" and DB_SQLITE_PROFILE == "production":
+        cursor = dbapi_connection.cursor()
+        # readers don't block the writer (and vice versa)
+        cursor.execute("PRAGMA journal_mode=WAL")
+        # with WAL, NORMAL only syncs at checkpoints: safe against corruption, a power cut may lose the last commits
+        cursor.execute(f"PRAGMA synchronous={DB_SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={DB_SQLITE_BUSY_TIMEOUT}")
+        cursor.execute(f"PRAGMA cache_size={DB_SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA mmap_size={DB_SQLITE_MMAP_SIZE}")
+        cursor.close()
+
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_metrics.increment("checkouts")
+
+
+@event.listens_for(engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    pool_metrics.increment("checkins")
+
+
+@event.listens_for(engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_metrics.increment("invalidations")
+
+
+if sqlite_write_queue is not None:
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _take_writer_slot(conn, cursor, statement, parameters, context, executemany):
+        if conn.info.get(_WRITER_KEY) or not statement.lstrip()[:9].upper().startswith(_SQLITE_WRITE_STATEMENTS):
+            return
+        try:
+            sqlite_write_queue.acquire()
+        except TimeoutError as e:
+            raise OperationalError(statement, parameters, e) from e
+        conn.info[_WRITER_KEY] = True
+
+    # The slot is given back when the connection goes back to the pool: the Session
+    # returns it right after its commit / rollback, engine.begin() when the block ends.
+    # (Connection "commit" fires before the DBAPI commit, which would let the next
+    # writer in while this one still holds the file lock.)
+    @event.listens_for(engine, "checkin")
+    def _give_back_writer_slot(dbapi_connection, connection_record):
+        if connection_record.info.pop(_WRITER_KEY, False):
+            sqlite_write_queue.release()
+
+    @event.listens_for(engine, "invalidate")
+    def _give_back_writer_slot_on_invalidate(dbapi_connection, connection_record, exception):
+        if connection_record.info.pop(_WRITER_KEY, False):
+            sqlite_write_queue.release()
+
+
+def pool_status() -> dict:
+    """Pool configuration, current occupancy and the PoolMetrics counters."""
+    pool = engine.pool
+    status = {"dialect": engine.dialect.name, "pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+            recycle=pool._recycle,
+            pre_ping=pool._pre_ping,
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    status.update(pool_metrics.snapshot())
+    if sqlite_write_queue is not None:
+        status["sqlite_writer"] = sqlite_write_queue.snapshot()
+    return status
+
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -3,6 +3,8 @@ import jwt
 from typing import Optional
 import os
 
+from models.mixin.AuditMixin import audit_user
+
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 
@@ -24,4 +26,7 @@ async def verify_access_token(authorization: Optional[str] = Header(None)):
         )
     
     token = authorization.split(" ")[1]
-    return decode_jwt_token(token)
+    payload = decode_jwt_token(token)
+    # request-scoped user for the AuditMixin change log
+    audit_user.set(payload.get("un"))
+    return payload
@@ -1,12 +1,14 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 
-from database import Base, engine
+from database import Base, SessionLocal, engine
 from dependencies import verify_access_token
+from services.loop_monitor_services import LoopMonitorMiddleware
 from routes import (
     auth_routes, currency_routes, kodelambung_routes,customer_routes, item_routes, vendor_routes,
-    category_routes,audit_routes,adjustment_routes,utils_routes,sumberdana_routes, pembayaran_routes,pengembalian_routes,satuan_routes,user_routes, warehouse_routes,upload_routes, termofpayment_routes, pembelian_routes, penjualan_routes
+    category_routes,audit_routes,adjustment_routes,utils_routes,sumberdana_routes, pembayaran_routes,pengembalian_routes,satuan_routes,user_routes, warehouse_routes,upload_routes, termofpayment_routes, pembelian_routes, penjualan_routes, search_routes, metrics_routes
 )
 from fastapi.staticfiles import StaticFiles
 import os
@@ -15,7 +17,8 @@ import os
 load_dotenv()
 
 # app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None)
-app = FastAPI()
+# orjson for every JSON response; hot list/report routes go through routes.helper.validated_json
+app = FastAPI(default_response_class=ORJSONResponse)
 
 from fastapi.openapi.utils import get_openapi
 from fastapi.security import HTTPBearer
@@ -49,7 +52,69 @@ app.openapi = custom_openapi
 
 @app.on_event("startup")
 async def startup_event():
+    # sync handlers / dependencies and run_in_threadpool share this many worker threads
+    from services.loop_monitor_services import LoopMonitorService, THREADPOOL_SIZE
+    LoopMonitorService.configure_threadpool(THREADPOOL_SIZE)
+
     Base.metadata.create_all(bind=engine)
+
+    # no_year / no_month / no_seq on penjualans & pembelians (sortable document numbers)
+    from services.record_number_services import RecordNumberService
+    altered = RecordNumberService.ensure_columns(engine)
+    db = SessionLocal()
+    try:
+        backfilled = RecordNumberService.backfill(db)
+        if altered or any(backfilled.values()):
+            print(f"✅ document number parts added to {altered}, backfilled {backfilled}")
+    finally:
+        db.close()
+
+    # audit_trails.changes (AuditMixin change data capture) + entity / user history indexes
+    from services.audit_services import AuditService
+    added = AuditService.ensure_columns(engine)
+    indexed = AuditService.ensure_indexes(engine)
+    if added or indexed:
+        print(f"✅ audit_trails columns added: {added}, indexes created: {indexed}")
+
+    # code_sequences: counters for item / customer / vendor codes start at the highest existing code
+    from services.code_sequence_services import CodeSequenceService
+    db = SessionLocal()
+    try:
+        CodeSequenceService.seed(db)
+    finally:
+        db.close()
+
+    # First start after profit_daily was introduced: backfill it from fifo_log
+    from services.profit_daily_services import ProfitDailyService
+    db = SessionLocal()
+    try:
+        rebuilt = ProfitDailyService.ensure_built(db)
+        if rebuilt:
+            print(f"✅ profit_daily rebuilt from fifo_log ({rebuilt['rows_inserted']} rows)")
+    finally:
+        db.close()
+
+    # Dialect specific full-text / trigram index, then backfill search_index once
+    from services.search_services import SearchService
+    print(f"🔎 Search backend: {SearchService.ensure_backend(engine)}")
+    db = SessionLocal()
+    try:
+        rebuilt = SearchService.ensure_built(db)
+        if rebuilt:
+            print(f"✅ search_index rebuilt ({rebuilt['indexed']})")
+        purged = SearchService.purge_deleted(db)
+        if any(purged.values()):
+            print(f"✅ soft-deleted rows removed from search_index ({purged})")
+    finally:
+        db.close()
+
+    # low_stock_items is kept incrementally; resync once in case stock changed out of band
+    from services.low_stock_services import LowStockService
+    db = SessionLocal()
+    try:
+        print(f"✅ low_stock_items resynced ({LowStockService.rebuild(db)['low_stock']} items)")
+    finally:
+        db.close()
     
     STATIC_URL = os.getenv("STATIC_URL", "static")
     items_dir = os.path.join(STATIC_URL, "items")
@@ -63,6 +128,12 @@ async def startup_event():
     if os.path.exists(items_dir):
         files = os.listdir(items_dir)
         print(f"📄 Files in items dir: {files[:5]}")
+
+    # started last: the migrations above run on the loop by design
+    from services.loop_monitor_services import LOOP_MONITOR, monitor
+    if LOOP_MONITOR:
+        monitor.start()
+        print(f"⏱️ Event loop monitor: stalls over {monitor.threshold_ms:g} ms are logged")
     
     print("🚀 Starting FastAPI project")
 
@@ -74,6 +145,8 @@ origins = [
 
 ]
 
+# in-flight requests for the event loop monitor's stall reports (no-op while it isn't running)
+app.add_middleware(LoopMonitorMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -109,6 +182,8 @@ app.include_router(user_routes.router, prefix="/users", tags=["Users"], dependen
 app.include_router(upload_routes.router, prefix="/upload", tags=["Upload"])  # No auth needed?
 app.include_router(audit_routes.router, prefix="/audit-trail", tags=["Audit Trail"], dependencies=[Depends(verify_access_token)])
 app.include_router(adjustment_routes.router, prefix="/stock-adjustment", tags=["Stock Adjustment"], dependencies=[Depends(verify_access_token)])
+app.include_router(search_routes.router, prefix="/search", tags=["Search"], dependencies=[Depends(verify_access_token)])
+app.include_router(metrics_routes.router, prefix="/metrics", tags=["Metrics"], dependencies=[Depends(verify_access_token)])
 
 # app.include_router(auth_routes.router, prefix="/auth", tags=["Authentication"])
 # app.include_router(utils_routes.router, prefix="/utils", tags=["Utils"])
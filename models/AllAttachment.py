@@ -19,8 +19,8 @@ class AllAttachment(Base):
     parent_type = Column(Enum(ParentType), nullable=False)
 
     item_id = Column(Integer, ForeignKey("items.id"), nullable=True)
-    pembelian_id = Column(Integer, ForeignKey("pembelians.id"), nullable=True)
-    penjualan_id = Column(Integer, ForeignKey("penjualans.id"), nullable=True)
+    pembelian_id = Column(Integer, ForeignKey("pembelians.id"), nullable=True, index=True)
+    penjualan_id = Column(Integer, ForeignKey("penjualans.id"), nullable=True, index=True)
     pembayaran_id = Column(Integer, ForeignKey("pembayarans.id"), nullable=True)
     pengembalian_id = Column(Integer, ForeignKey("pengembalians.id"), nullable=True)
     stock_adjustment_id = Column(Integer, ForeignKey("stock_adjustments.id"), nullable=True)
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, Index, func
+
+from database import Base
+
+
+class AuditArchive(Base):
+    """
+    Satu batch audit_trails yang sudah dipindah ke file JSONL terkompresi
+    (gzip, satu member per batch) oleh AuditArchiveService.compact.
+    Dipakai untuk memilih file yang perlu dibaca saat query ke arsip.
+    """
+    __tablename__ = "audit_archives"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    file_path = Column(String(500), nullable=False)
+
+    row_count = Column(Integer, nullable=False, default=0)
+    first_id = Column(Integer, nullable=False)
+    last_id = Column(Integer, nullable=False)
+
+    archived_at = Column(DateTime, nullable=False, default=datetime.now, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_audit_archives_period", "year", "month"),
+    )
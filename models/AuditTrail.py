@@ -3,7 +3,7 @@ import pytz
 from sqlalchemy import Enum
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
 from database import Base
 import enum
 
@@ -53,11 +53,18 @@ class AuditEntityEnum(enum.Enum):
 
 class AuditTrail(Base):
     __tablename__ = "audit_trails"
+    __table_args__ = (
+        # entity history, newest first
+        Index("ix_audit_trails_entity_ts", "entity_type", "entity_id", "timestamp"),
+        # activity per user
+        Index("ix_audit_trails_user_ts", "user_name", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     entity_id = Column(String(100), nullable=False)  # ID of the thing being tracked
     entity_type = Column(Enum(AuditEntityEnum), nullable=False)  # Type of entity
     description = Column(Text, nullable=False)  # What happened (human-readable)
+    changes = Column(Text, nullable=True)  # JSON diff {"field": [old, new]} written by AuditMixin
     user_name = Column(String(100), nullable=False)  # Who did it
     timestamp = Column(DateTime(timezone=True), default=get_jkt_now, nullable=False)
 
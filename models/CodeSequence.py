@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, func
+
+from database import Base
+
+
+class CodeSequence(Base):
+    """
+    Nomor terakhir per prefix kode master data (FG-00001, CUS-00001, VEN-00001).
+    Dipakai lewat CodeSequenceService.reserve, bukan count() / MAX() atas tabelnya.
+    """
+    __tablename__ = "code_sequences"
+
+    prefix = Column(String(50), primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now, server_default=func.now())
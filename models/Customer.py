@@ -4,10 +4,13 @@ from sqlalchemy.orm import relationship
 from datetime import datetime
 
 from models.mixin.SoftDeleteMixin import SoftDeleteMixin
+from models.AuditTrail import AuditEntityEnum
+from models.mixin.AuditMixin import AuditMixin
 
 
-class Customer(Base,SoftDeleteMixin):
+class Customer(Base,SoftDeleteMixin,AuditMixin):
     __tablename__ = "customers"
+    __audit_entity__ = AuditEntityEnum.CUSTOMER
     id = Column(Integer, primary_key=True, index=True)
     code = Column(String(50),nullable=False, unique=True)
     name = Column(String(50), nullable=False)
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, func
+
+from database import Base
+
+
+class DocumentSequence(Base):
+    """
+    Nomor urut terakhir per prefix dokumen per bulan (PREFIX/NNNN/MM/YYYY).
+    Dinaikkan oleh DocumentSequenceService.next_value dengan satu UPDATE
+    atomik, jadi pembuatan nomor O(1) dan tidak bentrok antar worker.
+    """
+    __tablename__ = "document_sequences"
+
+    prefix = Column(String(50), primary_key=True)
+    year = Column(Integer, primary_key=True, autoincrement=False)
+    month = Column(Integer, primary_key=True, autoincrement=False)
+    last_value = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now, server_default=func.now())
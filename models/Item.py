@@ -8,6 +8,8 @@ from sqlalchemy.orm import relationship
 import enum
 
 from models.mixin.SoftDeleteMixin import SoftDeleteMixin
+from models.AuditTrail import AuditEntityEnum
+from models.mixin.AuditMixin import AuditMixin
 
 
 class ItemTypeEnum(enum.Enum):
@@ -15,8 +17,9 @@ class ItemTypeEnum(enum.Enum):
     RAW_MATERIAL = "RAW_MATERIAL"
     SERVICE = "SERVICE"
 
-class Item(Base, SoftDeleteMixin):
+class Item(Base, SoftDeleteMixin, AuditMixin):
     __tablename__ = "items"
+    __audit_entity__ = AuditEntityEnum.ITEM
     
     id = Column(Integer, primary_key=True, index=True)
     code= Column(String(100), unique=True, nullable=True)
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, func
+
+from database import Base
+
+
+class LowStockItem(Base):
+    """
+    Item yang stok FIFO-nya (sum sisa_qty batch OPEN) di bawah Item.min_item.
+    Di-maintain oleh LowStockService: item yang stoknya berubah dihitung ulang
+    saat commit, jadi laporan low-stock cukup baca tabel ini.
+    """
+    __tablename__ = "low_stock_items"
+
+    item_id = Column(Integer, ForeignKey("items.id", ondelete="CASCADE"), primary_key=True)
+    available_qty = Column(Integer, nullable=False, default=0)
+    min_item = Column(Integer, nullable=False, default=0)
+
+    since = Column(DateTime, nullable=False, default=datetime.now, server_default=func.now())
+    updated_at = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_low_stock_items_since", "since"),
+    )
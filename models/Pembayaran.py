@@ -4,12 +4,15 @@ from datetime import datetime
 from sqlalchemy import Integer, Column, DateTime, Enum, Numeric, ForeignKey, String
 from sqlalchemy.orm import relationship
 from database import Base
+from models.AuditTrail import AuditEntityEnum
+from models.mixin.AuditMixin import AuditMixin
 from models.Pembelian import StatusPembelianEnum
 from schemas.PembayaranSchemas import PembayaranPengembalianType
 
 
-class Pembayaran(Base):
+class Pembayaran(Base, AuditMixin):
     __tablename__ = "pembayarans"
+    __audit_entity__ = AuditEntityEnum.PEMBAYARAN
 
     id = Column(Integer, primary_key=True, index=True)
     no_pembayaran = Column(String(255), unique=True, default="", nullable=False)
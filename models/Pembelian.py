@@ -2,14 +2,17 @@ from decimal import Decimal
 import enum
 from typing import Optional
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, DateTime, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, DateTime, Enum, Index
 from sqlalchemy.ext.hybrid import hybrid_property
 
 from database import Base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime, timedelta
 
+from models.mixin.RecordNumberMixin import RecordNumberMixin
 from models.mixin.SoftDeleteMixin import SoftDeleteMixin
+from models.AuditTrail import AuditEntityEnum
+from models.mixin.AuditMixin import AuditMixin
 
 
 class StatusPembayaranEnum(enum.Enum):
@@ -25,8 +28,13 @@ class StatusPembelianEnum(enum.Enum):
     PROCESSED = "PROCESSED"
     COMPLETED = "COMPLETED"
 
-class Pembelian(Base,SoftDeleteMixin):
+class Pembelian(Base,SoftDeleteMixin,RecordNumberMixin,AuditMixin):
     __tablename__ = "pembelians"
+    __audit_entity__ = AuditEntityEnum.PEMBELIAN
+    __audit_exclude__ = ("no_year", "no_month", "no_seq")
+    __table_args__ = (
+        Index("ix_pembelians_no_order", "no_year", "no_month", "no_seq"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     no_pembelian = Column(String(255),unique=True, default="", nullable=False)
@@ -60,6 +68,11 @@ class Pembelian(Base,SoftDeleteMixin):
  
     created_at = Column(DateTime, default=datetime.now, nullable=False)  
 
+    @validates("no_pembelian")
+    def _sync_record_number_parts(self, key, value):
+        self.set_record_number_parts(value)
+        return value
+
     # Relationships (only active in draft mode)
     vend_rel = relationship("Vendor", back_populates="pembelians")
     warehouse_rel = relationship("Warehouse", back_populates="pembelians")
@@ -115,7 +128,7 @@ class PembelianItem(Base):
     __tablename__ = "pembelian_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    pembelian_id = Column(Integer, ForeignKey("pembelians.id", ondelete="CASCADE"), nullable=False)
+    pembelian_id = Column(Integer, ForeignKey("pembelians.id", ondelete="CASCADE"), nullable=False, index=True)
     item_id = Column(Integer, ForeignKey("items.id", ondelete="SET NULL"), nullable=True)
    
    
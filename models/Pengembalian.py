@@ -6,12 +6,15 @@ from sqlalchemy import Integer, Column, DateTime, Enum, Numeric, ForeignKey, Str
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.hybrid import hybrid_property
 from database import Base
+from models.AuditTrail import AuditEntityEnum
+from models.mixin.AuditMixin import AuditMixin
 from models.Pembelian import StatusPembelianEnum
 from schemas.PembayaranSchemas import PembayaranPengembalianType
 
 
-class Pengembalian(Base):
+class Pengembalian(Base, AuditMixin):
     __tablename__ = "pengembalians"
+    __audit_entity__ = AuditEntityEnum.PENGEMBALIAN
 
     id = Column(Integer, primary_key=True, index=True)
     no_pengembalian = Column(String(255), unique=True, default="", nullable=False)
@@ -4,18 +4,26 @@ from typing import Optional
 from datetime import datetime, timedelta
 
 from sqlalchemy import (
-    Column, Integer, String, ForeignKey, Numeric, Text, DateTime, Enum
+    Column, Integer, String, ForeignKey, Numeric, Text, DateTime, Enum, Index
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.ext.hybrid import hybrid_property
 
 from database import Base
 from models.Pembelian import StatusPembayaranEnum, StatusPembelianEnum
+from models.mixin.RecordNumberMixin import RecordNumberMixin
 from models.mixin.SoftDeleteMixin import SoftDeleteMixin
+from models.AuditTrail import AuditEntityEnum
+from models.mixin.AuditMixin import AuditMixin
 
 
-class Penjualan(Base, SoftDeleteMixin):
+class Penjualan(Base, SoftDeleteMixin, RecordNumberMixin, AuditMixin):
     __tablename__ = "penjualans"
+    __audit_entity__ = AuditEntityEnum.PENJUALAN
+    __audit_exclude__ = ("no_year", "no_month", "no_seq")
+    __table_args__ = (
+        Index("ix_penjualans_no_order", "no_year", "no_month", "no_seq"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     no_penjualan = Column(String(255), unique=True, default="", nullable=False)
@@ -61,6 +69,11 @@ class Penjualan(Base, SoftDeleteMixin):
 
     created_at = Column(DateTime, default=datetime.now, nullable=False)
 
+    @validates("no_penjualan")
+    def _sync_record_number_parts(self, key, value):
+        self.set_record_number_parts(value)
+        return value
+
     # ---- Relationships ----
     customer_rel = relationship("Customer", back_populates="penjualans")
     warehouse_rel = relationship("Warehouse", back_populates="penjualans")
@@ -123,7 +136,7 @@ class PenjualanItem(Base):
     __tablename__ = "penjualan_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    penjualan_id = Column(Integer, ForeignKey("penjualans.id", ondelete="CASCADE"), nullable=False)
+    penjualan_id = Column(Integer, ForeignKey("penjualans.id", ondelete="CASCADE"), nullable=False, index=True)
     item_id = Column(Integer, ForeignKey("items.id", ondelete="SET NULL"), nullable=True)
 
     # ---- Item pricing fields aligned with PembelianItem ----
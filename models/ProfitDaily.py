@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    Column, Integer, Numeric, Date, DateTime, Boolean, ForeignKey, Index, UniqueConstraint, func
+)
+
+from database import Base
+
+
+class ProfitDaily(Base):
+    """
+    Ringkasan laba rugi per item per hari, diturunkan dari fifo_log.
+
+    Di-maintain incremental oleh FifoService.process_sale_fifo / rollback_sale,
+    dan bisa dibangun ulang dari fifo_log lewat ProfitDailyService.rebuild.
+
+    Nilai sudah NET: baris rollback mengurangi qty, hpp, revenue dan gross_profit.
+    Penyesuaian stok (invoice ADJ-...) disimpan terpisah (is_adjustment=True)
+    supaya laporan tetap bisa mengecualikannya.
+    """
+    __tablename__ = "profit_daily"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False, index=True)
+    date = Column(Date, nullable=False, index=True)
+    is_adjustment = Column(Boolean, nullable=False, default=False)
+
+    qty = Column(Integer, nullable=False, default=0)
+    hpp = Column(Numeric(24, 7), nullable=False, default=0)
+    revenue = Column(Numeric(24, 7), nullable=False, default=0)
+    gross_profit = Column(Numeric(24, 7), nullable=False, default=0)
+
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("item_id", "date", "is_adjustment", name="uq_profit_daily_item_date_adj"),
+        Index("ix_profit_daily_date_item", "date", "item_id"),
+    )
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, UniqueConstraint, func
+
+from database import Base
+
+
+class SearchIndex(Base):
+    """
+    Satu baris per entity yang bisa dicari (item, customer, vendor, penjualan, pembelian).
+    Di-maintain oleh SearchService (hook after_flush + rebuild).
+
+    - content:   teks lowercase yang dicari substring-nya; diindeks per dialect
+                 (SQLite FTS5 trigram, MySQL FULLTEXT ngram, Postgres pg_trgm)
+    - title_norm / key_norm: lowercase untuk prefix autocomplete (B-tree range scan)
+    """
+    __tablename__ = "search_index"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity_type = Column(String(30), nullable=False)
+    entity_id = Column(String(64), nullable=False)
+
+    title = Column(String(255), nullable=True)
+    subtitle = Column(String(255), nullable=True)
+    title_norm = Column(String(255), nullable=True)
+    key_norm = Column(String(255), nullable=True)
+    content = Column(Text, nullable=False, default="")
+
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("entity_type", "entity_id", name="uq_search_index_entity"),
+        Index("ix_search_index_title", "entity_type", "title_norm",
+              postgresql_ops={"title_norm": "text_pattern_ops"}),
+        Index("ix_search_index_key", "entity_type", "key_norm",
+              postgresql_ops={"key_norm": "text_pattern_ops"}),
+    )
@@ -6,6 +6,8 @@ from sqlalchemy.orm import relationship
 
 from database import Base
 from models import SoftDeleteMixin
+from models.AuditTrail import AuditEntityEnum
+from models.mixin.AuditMixin import AuditMixin
 
 
 class AdjustmentTypeEnum(enum.Enum):
@@ -18,8 +20,9 @@ class StatusStockAdjustmentEnum(enum.Enum):
     DRAFT = "DRAFT"
     ACTIVE = "ACTIVE"
 
-class StockAdjustment(Base, SoftDeleteMixin):
+class StockAdjustment(Base, SoftDeleteMixin, AuditMixin):
     __tablename__ = "stock_adjustments"
+    __audit_entity__ = AuditEntityEnum.STOCK_ADJUSTMENT
 
     id = Column(Integer, primary_key=True, index=True)
     no_adjustment = Column(String(255),unique=True, default="", nullable=False)
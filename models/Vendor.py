@@ -4,10 +4,13 @@ from sqlalchemy.orm import relationship
 from datetime import datetime
 
 from models.mixin.SoftDeleteMixin import SoftDeleteMixin
+from models.AuditTrail import AuditEntityEnum
+from models.mixin.AuditMixin import AuditMixin
 
 
-class Vendor(Base, SoftDeleteMixin):
+class Vendor(Base, SoftDeleteMixin, AuditMixin):
     __tablename__ = "vendors"
+    __audit_entity__ = AuditEntityEnum.VENDOR
     
     id = Column(String(50), primary_key=True, index=True)
     name = Column(String(100), nullable=False)
@@ -18,3 +18,9 @@ from models import StockAdjustment
 from models import InventoryLedger
 from models.mixin import AuditMixin
 from models import BatchStock
+from models import ProfitDaily
+from models import SearchIndex
+from models import LowStockItem
+from models import DocumentSequence
+from models import CodeSequence
+from models import AuditArchive
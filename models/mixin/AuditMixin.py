@@ -1,40 +1,47 @@
 
 # models/mixin/AuditMixin.py
-from typing import Dict, Any, Optional
-from sqlalchemy import event
+import enum
+import json
+import os
+from contextvars import ContextVar
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
 
+from models.AuditTrail import get_jkt_now
+
+# user of the current request; set by dependencies.verify_access_token
+audit_user: ContextVar[Optional[str]] = ContextVar("audit_user", default=None)
+# startup jobs, CLI scripts, background threads
+AUDIT_SYSTEM_USER = "SYSTEM"
+
+AUDIT_CDC = os.getenv("AUDIT_CDC", "true").lower() in ("1", "true", "yes")
+
+# session.info key of the transaction's audit entries (written by AuditService at commit)
+AUDIT_PENDING_KEY = "audit_pending_entries"
+
+# never part of a diff
+_AUDIT_ALWAYS_EXCLUDED = ("created_at", "updated_at")
+
 
 class AuditMixin:
     """
     Mixin to add audit trail functionality to models.
     Add this to models that need automatic audit tracking.
-    """
-
-    def __init_subclass__(cls, **kwargs):
-        super().__init_subclass__(**kwargs)
-        # Register event listeners for this model
-        event.listen(cls, 'after_insert', cls._audit_after_insert)
-        event.listen(cls, 'after_update', cls._audit_after_update)
-        event.listen(cls, 'after_delete', cls._audit_after_delete)
-
-    @classmethod
-    def _audit_after_insert(cls, mapper, connection, target):
-        """Called after a new record is inserted"""
-        # This would be called from your service layer with proper context
-        pass
 
-    @classmethod
-    def _audit_after_update(cls, mapper, connection, target):
-        """Called after a record is updated"""
-        # This would be called from your service layer with proper context
-        pass
+    Every flush records one audit_trails row per inserted / updated / deleted
+    instance, with the changed columns as a compact JSON diff in `changes`:
+    {"field": [old, new], ...}. The rows are buffered in the session and
+    written by AuditService with the rest of the transaction's entries.
+    """
 
-    @classmethod
-    def _audit_after_delete(cls, mapper, connection, target):
-        """Called after a record is deleted"""
-        # This would be called from your service layer with proper context
-        pass
+    # AuditEntityEnum member the rows are filed under
+    __audit_entity__ = None
+    # columns left out of the diff (derived / noisy)
+    __audit_exclude__ = ()
 
     def get_audit_changes(self, original_values: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
         """
@@ -55,6 +62,89 @@ class AuditMixin:
         return changes
 
 
+def _json_default(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        # 100.0000000 -> "100", 0E-7 -> "0"
+        return format(value.normalize(), "f")
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _audited_columns(obj) -> List[str]:
+    excluded = set(_AUDIT_ALWAYS_EXCLUDED) | set(type(obj).__audit_exclude__)
+    return [attr.key for attr in inspect(type(obj)).column_attrs if attr.key not in excluded]
+
+
+def _diff(obj, action: str) -> Optional[dict]:
+    state = inspect(obj)
+    changes = {}
+    if action == "CREATE":
+        for key in _audited_columns(obj):
+            value = state.dict.get(key)
+            if value is not None:
+                changes[key] = value
+    elif action == "UPDATE":
+        for key in _audited_columns(obj):
+            history = state.attrs[key].history
+            if not history.has_changes():
+                continue
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+            if old != new:
+                changes[key] = [old, new]
+        if not changes:
+            return None
+    return changes
+
+
+def _describe(obj, action: str, entity_id: str, changes: dict) -> str:
+    name = type(obj).__name__
+    if action == "CREATE":
+        return f"{name} {entity_id} dibuat"
+    if action == "DELETE":
+        return f"{name} {entity_id} dihapus"
+    return f"{name} {entity_id} diubah: {', '.join(changes)}"
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_changes(session: Session, flush_context):
+    """
+    Change data capture for AuditMixin models. Runs after_flush rather than
+    before_flush: attribute history is still there and new rows have their
+    primary keys, so CREATE entries can carry the entity id. Rows are only
+    buffered here: AuditService inserts them at commit, drops them with a
+    rolled back savepoint and lets default_log() describe them.
+    """
+    if not AUDIT_CDC:
+        return
+    user_name = audit_user.get() or AUDIT_SYSTEM_USER
+    now = get_jkt_now()
+    rows = []
+    for objects, action in ((session.new, "CREATE"), (session.dirty, "UPDATE"), (session.deleted, "DELETE")):
+        for obj in objects:
+            if not isinstance(obj, AuditMixin) or type(obj).__audit_entity__ is None:
+                continue
+            changes = _diff(obj, action)
+            if changes is None:
+                continue
+            # state.identity isn't set for new rows until after the flush completes
+            primary_key = inspect(type(obj)).primary_key_from_instance(obj)
+            entity_id = "-".join(str(part) for part in primary_key)
+            rows.append({
+                "entity_id": entity_id,
+                "entity_type": type(obj).__audit_entity__,
+                "description": _describe(obj, action, entity_id, changes),
+                "changes": json.dumps(changes, default=_json_default, separators=(",", ":")),
+                "user_name": user_name,
+                "timestamp": now,
+            })
+    if rows:
+        session.info.setdefault(AUDIT_PENDING_KEY, []).extend(rows)
+
+
 # Helper decorator for service methods
 def audit_action(action_type: str, entity_type: str):
     """
@@ -81,4 +171,4 @@ def audit_action(action_type: str, entity_type: str):
 
             return result
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,35 @@
+from typing import Optional, Tuple
+
+from sqlalchemy import Column, Integer
+
+
+def split_record_number(record_number: Optional[str]) -> Tuple[int, int, int]:
+    """
+    (year, month, sequence) of a PREFIX/NNNN/MM/YYYY number, e.g.
+    QP/SI/0001/10/2025 -> (2025, 10, 1). The prefix may contain slashes.
+    Anything that doesn't parse gives (0, 0, 0).
+    """
+    if not record_number:
+        return 0, 0, 0
+    parts = record_number.split("/")
+    if len(parts) < 4:
+        return 0, 0, 0
+    try:
+        seq, month, year = (int(p) for p in parts[-3:])
+    except ValueError:
+        return 0, 0, 0
+    return year, month, seq
+
+
+class RecordNumberMixin:
+    """
+    Document number components as integer columns, so lists can sort on an
+    index instead of CAST(SUBSTR(no_...)). The model keeps them in sync with
+    its number column through set_record_number_parts() in a @validates hook.
+    """
+    no_year = Column(Integer, nullable=False, default=0, server_default="0")
+    no_month = Column(Integer, nullable=False, default=0, server_default="0")
+    no_seq = Column(Integer, nullable=False, default=0, server_default="0")
+
+    def set_record_number_parts(self, record_number: Optional[str]) -> None:
+        self.no_year, self.no_month, self.no_seq = split_record_number(record_number)
@@ -425,7 +425,7 @@ def get_stock_adjustment(adjustment_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{pembelian_id}/download/{attachment_id}")
-async def download_attachment(
+def download_attachment(
         stock_adjustment_id: str,
         attachment_id: int,
         db: Session = Depends(get_db)
@@ -453,7 +453,7 @@ async def download_attachment(
     
     
 @router.put("/{adjustment_id}/rollback", status_code=status.HTTP_200_OK)
-async def rollback_stock_adjustment(
+def rollback_stock_adjustment(
         adjustment_id: int,
         db: Session = Depends(get_db),
         user_name: str = Depends(get_current_user_name)
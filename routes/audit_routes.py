@@ -1,9 +1,12 @@
 # routers/audit.py
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import Optional
+from datetime import date
 from database import get_db
 from models.AuditTrail import AuditTrail, AuditEntityEnum
+from routes.helper import paginate_keyset
+from services.audit_archive_services import AuditArchiveService
 
 router = APIRouter()
 
@@ -15,6 +18,8 @@ def get_audit_trails(
         user_name: Optional[str] = None,
         limit: int = Query(50, le=1000),
         offset: int = Query(0, ge=0),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides offset)"),
+        with_total: bool = Query(True, description="Set false to skip the total count"),
         db: Session = Depends(get_db)
 ):
     query = db.query(AuditTrail)
@@ -25,45 +30,78 @@ def get_audit_trails(
         query = query.filter(AuditTrail.entity_id == entity_id)
 
     if user_name:
-        query = query.filter(AuditTrail.user_name.ilike(f"%{user_name}%"))
+        # prefix match so ix_audit_trails_user_ts can be used (case-insensitive collation / SQLite LIKE);
+        # wildcards in the input are escaped, so "a_b" doesn't also match "axb"
+        prefix = user_name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.filter(AuditTrail.user_name.like(f"{prefix}%", escape="\\"))
 
-    query = query.order_by(AuditTrail.timestamp.desc())
-    total = query.count()
-    items = query.offset(offset).limit(limit).all()
+    page_result = paginate_keyset(
+        query, [(AuditTrail.timestamp, True), (AuditTrail.id, True)], limit,
+        cursor=cursor, offset=offset, with_total=with_total,
+    )
 
     return {
-        "total": total,
-        "items": items,
+        "total": page_result.total,
+        "items": page_result.rows,
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": page_result.next_cursor,
     }
 
+@router.get("/archive")
+def get_archived_audit_trails(
+        entity_type: Optional[str] = None,
+        entity_id: Optional[str] = None,
+        user_name: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        limit: int = Query(50, ge=1, le=1000),
+        db: Session = Depends(get_db)
+):
+    """Entries moved out of audit_trails by the compaction job (python -m services.audit_archive_services)."""
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must be before date_to")
+    return AuditArchiveService.search(
+        db,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        user_name=user_name,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+    )
+
 @router.get("/{entity_type}/{entity_id}")
 def get_entity_audit_trail(
         entity_type: AuditEntityEnum,
         entity_id: str,
         limit: int = Query(50, le=1000),
         offset: int = Query(0, ge=0),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides offset)"),
+        with_total: bool = Query(True, description="Set false to skip the total count"),
         db: Session = Depends(get_db)
 ):
     query = db.query(AuditTrail).filter(
         AuditTrail.entity_type == entity_type,
         AuditTrail.entity_id == entity_id
-    ).order_by(AuditTrail.timestamp.desc())
+    )
 
-    total = query.count()
-    items = query.offset(offset).limit(limit).all()
+    page_result = paginate_keyset(
+        query, [(AuditTrail.timestamp, True), (AuditTrail.id, True)], limit,
+        cursor=cursor, offset=offset, with_total=with_total,
+    )
     formatted_items = [
         {
             **item.__dict__,
             "timestamp": item.timestamp.strftime("%Y-%m-%d %H:%M:%S")
         }
-        for item in items
+        for item in page_result.rows
     ]
 
     return {
-        "total": total,
+        "total": page_result.total,
         "items": formatted_items,
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": page_result.next_cursor,
     }
\ No newline at end of file
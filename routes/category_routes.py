@@ -8,6 +8,7 @@ from starlette.exceptions import HTTPException
 from models.Category import Category
 from schemas.CategorySchemas import CategoryOut, CategoryCreate, CategoryUpdate
 from database import get_db
+from routes.helper import paginate_keyset
 from schemas.PaginatedResponseSchemas import PaginatedResponse
 from utils import soft_delete_record
 
@@ -20,13 +21,15 @@ def _build_categories_lookup(db: Session) -> Dict[str, int]:
     return {cat.name.lower().strip(): cat.id for cat in categories}
 # Get all
 @router.get("", response_model=PaginatedResponse[CategoryOut])
-async def get_all_categories(
+def get_all_categories(
         cat_type: int = 0,
         is_active: Optional[bool] = None,
         search_key : Optional[str] = None,
         contains_deleted: Optional[bool] = False, 
         skip: int = Query(0, ge=0),
         limit: int = Query(5, ge=1, le=1000),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides skip)"),
+        with_total: bool = Query(True, description="Set false to skip the total count"),
         db: Session = Depends(get_db),
         to_date : Optional[date] = Query(None, description="Filter by date"),
         from_date : Optional[date] = Query(None, description="Filter by date")
@@ -58,18 +61,21 @@ async def get_all_categories(
     elif to_date:
         query = query.filter(Category.created_at <= datetime.combine(to_date, time.max))
 
-    paginated_data =query.offset(skip).limit(limit).all()
-    total_count = query.count()
+    page_result = paginate_keyset(
+        query, [(Category.id, False)], limit,
+        cursor=cursor, offset=skip, with_total=with_total,
+    )
 
     return {
-        "data": paginated_data,
-        "total": total_count
+        "data": page_result.rows,
+        "total": page_result.total,
+        "next_cursor": page_result.next_cursor,
     }
 
 
 
 @router.get("/{category_id}", response_model=CategoryOut)
-async def get_category(category_id: int, db: Session = Depends(get_db)):
+def get_category(category_id: int, db: Session = Depends(get_db)):
     category = db.query(Category).filter(Category.id == category_id).first()
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
@@ -77,7 +83,7 @@ async def get_category(category_id: int, db: Session = Depends(get_db)):
 
 # Create
 @router.post("", response_model=CategoryOut, status_code=status.HTTP_201_CREATED)
-async def create_category(category_data: CategoryCreate, db: Session = Depends(get_db)):
+def create_category(category_data: CategoryCreate, db: Session = Depends(get_db)):
     category = Category(**category_data.dict())
     db.add(category)
     db.commit()
@@ -86,7 +92,7 @@ async def create_category(category_data: CategoryCreate, db: Session = Depends(g
 
 # Update
 @router.put("/{category_id}", response_model=CategoryOut)
-async def update_category(category_id: int, category_data: CategoryUpdate, db: Session = Depends(get_db)):
+def update_category(category_id: int, category_data: CategoryUpdate, db: Session = Depends(get_db)):
     category = db.query(Category).filter(Category.id == category_id).first()
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
@@ -100,7 +106,7 @@ async def update_category(category_id: int, category_data: CategoryUpdate, db: S
 
 # Delete
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_category(category_id: int, db: Session = Depends(get_db)):
+def delete_category(category_id: int, db: Session = Depends(get_db)):
     category = db.query(Category).filter(Category.id == category_id).first()
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
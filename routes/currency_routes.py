@@ -8,6 +8,7 @@ from starlette.exceptions import HTTPException
 from models.Currency import Currency
 from schemas.CurrencySchemas import CurrencyOut, CurrencyCreate, CurrencyUpdate
 from database import get_db
+from routes.helper import paginate_keyset
 from schemas.PaginatedResponseSchemas import PaginatedResponse
 from utils import soft_delete_record
 
@@ -15,12 +16,14 @@ router = APIRouter()
 
 # Get all
 @router.get("", response_model=PaginatedResponse[CurrencyOut])
-async def get_all_currencies(db: Session = Depends(get_db),
+def get_all_currencies(db: Session = Depends(get_db),
                              is_active : Optional[bool] = None,
                              search_key : Optional[str] = None,
                              contains_deleted: Optional[bool] = False,
                              skip: int = Query(0, ge=0),
                              limit: int = Query(5, ge=1, le=1000),
+                             cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides skip)"),
+                             with_total: bool = Query(True, description="Set false to skip the total count"),
                              to_date : Optional[date] = Query(None, description="Filter by date"),
                              from_date : Optional[date] = Query(None, description="Filter by date")):
     query = db.query(Currency)
@@ -46,18 +49,21 @@ async def get_all_currencies(db: Session = Depends(get_db),
         query = query.filter(Currency.name.ilike(f"%{search_key}%"))
 
 
-    totalCount = query.count()
-    paginated_data = query.limit(limit).offset(skip).all();
+    page_result = paginate_keyset(
+        query, [(Currency.id, False)], limit,
+        cursor=cursor, offset=skip, with_total=with_total,
+    )
 
     return {
-        "data" : paginated_data ,
-        "total" : totalCount
+        "data": page_result.rows,
+        "total": page_result.total,
+        "next_cursor": page_result.next_cursor,
     }
 
 
 # Get one
 @router.get("/{currency_id}", response_model=CurrencyOut)
-async def get_currency(currency_id: int, db: Session = Depends(get_db)):
+def get_currency(currency_id: int, db: Session = Depends(get_db)):
     currency = db.query(Currency).filter(Currency.id == currency_id).first()
     if not currency:
         raise HTTPException(status_code=404, detail="Currency not found")
@@ -65,7 +71,7 @@ async def get_currency(currency_id: int, db: Session = Depends(get_db)):
 
 # Create
 @router.post("", response_model=CurrencyOut, status_code=status.HTTP_201_CREATED)
-async def create_currency(currency_data: CurrencyCreate, db: Session = Depends(get_db)):
+def create_currency(currency_data: CurrencyCreate, db: Session = Depends(get_db)):
     currency = Currency(**currency_data.dict())
     db.add(currency)
     db.commit()
@@ -74,7 +80,7 @@ async def create_currency(currency_data: CurrencyCreate, db: Session = Depends(g
 
 # Update
 @router.put("/{currency_id}", response_model=CurrencyOut)
-async def update_currency(currency_id: int, currency_data: CurrencyUpdate, db: Session = Depends(get_db)):
+def update_currency(currency_id: int, currency_data: CurrencyUpdate, db: Session = Depends(get_db)):
     currency = db.query(Currency).filter(Currency.id == currency_id).first()
     if not currency:
         raise HTTPException(status_code=404, detail="Currency not found")
@@ -88,7 +94,7 @@ async def update_currency(currency_id: int, currency_data: CurrencyUpdate, db: S
 
 # Delete
 @router.delete("/{currency_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_currency(currency_id: int, db: Session = Depends(get_db)):
+def delete_currency(currency_id: int, db: Session = Depends(get_db)):
     currency = db.query(Currency).filter(Currency.id == currency_id).first()
     if not currency:
         raise HTTPException(status_code=404, detail="Currency not found")
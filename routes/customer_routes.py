@@ -1,19 +1,19 @@
 from datetime import datetime, date, time
 from typing import List, Optional
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import or_, exists
+from sqlalchemy import exists
 from sqlalchemy.orm import Session, joinedload
 from starlette import status
 from starlette.exceptions import HTTPException
 
-from models.AuditTrail import AuditEntityEnum
 from models.Currency import Currency
 from models.Customer import Customer
 from models.KodeLambung import KodeLambung
 from schemas.CustomerSchemas import CustomerOut, CustomerCreate, CustomerUpdate
 from database import get_db
+from routes.helper import paginate_keyset
 from schemas.PaginatedResponseSchemas import PaginatedResponse
-from services.audit_services import AuditService
+from services.search_services import SearchService
 from utils import soft_delete_record, get_current_user_name, generate_incremental_id
 
 router = APIRouter()
@@ -24,6 +24,8 @@ def get_all_Customer(
         db: Session = Depends(get_db),
         page: int = 1,
         rowsPerPage: int = 10,
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides page)"),
+        with_total: bool = Query(True, description="Set false to skip the total count"),
         contains_deleted: Optional[bool] = False,
         is_active: Optional[bool] = None,
         search_key: Optional[str] = None,
@@ -50,26 +52,21 @@ def get_all_Customer(
     elif to_date:
         query = query.filter(Customer.created_at <= datetime.combine(to_date, time.max))
     if search_key is not None:
-        query = query.filter(or_(
-            Customer.name.ilike(f"%{search_key}%"),
-            Customer.id.ilike(f"%{search_key}%")
-        ))
+        query = query.filter(Customer.id.in_(SearchService.matching_ids("customer", search_key)))
 
-    total_count = query.count()
-
-    paginated_data = (
-        query.offset((page - 1) * rowsPerPage)
-        .limit(rowsPerPage)
-        .all()
+    page_result = paginate_keyset(
+        query, [(Customer.id, False)], rowsPerPage,
+        cursor=cursor, offset=(page - 1) * rowsPerPage, with_total=with_total,
     )
 
     return {
-        "data": paginated_data,
-        "total": total_count,
+        "data": page_result.rows,
+        "total": page_result.total,
+        "next_cursor": page_result.next_cursor,
     }
 
 @router.get("/{customer_id}", response_model=CustomerOut)
-async def get_customer(
+def get_customer(
         customer_id: str,
         db: Session = Depends(get_db),
         contains_deleted: Optional[bool] = False
@@ -112,15 +109,13 @@ async def get_customer(
     return response_data
 
 @router.post("", response_model=CustomerOut, status_code=status.HTTP_201_CREATED)
-async def create_customer(customer_data: CustomerCreate, db: Session = Depends(get_db), user_name: str = Depends(get_current_user_name)):
+def create_customer(customer_data: CustomerCreate, db: Session = Depends(get_db), user_name: str = Depends(get_current_user_name)):
 
     if not hasattr(customer_data, 'code') or not customer_data.code:
         customer_code = generate_incremental_id(db, Customer, prefix="CUS-")
     else:
         customer_code = customer_data.code
 
-    audit_service = AuditService(db)
-
     existing_customer = db.query(Customer).filter(Customer.code == customer_code).first()
 
     if existing_customer:
@@ -136,12 +131,6 @@ async def create_customer(customer_data: CustomerCreate, db: Session = Depends(g
                     kode_lambung = KodeLambung(name=kl_name, customer_id=existing_customer.id)
                     db.add(kode_lambung)
 
-            audit_service.default_log(
-                entity_id=existing_customer.id,
-                entity_type=AuditEntityEnum.CUSTOMER,
-                description=f"Customer {existing_customer.name} telah dipulihkan",
-                user_name=user_name
-            )
             db.commit()
             db.refresh(existing_customer)
             return existing_customer
@@ -171,13 +160,6 @@ async def create_customer(customer_data: CustomerCreate, db: Session = Depends(g
     db.add(customer)
     db.flush()
 
-    audit_service.default_log(
-        entity_id=customer.id,
-        entity_type=AuditEntityEnum.CUSTOMER,
-        description=f"Customer {customer.name} telah dibuat",
-        user_name=user_name
-    )
-
     if customer_data.kode_lambungs:
         for kl_name in customer_data.kode_lambungs:
             kode_lambung = KodeLambung(name=kl_name, customer_id=customer.id)
@@ -188,8 +170,7 @@ async def create_customer(customer_data: CustomerCreate, db: Session = Depends(g
     return customer
 
 @router.put("/{customer_id}", response_model=CustomerOut)
-async def update_customer(customer_id: str, customer_data: CustomerUpdate, db: Session = Depends(get_db), user_name: str = Depends(get_current_user_name)):
-    audit_service = AuditService(db)
+def update_customer(customer_id: str, customer_data: CustomerUpdate, db: Session = Depends(get_db), user_name: str = Depends(get_current_user_name)):
 
     customer = db.query(Customer).filter(Customer.id == customer_id).first()
     if not customer:
@@ -241,18 +222,11 @@ async def update_customer(customer_id: str, customer_data: CustomerUpdate, db: S
             if existing_kl.id not in provided_ids:
                 soft_delete_record(db, KodeLambung, existing_kl.id)
 
-    audit_service.default_log(
-        entity_id=customer.id,
-        entity_type=AuditEntityEnum.CUSTOMER,
-        description=f"Data Customer {customer.name} telah diubah",
-        user_name=user_name
-    )
-
     db.commit()
     db.refresh(customer)
     return customer
 @router.delete("/{customer_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_customer(customer_id: str, db: Session = Depends(get_db)):
+def delete_customer(customer_id: str, db: Session = Depends(get_db)):
     customer = db.query(Customer).filter(Customer.id == customer_id).first()
 
     if not customer:
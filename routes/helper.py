@@ -1,5 +1,11 @@
 import os
-from fastapi import Request
+from functools import lru_cache
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+from services.pagination_services import PaginationService
 
 
 def generate_attachment_url(file_path: str, request: Request = None) -> str:
@@ -13,4 +19,32 @@ def generate_attachment_url(file_path: str, request: Request = None) -> str:
     else:
         # Fallback to environment variable or default
         base_url = os.getenv("BASE_URL", "http://localhost:8000")
-        return f"{base_url}/static/{clean_path}"
\ No newline at end of file
+        return f"{base_url}/static/{clean_path}"
+
+def paginate_keyset(query, sort, limit: int, cursor: str = None, offset: int = 0, with_total: bool = True, columns=()):
+    """PaginationService.paginate for route handlers: a bad cursor becomes a 400."""
+    try:
+        return PaginationService.paginate(
+            query, sort, limit, cursor=cursor, offset=offset, with_total=with_total, columns=columns,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@lru_cache(maxsize=None)
+def type_adapter(tp) -> TypeAdapter:
+    """One TypeAdapter per response type, built on first use and reused after that."""
+    return TypeAdapter(tp)
+
+
+def validated_json(tp, content, status_code: int = 200) -> Response:
+    """
+    Validate `content` (dicts and / or ORM objects) against `tp` once and
+    serialize it straight to JSON bytes in pydantic-core.
+
+    Returning a Response skips FastAPI's own validate + serialize pass of the
+    route's response_model, which stays on the route for the OpenAPI schema.
+    """
+    adapter = type_adapter(tp)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    return Response(content=body, status_code=status_code, media_type="application/json")
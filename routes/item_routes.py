@@ -1,18 +1,25 @@
 # Standard Library Imports
+import asyncio
+import csv
 import io
+import json
 import os
 import shutil
+import tempfile
 import uuid
 from datetime import date, datetime, time
 from decimal import Decimal
+from itertools import islice
 from typing import Any, Dict, List, Literal, Optional
 
 # ---
 
 # Third-Party Imports
+import numpy as np
 import pandas as pd
 from fastapi import (
     APIRouter,
+    BackgroundTasks,
     Depends,
     File,
     Form,
@@ -21,39 +28,44 @@ from fastapi import (
     UploadFile,
 )
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
 from pydantic import BaseModel  # Added BaseModel from the duplicates
-from sqlalchemy import inspect, or_, text
+from sqlalchemy import inspect, select, text
 from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 from starlette.exceptions import HTTPException
 from starlette.responses import StreamingResponse
 
 # ---
 
 # Local/Application-Specific Imports
-from database import get_db
+from database import SessionLocal, get_db
 from models.InventoryLedger import SourceTypeEnum
 from models.Satuan import  Satuan
 from models.Category import Category
 from models.AllAttachment import AllAttachment, ParentType
-from models.AuditTrail import AuditEntityEnum
 
 from models.Item import Item
+from models.LowStockItem import LowStockItem
 from models.Vendor import Vendor
 from routes.category_routes import _build_categories_lookup
 from routes.satuan_routes import _build_satuans_lookup
 from routes.vendor_routes import _build_vendors_lookup
-from schemas.CategorySchemas import CategoryOut
-from schemas.ItemSchema import ItemResponse, ItemTypeEnum
+from routes.helper import paginate_keyset, validated_json
+from schemas.ItemSchema import ItemResponse, ItemTypeEnum, ItemWithStockResponse, LowStockItemResponse
 from schemas.PaginatedResponseSchemas import PaginatedResponse
-from schemas.SatuanSchemas import SatuanOut
-from schemas.VendorSchemas import VendorOut
-from services.audit_services import AuditService
 from services.fifo_services import FifoService
+from services.image_services import ImageService
+from services.item_import_services import ItemImportService
+from services.low_stock_services import broadcaster as low_stock_broadcaster
+from services.search_services import SearchService
 
 from utils import (
     generate_unique_record_code,
+    generate_unique_record_codes,
     get_current_user_name,
     soft_delete_record,
 )
@@ -91,12 +103,127 @@ class ImportOptions(BaseModel):
 
 
 
+ITEM_EXPORT_YIELD_PER = 2000
+LOW_STOCK_SSE_KEEPALIVE = 15  # seconds between SSE keep-alive comments
+ITEM_EXPORT_WIDTH_SAMPLE = 500
+
+ITEM_EXPORT_HEADERS = [
+    'Type', 'Nama Item', 'SKU', 'Brand', 'Jenis Barang',
+    'Jumlah Unit', 'Harga Modal', 'Harga Jual', 'Satuan Unit',
+]
+
+ITEM_EXPORT_NOTES = [
+    'e.g., High Quality, Raw Material, Service',
+    'Required: Item name',
+    'Required: Unique identifier',
+    'Optional: Brand category name',
+    'Optional: Item category name',
+    'Optional: Current stock quantity',
+    'Optional: Cost price',
+    'Required: Selling price',
+    'Required: Unit symbol (e.g., pcs, kg, m)'
+]
+
+# Map ItemTypeEnum to readable format
+ITEM_EXPORT_TYPE_MAPPING = {
+    ItemTypeEnum.HIGH_QUALITY: "High Quality",
+    ItemTypeEnum.RAW_MATERIAL: "Raw Material",
+    ItemTypeEnum.SERVICE: "Service"
+}
+
+
+def _export_rows(db: Session, stmt, categories: Dict[int, str], satuans: Dict[int, str]):
+    """Yield export rows from a server-side cursor, ITEM_EXPORT_YIELD_PER rows per fetch."""
+    result = db.execute(stmt.execution_options(yield_per=ITEM_EXPORT_YIELD_PER))
+    for row in result:
+        yield [
+            ITEM_EXPORT_TYPE_MAPPING.get(row.type, str(row.type)),
+            row.name,
+            row.sku,
+            categories.get(row.category_one, ''),
+            categories.get(row.category_two, ''),
+            row.total_item if row.total_item else 0,
+            float(row.modal_price) if row.modal_price else 0,
+            float(row.price) if row.price else 0,
+            satuans.get(row.satuan_id, ''),
+        ]
+
+
+def _stream_items_xlsx(stmt, categories: Dict[int, str], satuans: Dict[int, str]):
+    """
+    Write-only workbook fed from the cursor. openpyxl spools rows to a temp
+    file and only zips on save, so the finished file is streamed from disk.
+    Column widths come from the first ITEM_EXPORT_WIDTH_SAMPLE rows.
+    """
+    db = SessionLocal()
+    tmp = tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False)
+    tmp.close()
+    try:
+        rows = _export_rows(db, stmt, categories, satuans)
+        sample = list(islice(rows, ITEM_EXPORT_WIDTH_SAMPLE))
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('Items')
+
+        for col_idx, header in enumerate(ITEM_EXPORT_HEADERS):
+            values = [header, ITEM_EXPORT_NOTES[col_idx]] + [r[col_idx] for r in sample]
+            max_length = max(len(str(v)) for v in values if v not in (None, ''))
+            ws.column_dimensions[get_column_letter(col_idx + 1)].width = min(max_length + 2, 50)
+
+        ws.append(ITEM_EXPORT_HEADERS)
+
+        notes_row = []
+        for note in ITEM_EXPORT_NOTES:
+            cell = WriteOnlyCell(ws, value=note)
+            cell.font = Font(italic=True, size=9)
+            notes_row.append(cell)
+        ws.append(notes_row)
+
+        for row in sample:
+            ws.append(row)
+        for row in rows:
+            ws.append(row)
+
+        wb.save(tmp.name)
+
+        with open(tmp.name, "rb") as f:
+            while True:
+                chunk = f.read(64 * 1024)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        db.close()
+        os.remove(tmp.name)
+
+
+def _stream_items_csv(stmt, categories: Dict[int, str], satuans: Dict[int, str]):
+    """CSV rows go to the socket as they come off the cursor (no notes row, same as the CSV import)."""
+    db = SessionLocal()
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(ITEM_EXPORT_HEADERS)
+
+        for idx, row in enumerate(_export_rows(db, stmt, categories, satuans), start=1):
+            writer.writerow(row)
+            if idx % ITEM_EXPORT_YIELD_PER == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+
+        yield buffer.getvalue()
+    finally:
+        db.close()
+
+
 @router.get("/export-excel")
-async def export_items_to_excel(
+def export_items_to_excel(
         db: Session = Depends(get_db),
         item_type: Optional[ItemTypeEnum] = Query(None, description="Filter by item type"),
         is_active: Optional[bool] = Query(None, description="Filter by active status"),
         include_inactive: bool = Query(False, description="Include inactive items"),
+        format: Literal["xlsx", "csv"] = Query("xlsx", description="xlsx (import template layout) or csv"),
 ):
     """
     Export all items to Excel file using the same template format as import.
@@ -111,130 +238,61 @@ async def export_items_to_excel(
     - Harga Modal
     - Harga Jual
     - Satuan Unit
+
+    Rows are read through a server-side cursor and written incrementally, so
+    memory does not grow with the number of items. format=csv streams directly.
     """
     
     try:
         # Build query with filters
-        query = db.query(Item).filter(Item.deleted_at.is_(None))
+        filters = [Item.deleted_at.is_(None)]
         
         if item_type:
-            query = query.filter(Item.type == item_type)
+            filters.append(Item.type == item_type)
         
         if is_active is not None:
-            query = query.filter(Item.is_active == is_active)
+            filters.append(Item.is_active == is_active)
         elif not include_inactive:
-            query = query.filter(Item.is_active == True)
-        
-        # Get all items
-        items = query.order_by(Item.code).all()
-        
-        if not items:
+            filters.append(Item.is_active == True)
+
+        if db.query(Item.id).filter(*filters).first() is None:
             raise HTTPException(
                 status_code=404,
                 detail="No items found to export"
             )
-        
-        # Build lookup dictionaries for efficient data retrieval
-        category_ids = set()
-        satuan_ids = set()
-        
-        for item in items:
-            if item.category_one:
-                category_ids.add(item.category_one)
-            if item.category_two:
-                category_ids.add(item.category_two)
-            if item.satuan_id:
-                satuan_ids.add(item.satuan_id)
-        
-        # Fetch categories and satuans
-        categories = {}
-        if category_ids:
-            cats = db.query(Category).filter(Category.id.in_(category_ids)).all()
-            categories = {cat.id: cat.name for cat in cats}
-        
-        satuans = {}
-        if satuan_ids:
-            sats = db.query(Satuan).filter(Satuan.id.in_(satuan_ids)).all()
-            satuans = {sat.id: sat.symbol for sat in sats}
-        
-        # Map ItemTypeEnum to readable format
-        type_mapping = {
-            ItemTypeEnum.HIGH_QUALITY: "High Quality",
-            ItemTypeEnum.RAW_MATERIAL: "Raw Material",
-            ItemTypeEnum.SERVICE: "Service"
-        }
-        
-        # Prepare data for DataFrame
-        data = []
-        for item in items:
-            data.append({
-                'Type': type_mapping.get(item.type, str(item.type)),
-                'Nama Item': item.name,
-                'SKU': item.sku,
-                'Brand': categories.get(item.category_one, ''),
-                'Jenis Barang': categories.get(item.category_two, ''),
-                'Jumlah Unit': item.total_item if item.total_item else 0,
-                'Harga Modal': float(item.modal_price) if item.modal_price else 0,
-                'Harga Jual': float(item.price) if item.price else 0,
-                'Satuan Unit': satuans.get(item.satuan_id, '')
-            })
-        
-        # Create DataFrame
-        df = pd.DataFrame(data)
-        
-        # Create Excel file with formatting
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Write the header row
-            df.to_excel(writer, index=False, sheet_name='Items', startrow=0)
-            
-            # Get the worksheet to add notes row
-            worksheet = writer.sheets['Items']
-            
-            # Insert a row for notes after the header
-            worksheet.insert_rows(2)
-            notes = [
-                'e.g., High Quality, Raw Material, Service',
-                'Required: Item name',
-                'Required: Unique identifier',
-                'Optional: Brand category name',
-                'Optional: Item category name',
-                'Optional: Current stock quantity',
-                'Optional: Cost price',
-                'Required: Selling price',
-                'Required: Unit symbol (e.g., pcs, kg, m)'
-            ]
-            
-            for col_idx, note in enumerate(notes, start=1):
-                cell = worksheet.cell(row=2, column=col_idx)
-                cell.value = note
-                cell.font = cell.font.copy(italic=True, size=9)
-            
-            # Auto-adjust column widths
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if cell.value:
-                            max_length = max(max_length, len(str(cell.value)))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        output.seek(0)
-        
+
+        stmt = (
+            select(
+                Item.type, Item.name, Item.sku,
+                Item.category_one, Item.category_two,
+                Item.total_item, Item.modal_price, Item.price, Item.satuan_id,
+            )
+            .where(*filters)
+            .order_by(Item.code)
+        )
+
+        # Master data is small; load it once instead of joining per row
+        categories = dict(db.query(Category.id, Category.name).all())
+        satuans = dict(db.query(Satuan.id, Satuan.symbol).all())
+
         # Generate filename with timestamp
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"items_export_{timestamp}.xlsx"
-        
+
+        if format == "csv":
+            return StreamingResponse(
+                _stream_items_csv(stmt, categories, satuans),
+                media_type="text/csv",
+                headers={
+                    "Content-Disposition": f"attachment; filename=items_export_{timestamp}.csv"
+                }
+            )
+
         # Return as streaming response
         return StreamingResponse(
-            output,
+            _stream_items_xlsx(stmt, categories, satuans),
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             headers={
-                "Content-Disposition": f"attachment; filename={filename}"
+                "Content-Disposition": f"attachment; filename=items_export_{timestamp}.xlsx"
             }
         )
         
@@ -246,7 +304,67 @@ async def export_items_to_excel(
             detail=f"Error exporting items: {str(e)}"
         )
 
+@router.get("/low-stock", response_model=PaginatedResponse[LowStockItemResponse])
+def get_low_stock_items(
+        page: int = 1,
+        rowsPerPage: int = 20,
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides page)"),
+        with_total: bool = Query(True, description="Set false to skip the total count"),
+        db: Session = Depends(get_db),
+):
+    """Items whose open FIFO stock is below min_item, newest crossing first (reads low_stock_items)."""
+    query = db.query(LowStockItem).join(Item, Item.id == LowStockItem.item_id)
 
+    page_result = paginate_keyset(
+        query, [(LowStockItem.since, True), (LowStockItem.item_id, True)], rowsPerPage,
+        cursor=cursor, offset=(page - 1) * rowsPerPage, with_total=with_total,
+        columns=[Item.code, Item.name, Item.sku],
+    )
+
+    data = [
+        {
+            "item_id": row.item_id,
+            "code": code,
+            "name": name,
+            "sku": sku,
+            "min_item": row.min_item,
+            "available_qty": row.available_qty,
+            "shortage": row.min_item - row.available_qty,
+            "since": row.since,
+        }
+        for row, code, name, sku in page_result.rows
+    ]
+    return validated_json(
+        PaginatedResponse[LowStockItemResponse],
+        {"data": data, "total": page_result.total, "next_cursor": page_result.next_cursor},
+    )
+
+
+@router.get("/low-stock/stream")
+async def stream_low_stock(request: Request):
+    """
+    Server-sent events of low-stock threshold crossings ("low" / "recovered"),
+    published after the commit that caused them. Sends a comment every 15s as keep-alive.
+    """
+    queue = low_stock_broadcaster.subscribe()
+
+    async def event_stream():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    evt = await asyncio.wait_for(queue.get(), timeout=LOW_STOCK_SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {evt['event']}\ndata: {json.dumps(evt)}\n\n"
+        finally:
+            low_stock_broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{item_id}", response_model=ItemResponse)
@@ -268,7 +386,7 @@ def get_item_by_id(
     return construct_item_response(db_item, request)
 
 @router.post("", response_model=ItemResponse)
-async def create_item(
+def create_item(
         images: List[UploadFile] = File(default=[]),
         type: ItemTypeEnum = Form(...),
         name: str = Form(...),
@@ -290,8 +408,6 @@ async def create_item(
 
     pattern = get_item_prefix(type)
 
-    audit_service = AuditService(db)
-
     # SKU validation
     existing_item = db.query(Item).filter(Item.sku == sku).first()
     if existing_item:
@@ -346,6 +462,7 @@ async def create_item(
 
                 with open(save_path, "wb") as buffer:
                     shutil.copyfileobj(image.file, buffer)
+                ImageService.schedule_thumbnails(save_path)
 
                 attachment = AllAttachment(
                     parent_type=ParentType.ITEMS,
@@ -361,13 +478,6 @@ async def create_item(
         db.commit()
         db.refresh(db_item)
 
-        audit_service.default_log(
-            entity_id=db_item.id,
-            entity_type=AuditEntityEnum.ITEM,
-            description=f"Item {db_item.name} telah dibuat",
-            user_name=user_name,
-        )
-
         return db_item
 
     except Exception as e:
@@ -389,13 +499,18 @@ def get_items(
         sortBy: Optional[Literal["name", "price", "sku", "created_at"]] = None,
         sortOrder: Optional[Literal["asc", "desc"]] = "asc",
         to_date : Optional[date] = Query(None, description="Filter by date"),
-        from_date : Optional[date] = Query(None, description="Filter by date")
+        from_date : Optional[date] = Query(None, description="Filter by date"),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides page)"),
+        with_total: bool = Query(True, description="Set false to skip the total count"),
+        with_stock: bool = Query(False, description="Attach available_qty, fifo_value and oldest_batch_date from open FIFO batches"),
+        warehouse_id: Optional[int] = Query(None, description="Warehouse for with_stock (unassigned batches are included)"),
 
 ):
     query = db.query(Item).options(
         joinedload(Item.category_one_rel),
         joinedload(Item.category_two_rel),
-        joinedload(Item.vendor_rel),
+        joinedload(Item.vendor_rel).joinedload(Vendor.top_rel),
+        joinedload(Item.vendor_rel).joinedload(Vendor.curr_rel),
         joinedload(Item.satuan_rel),
         joinedload(Item.attachments),
     )
@@ -405,12 +520,7 @@ def get_items(
         query = query.filter(Item.is_deleted == False)
 
     if search_key:
-        query = query.filter(
-            or_(
-                Item.name.ilike(f"%{search_key}%"),
-                Item.sku.ilike(f"%{search_key}%"),
-            )
-        )
+        query = query.filter(Item.id.in_(SearchService.matching_ids("item", search_key)))
     if vendor and vendor != "all":
         query = query.filter(Item.vendor_id == vendor)
 
@@ -433,22 +543,37 @@ def get_items(
     elif to_date:
         query = query.filter(Item.created_at <= datetime.combine(to_date, time.max))
 
-    # Apply sorting - either custom or default
+    # Apply sorting - either custom or default; id breaks ties so the cursor is stable
     if sortBy:
-        sort_column = getattr(Item, sortBy)
-        query = query.order_by(sort_column.desc() if sortOrder == "desc" else sort_column.asc())
+        descending = sortOrder == "desc"
+        sort = [(getattr(Item, sortBy), descending), (Item.id, descending)]
     else:
         # Default sorting when no sortBy is specified
-        query = query.order_by(Item.created_at.desc())
+        sort = [(Item.created_at, True), (Item.id, True)]
+
+    page_result = paginate_keyset(
+        query, sort, rowsPerPage,
+        cursor=cursor, offset=(page - 1) * rowsPerPage, with_total=with_total,
+    )
 
-    total_count = query.count()
-    paginated_data = query.offset((page - 1) * rowsPerPage).limit(rowsPerPage).all()
+    items_out = [construct_item_response(item, request) for item in page_result.rows]
+    response_type = PaginatedResponse[ItemResponse]
 
-    items_out = [construct_item_response(item, request) for item in paginated_data]
+    if with_stock:
+        # one grouped query over open batches for the whole page
+        stock = FifoService.get_stock_summary(
+            db, [item.id for item in page_result.rows], warehouse_id
+        )
+        for item_out in items_out:
+            item_out.update(stock[item_out["id"]])
+        response_type = PaginatedResponse[ItemWithStockResponse]
 
-    return {"data": items_out, "total": total_count}
+    return validated_json(
+        response_type,
+        {"data": items_out, "total": page_result.total, "next_cursor": page_result.next_cursor},
+    )
 
-def _update_existing_item(db: Session, item_data: Dict[str, Any], existing_item_id: int, audit_service: AuditService, user_name: str):
+def _update_existing_item(db: Session, item_data: Dict[str, Any], existing_item_id: int):
     """Update an existing item without changing its code."""
    
 
@@ -500,51 +625,13 @@ def _update_existing_item(db: Session, item_data: Dict[str, Any], existing_item_
             except ValueError as e:
                 raise ValueError(f"Cannot reduce stock for {item.name}: {str(e)}")
 
-    audit_service.default_log(
-        entity_id=item.id,
-        entity_type=AuditEntityEnum.ITEM,
-        description=f"Data item {item.name} telah diupdate via import",
-        user_name=user_name,
-    )
-
     # Flush changes to the database
     db.flush()
 
     return item
 
-def _create_new_item(db: Session, item_data: Dict[str, Any], audit_service: AuditService, user_name: str):
-    """Create a new item and post initial inventory using FIFO."""
-    
-    new_item = Item(**item_data)
-    db.add(new_item)
-    db.flush()
-
-    # Create initial FIFO batch if there's stock
-    if item_data.get('total_item', 0) > 0:
-        unit_price = item_data.get('price', Decimal('0'))
-        qty = item_data['total_item']
-        
-        FifoService.create_batch_from_purchase(
-            source_id=str(new_item.id),
-            source_type=SourceTypeEnum.ITEM,
-            db=db,
-            item_id=new_item.id,
-            warehouse_id=None,  # No warehouse for initial import
-            tanggal_masuk=date.today(),
-            qty_masuk=qty,
-            harga_beli=unit_price
-        )
-
-    audit_service.default_log(
-        entity_id=new_item.id,
-        entity_type=AuditEntityEnum.ITEM,
-        description=f"Data item {new_item.name} telah dibuat via import",
-        user_name=user_name,
-    )
-    return new_item
-
 @router.get("/template/download")
-async def download_item_template(format: str = "xlsx"):
+def download_item_template(format: str = "xlsx"):
     """
     Download item import template in Excel format.
 
@@ -751,7 +838,7 @@ async def download_item_template(format: str = "xlsx"):
 
         
 @router.get("/template/download")
-async def download_item_template(format: str = "xlsx"):
+def download_item_template(format: str = "xlsx"):
     """
     Download item import template in Excel format.
 
@@ -957,6 +1044,179 @@ async def download_item_template(format: str = "xlsx"):
         )
 
 
+IMPORT_COLUMN_MAPPING = {
+    'Type': 'type',
+    'Nama Item': 'name',
+    'SKU': 'sku',
+    'Brand': 'brand',
+    'Jenis Barang': 'jenis_barang',
+    'Jumlah Unit': 'jumlah_unit',
+    'Stock Minimum': 'stock_minimum',
+    'Harga Modal': 'harga_modal',
+    'Harga Jual': 'harga_jual',
+    'Satuan Unit': 'satuan_unit',
+    'Nama Vendor': 'nama_vendor'
+}
+
+IMPORT_REQUIRED_COLUMNS = ['Nama Item', 'SKU', 'Satuan Unit', 'Harga Jual']
+
+
+def _prepare_import_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Clean/rename the template columns and drop rows with neither name nor SKU."""
+    df.columns = [str(col).strip() for col in df.columns]
+
+    missing_columns = [col for col in IMPORT_REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing required columns: {', '.join(missing_columns)}"
+        )
+
+    df = df.rename(columns=IMPORT_COLUMN_MAPPING)
+    return df[~(df['name'].isna() & df['sku'].isna())]
+
+
+def _import_item_frames(
+        db: Session,
+        frames_factory,
+        skip_on_error: bool,
+        update_existing: bool,
+        default_item_type: ItemTypeEnum,
+        user_name: str,
+        progress=None,
+) -> ImportResult:
+    """
+    Import an item file delivered as an iterator of DataFrame chunks.
+
+    Every chunk is validated and inserted on its own, so memory stays bounded
+    by the chunk size. skip_on_error=True commits per chunk (and per updated
+    row). skip_on_error=False is one transaction: the file is validated in a
+    first pass so invalid rows fail before anything is written, chunks run
+    under savepoints and a database error on any row rolls the whole import back.
+    `progress(result)` is called after every chunk.
+    """
+
+    # Build lookup dictionaries
+    vendors_lookup = _build_vendors_lookup(db)
+    categories_lookup = _build_categories_lookup(db)
+    satuans_lookup = _build_satuans_lookup(db)
+    existing_skus = _get_existing_skus(db)
+
+    result = ImportResult(
+        total_processed=0,
+        successful_imports=0,
+        failed_imports=0,
+        errors=[],
+        warnings=[]
+    )
+
+    def record_error(index, sku, error_msg):
+        result.errors.append({
+            'row': index + 3,  # +3 because: +1 for header, +1 for note row, +1 for 1-based indexing
+            'sku': sku,
+            'error': error_msg
+        })
+        result.failed_imports += 1
+
+        if not skip_on_error:
+            db.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail=f"Row {index + 3}: {error_msg}"
+            )
+
+    def split_rows(valid_rows, invalid_rows, file_skus):
+        """Route valid rows to insert / update; duplicate SKUs become errors unless updating."""
+        new_rows = []
+        update_rows = []
+        for index, item_data in valid_rows:
+            sku = item_data['sku']
+            if sku in existing_skus or sku in file_skus:
+                if not update_existing:
+                    invalid_rows.append((index, sku, f"SKU '{sku}' already exists."))
+                    continue
+                update_rows.append((index, item_data))
+            else:
+                file_skus.add(sku)
+                new_rows.append((index, item_data))
+        invalid_rows.sort(key=lambda e: e[0])
+        return new_rows, update_rows
+
+    if not skip_on_error:
+        # Validation-only pass: raise on the first bad row before anything is written
+        file_skus = set()
+        for df in frames_factory():
+            df_filtered = _prepare_import_frame(df)
+            valid_rows, invalid_rows = _validate_frame(
+                df_filtered, categories_lookup, satuans_lookup,
+                existing_skus, default_item_type, update_existing, vendors_lookup
+            )
+            split_rows(valid_rows, invalid_rows, file_skus)
+            if invalid_rows:
+                index, sku, error_msg = invalid_rows[0]
+                record_error(index, sku, error_msg)
+
+    file_skus = set()
+    for df in frames_factory():
+        df_filtered = _prepare_import_frame(df)
+        result.total_processed += len(df_filtered)
+
+        # 1. Validate the whole chunk before touching the database
+        valid_rows, invalid_rows = _validate_frame(
+            df_filtered, categories_lookup, satuans_lookup,
+            existing_skus, default_item_type, update_existing, vendors_lookup
+        )
+        new_rows, update_rows = split_rows(valid_rows, invalid_rows, file_skus)
+        for index, sku, error_msg in invalid_rows:
+            record_error(index, sku, error_msg)
+
+        # 2. Allocate all item codes in one step, then bulk insert
+        codes = generate_unique_record_codes(
+            db, Item, [get_item_prefix(item_data['type']) for _, item_data in new_rows]
+        )
+        for (_, item_data), code in zip(new_rows, codes):
+            item_data['code'] = code
+
+        created, failures = ItemImportService.insert_new_items(db, new_rows, user_name, atomic=not skip_on_error)
+        existing_skus.update(created)
+        result.successful_imports += len(created)
+        for index, item_data, error_msg in failures:
+            record_error(index, item_data['sku'], error_msg)
+
+        # 3. Updates go through FIFO one by one (stock decreases consume batches)
+        for index, item_data in update_rows:
+            try:
+                existing_item_id = existing_skus.get(item_data['sku'])
+                if existing_item_id is None:
+                    raise ValueError(f"Item with SKU '{item_data['sku']}' not found")
+
+                _update_existing_item(db, item_data, existing_item_id)
+                if skip_on_error:
+                    # one commit per row, so a later failing row doesn't roll this one back
+                    db.commit()
+                result.successful_imports += 1
+            except HTTPException:
+                raise
+            except Exception as e:
+                db.rollback()
+                record_error(index, item_data['sku'], str(e))
+
+        if progress is not None:
+            progress(result)
+
+    # skip_on_error=False: nothing was committed yet, the whole import is one transaction
+    db.commit()
+    return result
+
+
+def _check_import_filename(filename: str):
+    if not filename.endswith(('.xlsx', '.xls', '.csv')):
+        raise HTTPException(
+            status_code=400,
+            detail="File must be Excel (.xlsx, .xls) or CSV (.csv)"
+        )
+
+
 @router.post("/import-excel", response_model=ImportResult)
 async def import_items_from_excel(
         db: Session = Depends(get_db),
@@ -982,145 +1242,28 @@ async def import_items_from_excel(
     - Satuan Unit (required, by name)
     - Nama Vendor (optional, by name)
 
-    Note: Item Code will be auto-generated based on item type
+    Note: Item Code will be auto-generated based on item type.
+    The upload is spooled to disk and read in chunks; for very large files use
+    /import-excel/async and poll /import-excel/status/{job_id}.
     """
 
     # Validate file type
-    if not file.filename.endswith(('.xlsx', '.xls', '.csv')):
-        raise HTTPException(
-            status_code=400,
-            detail="File must be Excel (.xlsx, .xls) or CSV (.csv)"
-        )
+    _check_import_filename(file.filename)
 
+    _, spool_path = ItemImportService.new_spool_path(file.filename)
     try:
-        # Read file content
-        content = await file.read()
-        audit_service = AuditService(db)
-
-        # Parse based on file type
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(
-                io.StringIO(content.decode('utf-8')),
-                sep=None,
-                engine='python'
-            )
-        else:
-            # Read Excel, skip the note row (row 2)
-            df = pd.read_excel(
-                io.BytesIO(content),
-                header=0,  # Headers are in row 1 (index 0)
-                skiprows=[1]  # Skip row 2 (index 1) which contains notes
-            )
-
-        # Clean column names
-        df.columns = df.columns.str.strip()
-
-        # Column mapping to match new template - ADDED Stock Minimum
-        column_mapping = {
-            'Type': 'type',
-            'Nama Item': 'name',
-            'SKU': 'sku',
-            'Brand': 'brand',
-            'Jenis Barang': 'jenis_barang',
-            'Jumlah Unit': 'jumlah_unit',
-            'Stock Minimum': 'stock_minimum',  # NEW MAPPING
-            'Harga Modal': 'harga_modal',
-            'Harga Jual': 'harga_jual',
-            'Satuan Unit': 'satuan_unit',
-            'Nama Vendor': 'nama_vendor'
-        }
-
-        # Required columns
-        required_columns = ['Nama Item', 'SKU', 'Satuan Unit', 'Harga Jual']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Missing required columns: {', '.join(missing_columns)}"
-            )
-
-        # Rename columns
-        df = df.rename(columns=column_mapping)
-
-        # Build lookup dictionaries
-        vendors_lookup = _build_vendors_lookup(db)
-        categories_lookup = _build_categories_lookup(db)
-        satuans_lookup = _build_satuans_lookup(db)
-        existing_skus = _get_existing_skus(db)
-
-        # Initialize result
-        result = ImportResult(
-            total_processed=0,
-            successful_imports=0,
-            failed_imports=0,
-            errors=[],
-            warnings=[]
+        await ItemImportService.spool_upload(file, spool_path)
+
+        # parsing + per-row DB work is blocking: keep it off the event loop
+        return await run_in_threadpool(
+            _import_item_frames,
+            db,
+            lambda: ItemImportService.iter_frames(spool_path),
+            skip_on_error, update_existing, default_item_type, user_name
         )
 
-        # Filter out empty rows (where name and sku are both empty)
-        df_filtered = df[
-            ~(df['name'].isna() & df['sku'].isna())
-        ].copy()
-
-        result.total_processed = len(df_filtered)
-
-        # Process each row
-        for index, row in df_filtered.iterrows():
-            try:
-                item_data = _process_row(
-                    row, index, categories_lookup, satuans_lookup,
-                    existing_skus, default_item_type, update_existing, vendors_lookup
-                )
-
-                if item_data is None:
-                    continue
-
-                # Check if item exists
-                existing_item = db.query(Item).filter(
-                    Item.sku == item_data['sku'],
-                    Item.deleted_at.is_(None)
-                ).first()
-
-                if update_existing and existing_item:
-                    _update_existing_item(
-                        db, item_data, existing_item.id,
-                        audit_service, user_name
-                    )
-                else:
-                    # Generate unique code
-                    prefix = get_item_prefix(item_data['type'])
-                    item_code = generate_unique_record_code(db, Item, prefix)
-                    item_data['code'] = item_code
-
-                    # Create new item
-                    new_item = _create_new_item(
-                        db, item_data, audit_service, user_name
-                    )
-                    existing_skus[item_data['sku']] = new_item.id
-
-                result.successful_imports += 1
-
-            except Exception as e:
-                error_msg = str(e)
-                result.errors.append({
-                    'row': index + 3,  # +3 because: +1 for header, +1 for note row, +1 for 1-based indexing
-                    'sku': row.get('sku', 'N/A'),
-                    'error': error_msg
-                })
-                result.failed_imports += 1
-
-                if not skip_on_error:
-                    db.rollback()
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Row {index + 3}: {error_msg}"
-                    )
-
-        # Commit all changes
-        db.commit()
-
-        return result
-
+    except HTTPException:
+        raise
     except pd.errors.EmptyDataError:
         raise HTTPException(
             status_code=400,
@@ -1137,6 +1280,94 @@ async def import_items_from_excel(
             status_code=400,
             detail=f"{str(e)}"
         )
+    finally:
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+
+
+def _run_import_job(
+        job_id: str,
+        spool_path: str,
+        skip_on_error: bool,
+        update_existing: bool,
+        default_item_type: ItemTypeEnum,
+        user_name: str,
+):
+    """Background worker for /import-excel/async; owns its own session."""
+    db = SessionLocal()
+
+    def progress(result: ImportResult):
+        ItemImportService.write_status(
+            job_id,
+            status="running",
+            total_processed=result.total_processed,
+            successful_imports=result.successful_imports,
+            failed_imports=result.failed_imports,
+        )
+
+    try:
+        ItemImportService.write_status(job_id, status="running")
+        result = _import_item_frames(
+            db,
+            lambda: ItemImportService.iter_frames(spool_path),
+            skip_on_error, update_existing, default_item_type, user_name,
+            progress=progress,
+        )
+        ItemImportService.write_status(job_id, status="completed", finished_at=datetime.now().isoformat(), **result.dict())
+    except HTTPException as e:
+        db.rollback()
+        ItemImportService.write_status(job_id, status="failed", detail=e.detail, finished_at=datetime.now().isoformat())
+    except Exception as e:
+        db.rollback()
+        ItemImportService.write_status(job_id, status="failed", detail=str(e), finished_at=datetime.now().isoformat())
+    finally:
+        db.close()
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+
+
+@router.post("/import-excel/async", status_code=202)
+async def import_items_from_excel_async(
+        background_tasks: BackgroundTasks,
+        file: UploadFile = File(...),
+        skip_on_error: bool = Query(True, description="Skip rows with errors instead of failing completely"),
+        update_existing: bool = Query(False, description="Update existing items if SKU already exists"),
+        default_item_type: ItemTypeEnum = Query(ItemTypeEnum.HIGH_QUALITY, description="Default item type if not specified"),
+        user_name: str = Depends(get_current_user_name)
+):
+    """
+    Same import as /import-excel, run in the background for large files.
+    Returns a job_id; poll /item/import-excel/status/{job_id} for progress.
+    """
+    _check_import_filename(file.filename)
+
+    job_id, spool_path = ItemImportService.new_spool_path(file.filename)
+    size = await ItemImportService.spool_upload(file, spool_path)
+
+    ItemImportService.write_status(
+        job_id,
+        status="queued",
+        filename=file.filename,
+        file_size=size,
+        total_processed=0,
+        successful_imports=0,
+        failed_imports=0,
+        started_at=datetime.now().isoformat(),
+    )
+    background_tasks.add_task(
+        _run_import_job, job_id, spool_path,
+        skip_on_error, update_existing, default_item_type, user_name
+    )
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.get("/import-excel/status/{job_id}")
+def get_import_status(job_id: str):
+    """Progress of an /import-excel/async job (errors are included once it completes)."""
+    status = ItemImportService.read_status(job_id) if job_id.isalnum() else None
+    if status is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return status
 
 
 def _get_existing_skus(db: Session) -> Dict[str, int]:
@@ -1147,152 +1378,156 @@ def _get_existing_skus(db: Session) -> Dict[str, int]:
     return {item.sku: item.id for item in items}
 
 
-def _process_row(
-        row,
-        index: int,
-        categories_lookup: Dict[str, int],
-        satuans_lookup: Dict[str, int],
-        existing_skus: Dict[str, int],
-        default_item_type: ItemTypeEnum,
-        update_existing: bool,
-        vendors_lookup: Dict[str, int],
-) -> Optional[Dict[str, Any]]:
-    """Process a single row from the Excel file."""
+ITEM_TYPE_MAPPING = {
+    "high quality": ItemTypeEnum.HIGH_QUALITY,
+    "raw material": ItemTypeEnum.RAW_MATERIAL,
+    "service": ItemTypeEnum.SERVICE,
+}
 
-    # Validate required fields
-    if pd.isna(row.get('name')) or not str(row.get('name')).strip():
-        raise ValueError("Nama Item is required")
 
-    if pd.isna(row.get('sku')) or not str(row.get('sku')).strip():
-        raise ValueError("SKU is required")
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    """Column as object Series; optional template columns may be absent."""
+    if name in df.columns:
+        return df[name].astype(object)
+    return pd.Series([None] * len(df), index=df.index, dtype=object)
 
-    if pd.isna(row.get('satuan_unit')) or not str(row.get('satuan_unit')).strip():
-        raise ValueError("Satuan Unit is required")
 
-    sku = str(row['sku']).strip()
+def _text(series: pd.Series) -> pd.Series:
+    """str(value).strip() for every cell, '' for empty cells."""
+    return series.where(series.notna(), "").astype(str).str.strip()
 
-    # Check for duplicate SKU
-    if sku in existing_skus and not update_existing:
-        raise ValueError(f"SKU '{sku}' already exists.")
 
-    # Validate Satuan Unit
-    satuan_symbol = str(row['satuan_unit']).lower().strip()
-    satuan_id = satuans_lookup.get(satuan_symbol)
-    if not satuan_id:
-        raise ValueError(
-            f"Satuan '{row['satuan_unit']}' tidak ditemukan. "
-            f"Tambahkan entri terlebih dahulu."
-        )
+def _lookup(keys: pd.Series, lookup: Dict[str, Any]) -> pd.Series:
+    """Series.map against a _build_*_lookup dict, None where not found."""
+    mapped = keys.map(pd.Series(lookup, dtype=object)).astype(object)
+    return mapped.where(mapped.notna(), None)
 
-    # Process Brand (Category One)
-    category_one_id = None
-    if not pd.isna(row.get('brand')) and str(row.get('brand')).strip():
-        cat1_name = str(row['brand']).lower().strip()
-        category_one_id = categories_lookup.get(cat1_name)
-        if not category_one_id:
-            raise ValueError(
-                f"Brand '{row['brand']}' tidak ditemukan. "
-                f"Tambahkan entri terlebih dahulu."
-            )
 
-    # Process Jenis Barang (Category Two)
-    category_two_id = None
-    if not pd.isna(row.get('jenis_barang')) and str(row.get('jenis_barang')).strip():
-        cat2_name = str(row['jenis_barang']).lower().strip()
-        category_two_id = categories_lookup.get(cat2_name)
-        if not category_two_id:
-            raise ValueError(
-                f"Jenis Barang '{row['jenis_barang']}' tidak ditemukan. "
-                f"Tambahkan entri terlebih dahulu."
-            )
-            
-    vendor_id = None
-    if not pd.isna(row.get('nama_vendor')) and str(row.get('nama_vendor')).strip():
-        vendor_name = str(row['nama_vendor']).lower().strip()
-        vendor_id = vendors_lookup.get(vendor_name)
-        if not vendor_id:
-            raise ValueError(
-                f"Vendor '{row['nama_vendor']}' tidak ditemukan. "
-                f"Tambahkan entri terlebih dahulu."
-            )
+def _parse_price(series: pd.Series):
+    """Decimal-comma aware price parsing. Returns (valid mask, text to feed Decimal)."""
+    text = _text(series).str.replace(",", ".", regex=False)
+    empty = series.isna() | text.eq("")
+    number = pd.to_numeric(text.where(~empty, "0"), errors="coerce")
+    valid = number.notna() & np.isfinite(number) & (number >= 0)
+    return valid, text.where(~empty, "0")
 
-    # Process Harga Modal (Cost Price)
-    try:
-        if pd.isna(row.get('harga_modal')) or str(row.get('harga_modal')).strip() == '':
-            modal_price = Decimal('0')
-        else:
-            # Handle both comma and dot as decimal separators
-            cost_value = str(row['harga_modal']).replace(',', '.')
-            modal_price = Decimal(cost_value)
-            if modal_price < 0:
-                raise ValueError("Harga Modal must be positive")
-    except (ValueError, TypeError) as e:
-        raise ValueError(f"Invalid Harga Modal: {row.get('harga_modal', 'N/A')}")
-
-    # Process Harga Jual (Selling Price)
-    try:
-        if pd.isna(row.get('harga_jual')) or str(row.get('harga_jual')).strip() == '':
-            selling_price = Decimal('0')
-        else:
-            # Handle both comma and dot as decimal separators
-            sell_value = str(row['harga_jual']).replace(',', '.')
-            selling_price = Decimal(sell_value)
-            if selling_price < 0:
-                raise ValueError("Harga Jual must be positive")
-    except (ValueError, TypeError) as e:
-        raise ValueError(f"Invalid Harga Jual: {row.get('harga_jual', 'N/A')}")
-
-    # Process Jumlah Unit (Quantity)
-    total_item = 0
-    if not pd.isna(row.get('jumlah_unit')):
-        try:
-            total_item = int(float(row['jumlah_unit']))
-            if total_item < 0:
-                raise ValueError("Jumlah Unit must be non-negative")
-        except (ValueError, TypeError):
-            raise ValueError(f"Invalid Jumlah Unit: {row.get('jumlah_unit', 'N/A')}")
-
-    # Process Stock Minimum (NEW)
-    min_item = 0
-    if not pd.isna(row.get('stock_minimum')):
-        try:
-            min_item = int(float(row['stock_minimum']))
-            if min_item < 0:
-                raise ValueError("Stock Minimum must be non-negative")
-        except (ValueError, TypeError):
-            raise ValueError(f"Invalid Stock Minimum: {row.get('stock_minimum', 'N/A')}")
-
-    # Process Type column
-    type_value = str(row.get('type', '')).strip().lower() if not pd.isna(row.get('type')) else None
-    type_mapping = {
-        "high quality": ItemTypeEnum.HIGH_QUALITY,
-        "raw material": ItemTypeEnum.RAW_MATERIAL,
-        "service": ItemTypeEnum.SERVICE,
-    }
 
-    if type_value and type_value in type_mapping:
-        item_type = type_mapping[type_value]
-    else:
-        item_type = default_item_type
+def _parse_quantity(series: pd.Series):
+    """int(float(value)) semantics, empty cells count as 0. Returns (valid mask, ints)."""
+    number = pd.to_numeric(series, errors="coerce")
+    missing = series.isna()
+    valid = missing | (number.notna() & np.isfinite(number) & (number >= 0))
+    return valid, np.trunc(number.where(valid & ~missing, 0)).astype("int64")
 
-    return {
-        'name': str(row['name']).strip(),
-        'sku': sku,
-        'type': item_type,
-        'total_item': total_item,
-        'min_item': min_item,  # NEW FIELD
-        'modal_price': modal_price,  # Harga Modal
-        'price': selling_price,    # Harga Jual
-        'category_one': category_one_id,
-        'category_two': category_two_id,
-        'satuan_id': satuan_id,
-        'vendor_id': vendor_id,
-        'is_active': True
+
+def _validate_frame(
+        df: pd.DataFrame,
+        categories_lookup: Dict[str, int],
+        satuans_lookup: Dict[str, int],
+        existing_skus: Dict[str, int],
+        default_item_type: ItemTypeEnum,
+        update_existing: bool,
+        vendors_lookup: Dict[str, int],
+):
+    """
+    Validate a whole import frame column by column.
+
+    Each check produces a boolean mask; a row keeps the message of the first
+    check it fails, in the same order and wording the row-by-row validator used.
+
+    Returns (valid rows as [(index, item_data)], errors as [(index, sku, message)]).
+    """
+    if df.empty:
+        return [], []
+
+    name_raw = _column(df, 'name')
+    sku_raw = _column(df, 'sku')
+    satuan_raw = _column(df, 'satuan_unit')
+    brand_raw = _column(df, 'brand')
+    jenis_raw = _column(df, 'jenis_barang')
+    vendor_raw = _column(df, 'nama_vendor')
+    modal_raw = _column(df, 'harga_modal')
+    jual_raw = _column(df, 'harga_jual')
+    qty_raw = _column(df, 'jumlah_unit')
+    min_raw = _column(df, 'stock_minimum')
+    type_raw = _column(df, 'type')
+
+    name = _text(name_raw)
+    sku = _text(sku_raw)
+    satuan_key = _text(satuan_raw).str.lower()
+    brand_key = _text(brand_raw).str.lower()
+    jenis_key = _text(jenis_raw).str.lower()
+    vendor_key = _text(vendor_raw).str.lower()
+
+    satuan_id = _lookup(satuan_key, satuans_lookup)
+    category_one_id = _lookup(brand_key, categories_lookup)
+    category_two_id = _lookup(jenis_key, categories_lookup)
+    vendor_id = _lookup(vendor_key, vendors_lookup)
+
+    modal_valid, modal_text = _parse_price(modal_raw)
+    jual_valid, jual_text = _parse_price(jual_raw)
+    qty_valid, total_item = _parse_quantity(qty_raw)
+    min_valid, min_item = _parse_quantity(min_raw)
+
+    def raw_text(series):
+        return series.astype(str)
+
+    suffix = "' tidak ditemukan. Tambahkan entri terlebih dahulu."
+    checks = [
+        (name.eq(""), "Nama Item is required"),
+        (sku.eq(""), "SKU is required"),
+        (satuan_key.eq(""), "Satuan Unit is required"),
+        (sku.isin(existing_skus.keys()) & (not update_existing),
+         "SKU '" + sku + "' already exists."),
+        (satuan_id.isna(), "Satuan '" + raw_text(satuan_raw) + suffix),
+        (brand_key.ne("") & category_one_id.isna(), "Brand '" + raw_text(brand_raw) + suffix),
+        (jenis_key.ne("") & category_two_id.isna(), "Jenis Barang '" + raw_text(jenis_raw) + suffix),
+        (vendor_key.ne("") & vendor_id.isna(), "Vendor '" + raw_text(vendor_raw) + suffix),
+        (~modal_valid, "Invalid Harga Modal: " + raw_text(modal_raw)),
+        (~jual_valid, "Invalid Harga Jual: " + raw_text(jual_raw)),
+        (~qty_valid, "Invalid Jumlah Unit: " + raw_text(qty_raw)),
+        (~min_valid, "Invalid Stock Minimum: " + raw_text(min_raw)),
+    ]
+
+    error = pd.Series(None, index=df.index, dtype=object)
+    for mask, message in checks:
+        error = error.where(error.notna() | ~mask, message)
+
+    failed = error.notna()
+    errors = [
+        (index, None if pd.isna(raw_sku) else raw_sku, message)
+        for index, raw_sku, message in zip(
+            df.index[failed], sku_raw[failed].tolist(), error[failed].tolist()
+        )
+    ]
+
+    ok = ~failed
+    item_type = type_raw.where(type_raw.isna(), _text(type_raw).str.lower()).map(ITEM_TYPE_MAPPING)
+    item_type = item_type.where(item_type.notna(), default_item_type)
+
+    columns = {
+        'name': name[ok].tolist(),
+        'sku': sku[ok].tolist(),
+        'type': item_type[ok].tolist(),
+        'total_item': total_item[ok].tolist(),
+        'min_item': min_item[ok].tolist(),
+        'modal_price': [Decimal(v) for v in modal_text[ok].tolist()],
+        'price': [Decimal(v) for v in jual_text[ok].tolist()],
+        'category_one': category_one_id[ok].tolist(),
+        'category_two': category_two_id[ok].tolist(),
+        'satuan_id': satuan_id[ok].tolist(),
+        'vendor_id': vendor_id[ok].tolist(),
     }
+    keys = list(columns.keys())
+    rows = [
+        (index, dict(zip(keys, values), is_active=True))
+        for index, values in zip(df.index[ok].tolist(), zip(*columns.values()))
+    ]
+    return rows, errors
 
     
 @router.put("/{item_id}", response_model=ItemResponse)
-async def update_item(
+def update_item(
         request: Request,
         item_id: int,
         type: ItemTypeEnum = Form(...),
@@ -1317,8 +1552,6 @@ async def update_item(
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB per file
     MAX_TOTAL_SIZE = 30 * 1024 * 1024  # 30MB total
 
-    audit_service = AuditService(db)
-
     total_size = 0
     for image in images:
         if image.filename:
@@ -1408,6 +1641,7 @@ async def update_item(
 
                 with open(save_path, "wb") as buffer:
                     shutil.copyfileobj(image.file, buffer)
+                ImageService.schedule_thumbnails(save_path)
 
                 attachment = AllAttachment(
                     parent_type=ParentType.ITEMS,
@@ -1423,13 +1657,6 @@ async def update_item(
         db.commit()
         db.refresh(db_item)
 
-        audit_service.default_log(
-            entity_id=db_item.id,
-            entity_type=AuditEntityEnum.ITEM,
-            description=f"Item {db_item.name} telah diubah",
-            user_name=user_name,
-        )
-
         return construct_item_response(db_item, request)
 
     except HTTPException:
@@ -1462,21 +1689,11 @@ def delete_item(item_id: int, db: Session = Depends(get_db)):
 
 
 def construct_item_response(item: Item, request: Request) -> Dict[str, Any]:
-    static_url = os.environ.get("BASE_URL", "http://localhost:8000/static")
-
-    enriched_attachments = []
-    for att in item.attachments:
-        clean_path = att.file_path.replace("\\", "/").replace("uploads/", "")
-        enriched_attachments.append({
-            "id": att.id,
-            "filename": att.filename,
-            "file_path": att.file_path,
-            "file_size": att.file_size,
-            "mime_type": att.mime_type,
-            "created_at": att.created_at,
-            "url": f"{static_url}/{clean_path}",
-        })
-
+    """
+    ItemResponse payload for one item. Relations and attachments are passed as
+    ORM objects and validated by ItemResponse itself (from_attributes), so they
+    go through pydantic once; the attachment url is its computed field.
+    """
     return {
         "id": item.id,
         "type": item.type,
@@ -1491,9 +1708,9 @@ def construct_item_response(item: Item, request: Request) -> Dict[str, Any]:
         "is_active": item.is_active,
 
         "created_at": getattr(item, "created_at", None),
-        "category_one_rel": CategoryOut.model_validate(item.category_one_rel).model_dump() if item.category_one_rel else None,
-        "category_two_rel": CategoryOut.model_validate(item.category_two_rel).model_dump() if item.category_two_rel else None,
-        "satuan_rel": SatuanOut.model_validate(item.satuan_rel).model_dump() if item.satuan_rel else None,
-        "vendor_rel": VendorOut.model_validate(item.vendor_rel).model_dump() if item.vendor_rel else None,
-        "attachments": enriched_attachments,
+        "category_one_rel": item.category_one_rel,
+        "category_two_rel": item.category_two_rel,
+        "satuan_rel": item.satuan_rel,
+        "vendor_rel": item.vendor_rel,
+        "attachments": item.attachments,
     }
@@ -6,16 +6,19 @@ from typing import List, Optional
 from database import get_db
 from models.KodeLambung import KodeLambung
 from schemas.KodeLambungSchema import KodeLambungCreate, KodeLambungUpdate, KodeLambungResponse
+from routes.helper import paginate_keyset
 from schemas.PaginatedResponseSchemas import PaginatedResponse
 from models.Customer import Customer
 router = APIRouter()
 
 
 @router.get("", response_model=PaginatedResponse[KodeLambungResponse])
-async def get_all_kode_lambung(
+def get_all_kode_lambung(
         search: Optional[str] = Query(None, description="Search by name"),
         page: int = Query(1, ge=1),
         size: int = Query(50, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides page)"),
+        with_total: bool = Query(True, description="Set false to skip the total count"),
         contains_deleted: Optional[bool] = False,
         db: Session = Depends(get_db),
         customer_id: Optional[int] = None
@@ -34,28 +37,28 @@ async def get_all_kode_lambung(
             Customer.id == customer_id,
             Customer.is_deleted == False
         )
-    query = query.order_by(KodeLambung.name)
-
-    total = query.count()
-    offset = (page - 1) * size
-    items = query.offset(offset).limit(size).all()
+    page_result = paginate_keyset(
+        query, [(KodeLambung.name, False), (KodeLambung.id, False)], size,
+        cursor=cursor, offset=(page - 1) * size, with_total=with_total,
+    )
 
     return {
-        "data": items,
-        "total": total,
+        "data": page_result.rows,
+        "total": page_result.total,
+        "next_cursor": page_result.next_cursor,
         "page": page,
         "size": size,
     }
 
 @router.get("/all", response_model=List[KodeLambungResponse])
-async def get_all_kode_lambung_no_pagination(db: Session = Depends(get_db)):
+def get_all_kode_lambung_no_pagination(db: Session = Depends(get_db)):
     """Get all kode lambung without pagination (for dropdowns)"""
     items = db.query(KodeLambung).filter(KodeLambung.is_deleted == False).order_by(KodeLambung.name).all()
     return items
 
 
 @router.get("/{kode_lambung_id}", response_model=KodeLambungResponse)
-async def get_kode_lambung(kode_lambung_id: int, db: Session = Depends(get_db)):
+def get_kode_lambung(kode_lambung_id: int, db: Session = Depends(get_db)):
     """Get single kode lambung by ID"""
     kode_lambung = db.query(KodeLambung).filter(
         KodeLambung.id == kode_lambung_id,
@@ -69,7 +72,7 @@ async def get_kode_lambung(kode_lambung_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=KodeLambungResponse)
-async def create_kode_lambung(request: KodeLambungCreate, db: Session = Depends(get_db)):
+def create_kode_lambung(request: KodeLambungCreate, db: Session = Depends(get_db)):
     """Create new kode lambung"""
     # Check for duplicate name
     existing = db.query(KodeLambung).filter(
@@ -89,7 +92,7 @@ async def create_kode_lambung(request: KodeLambungCreate, db: Session = Depends(
 
 
 @router.put("/{kode_lambung_id}", response_model=KodeLambungResponse)
-async def update_kode_lambung(
+def update_kode_lambung(
     kode_lambung_id: int, 
     request: KodeLambungUpdate, 
     db: Session = Depends(get_db)
@@ -127,7 +130,7 @@ async def update_kode_lambung(
 
 
 @router.delete("/{kode_lambung_id}")
-async def delete_kode_lambung(kode_lambung_id: int, db: Session = Depends(get_db)):
+def delete_kode_lambung(kode_lambung_id: int, db: Session = Depends(get_db)):
     """Soft delete kode lambung"""
     kode_lambung = db.query(KodeLambung).filter(
         KodeLambung.id == kode_lambung_id,
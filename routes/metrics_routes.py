@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+
+from database import pool_status
+from services.loop_monitor_services import monitor
+
+router = APIRouter()
+
+
+@router.get("/db-pool")
+def get_db_pool_metrics():
+    """Connection pool occupancy, checkout latency and wait / timeout counters of this worker."""
+    return pool_status()
+
+
+@router.get("/event-loop")
+def get_event_loop_metrics():
+    """Event loop lag watchdog (LOOP_MONITOR=true): max lag and the latest stalls with the requests in flight."""
+    return monitor.snapshot()
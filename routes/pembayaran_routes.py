@@ -10,6 +10,7 @@ from models.AuditTrail import AuditEntityEnum
 from models.Pembayaran import Pembayaran, PembayaranDetails, PembayaranPengembalianType
 from models.Pembelian import Pembelian, StatusPembayaranEnum, StatusPembelianEnum
 from models.Penjualan import Penjualan
+from routes.helper import paginate_keyset
 from schemas.PembayaranSchemas import (
     PembayaranCreate, PembayaranUpdate, PembayaranResponse,
     PembayaranListResponse, PembayaranFilter, PembayaranDetailResponse
@@ -225,17 +226,12 @@ def get_pembayarans(
         search : Optional[str] = Query(None, description="Search by payment number or notes"),
         to_date : Optional[date] = Query(None, description="Filter by date"),
         from_date : Optional[date] = Query(None, description="Filter by date"),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides skip)"),
+        with_total: bool = Query(True, description="Set false to skip the total count"),
 ):
     """Get list of payment records with filtering"""
 
-    query = db.query(Pembayaran).filter().order_by(
-        cast(func.substr(Pembayaran.no_pembayaran,
-                         func.length(Pembayaran.no_pembayaran) - 3), Integer).desc(),
-
-        cast(func.substr(Pembayaran.no_pembayaran,
-                         func.length(Pembayaran.no_pembayaran) - 6, 2), Integer).desc(),
-        cast(func.substr(Pembayaran.no_pembayaran, 7, 4), Integer).desc()
-    )
+    query = db.query(Pembayaran)
 
     if reference_type and reference_type != "ALL":
         query = query.filter(Pembayaran.reference_type == reference_type)
@@ -261,22 +257,35 @@ def get_pembayarans(
             Pembayaran.no_pembayaran.ilike(f"%{search}%"),
         ))
 
-    total = query.count()
+    sort = [
+        (cast(func.substr(Pembayaran.no_pembayaran,
+                          func.length(Pembayaran.no_pembayaran) - 3), Integer), True),
+        (cast(func.substr(Pembayaran.no_pembayaran,
+                          func.length(Pembayaran.no_pembayaran) - 6, 2), Integer), True),
+        (cast(func.substr(Pembayaran.no_pembayaran, 7, 4), Integer), True),
+        (Pembayaran.created_at, True),
+        (Pembayaran.id, True),
+    ]
 
     # Get paginated results with relationships
-    pembayarans = query.options(
-        joinedload(Pembayaran.pembayaran_details).joinedload(PembayaranDetails.pembelian_rel),
-        joinedload(Pembayaran.pembayaran_details).joinedload(PembayaranDetails.penjualan_rel),
-        joinedload(Pembayaran.customer_rel),
-        joinedload(Pembayaran.vend_rel),
-        joinedload(Pembayaran.curr_rel)
-    ).order_by(Pembayaran.created_at.desc()).offset(skip).limit(limit).all()
+    page_result = paginate_keyset(
+        query.options(
+            joinedload(Pembayaran.pembayaran_details).joinedload(PembayaranDetails.pembelian_rel),
+            joinedload(Pembayaran.pembayaran_details).joinedload(PembayaranDetails.penjualan_rel),
+            joinedload(Pembayaran.customer_rel),
+            joinedload(Pembayaran.vend_rel),
+            joinedload(Pembayaran.curr_rel)
+        ),
+        sort, limit,
+        cursor=cursor, offset=skip, with_total=with_total,
+    )
 
     return PembayaranListResponse(
-        data=pembayarans,
-        total=total,
+        data=page_result.rows,
+        total=page_result.total,
         skip=skip,
-        limit=limit
+        limit=limit,
+        next_cursor=page_result.next_cursor,
     )
 
 @router.get("/{pembayaran_id}", response_model=PembayaranResponse)
@@ -1,9 +1,8 @@
-import base64
 
 from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Query, status
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session, selectinload, joinedload
-from sqlalchemy import and_, func, desc, cast, Integer
+from sqlalchemy import and_, func, select
 from typing import List, Optional
 import uuid
 import os
@@ -12,9 +11,10 @@ import enum
 from datetime import datetime, date, time
 from decimal import Decimal
 
-from starlette.responses import HTMLResponse
+from starlette.responses import HTMLResponse, Response
 
 from database import get_db
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
 
 from models.AuditTrail import AuditEntityEnum
@@ -24,11 +24,15 @@ from models.Item import Item
 from models.Pembelian import Pembelian, StatusPembelianEnum,PembelianItem, StatusPembayaranEnum
 from models.AllAttachment import ParentType, AllAttachment
 from routes.upload_routes import get_public_image_url, to_public_image_url, templates
+from routes.helper import paginate_keyset, validated_json
 from schemas.PaginatedResponseSchemas import PaginatedResponse
 from schemas.PembelianSchema import TotalsResponse, PembelianListResponse, PembelianResponse, PembelianCreate, \
     PembelianUpdate, PembelianStatusUpdate, UploadResponse, SuccessResponse
 from services.audit_services import AuditService
 from services.fifo_services import FifoService
+from schemas.InvoiceSchemas import InvoicePdfBatchRequest
+from services.invoice_services import InvoiceService
+from services.search_services import SearchService
 from utils import generate_unique_record_number, get_current_user_name
 
 router = APIRouter()
@@ -91,17 +95,13 @@ def update_item_stock(db: Session, item_id: int, qty_change: int) -> None:
     # Apply the quantity change (for purchases, this should be positive to add stock)
     item.total_item = item.total_item + qty_change
 
-def calculate_pembelian_totals(db: Session, pembelian_id: int, user_name: str, msg: str):
-    audit_service = AuditService(db)
-    items = db.query(PembelianItem).filter(PembelianItem.pembelian_id == pembelian_id).all()
-
+def compute_pembelian_totals(pembelian: Pembelian, items) -> dict:
+    """Pembelian totals without writing anything (calculate_pembelian_totals persists them)."""
     total_subtotal = Decimal('0')
     total_discount = Decimal('0')
     total_tax = Decimal('0')
 
     for line in items:
-        calculate_item_totals(line)
-
         qty = Decimal(str(line.qty or 0))
         unit = Decimal(str(line.unit_price or 0))
         tax_pct = Decimal(str(line.tax_percentage or 0))
@@ -118,10 +118,6 @@ def calculate_pembelian_totals(db: Session, pembelian_id: int, user_name: str, m
         total_discount += discount
         total_tax += line_tax
 
-    pembelian = db.query(Pembelian).filter(Pembelian.id == pembelian_id).first()
-    if not pembelian:
-        raise HTTPException(status_code=404, detail="Pembelian not found")
-
     additional_discount = Decimal(str(pembelian.additional_discount or 0))
     expense = Decimal(str(pembelian.expense or 0))
 
@@ -130,13 +126,39 @@ def calculate_pembelian_totals(db: Session, pembelian_id: int, user_name: str, m
     final_total_before_tax = subtotal_after_item_discounts - additional_discount
     total_price = final_total_before_tax + total_tax + expense
 
+    return {
+        "total_subtotal": total_subtotal,
+        "total_discount": total_discount,
+        "additional_discount": additional_discount,
+        "subtotal_after_item_discounts": subtotal_after_item_discounts,
+        "total_before_discount": final_total_before_tax,
+        "total_tax": total_tax,
+        "expense": expense,
+        "total_price": total_price,
+    }
+
+
+def calculate_pembelian_totals(db: Session, pembelian_id: int, user_name: str, msg: str):
+    audit_service = AuditService(db)
+    items = db.query(PembelianItem).filter(PembelianItem.pembelian_id == pembelian_id).all()
+
+    for line in items:
+        calculate_item_totals(line)
+
+    pembelian = db.query(Pembelian).filter(Pembelian.id == pembelian_id).first()
+    if not pembelian:
+        raise HTTPException(status_code=404, detail="Pembelian not found")
+
+    totals = compute_pembelian_totals(pembelian, items)
+    total_price = totals["total_price"]
+
     # Persist to database
-    pembelian.total_subtotal = total_subtotal
-    pembelian.total_discount = total_discount
-    pembelian.additional_discount = additional_discount
-    pembelian.total_before_discount = final_total_before_tax  
-    pembelian.total_tax = total_tax
-    pembelian.expense = expense
+    pembelian.total_subtotal = totals["total_subtotal"]
+    pembelian.total_discount = totals["total_discount"]
+    pembelian.additional_discount = totals["additional_discount"]
+    pembelian.total_before_discount = totals["total_before_discount"]
+    pembelian.total_tax = totals["total_tax"]
+    pembelian.expense = totals["expense"]
     pembelian.total_price = total_price
 
     # Fixed: Only log if msg is provided and not empty
@@ -150,17 +172,7 @@ def calculate_pembelian_totals(db: Session, pembelian_id: int, user_name: str, m
 
     db.commit()
 
-    # FIXED: Added the missing key that your invoice expects
-    return {
-        "total_subtotal": total_subtotal,
-        "total_discount": total_discount,
-        "additional_discount": additional_discount,
-        "subtotal_after_item_discounts": subtotal_after_item_discounts,  # <-- ADDED THIS
-        "total_before_discount": final_total_before_tax,
-        "total_tax": total_tax,
-        "expense": expense,
-        "total_price": total_price,
-    }
+    return totals
     
 def finalize_pembelian(db: Session, pembelian_id: int, user_name: str):
     """Finalize pembelian using FIFO batches"""
@@ -304,7 +316,7 @@ def _validate_items_payload(items_data: List):
 # API Endpoints
 
 @router.get("", response_model=PaginatedResponse[PembelianListResponse])
-async def get_all_pembelian(
+def get_all_pembelian(
         status_pembelian: Optional[StatusPembelianEnum] = Query(None),
         status_pembayaran: Optional[StatusPembayaranEnum] = Query(None),
         vendor_id: Optional[str] = Query(None),
@@ -316,22 +328,16 @@ async def get_all_pembelian(
         db: Session = Depends(get_db),
         to_date : Optional[date] = Query(None, description="Filter by date"),
         from_date : Optional[date] = Query(None, description="Filter by date"),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides page)"),
+        with_total: bool = Query(True, description="Set false to skip the total count"),
 ):
     """Get all pembelian with filtering and pagination"""
 
     query = db.query(Pembelian).options(
-        selectinload(Pembelian.pembelian_items),
-        selectinload(Pembelian.attachments),
         selectinload(Pembelian.vend_rel),
         selectinload(Pembelian.sumberdana_rel),
         selectinload(Pembelian.warehouse_rel)
-    ).filter(Pembelian.is_deleted == False).order_by(
-        cast(func.substr(Pembelian.no_pembelian,
-                         func.length(Pembelian.no_pembelian) - 3), Integer).desc(),
-        cast(func.substr(Pembelian.no_pembelian,
-                         func.length(Pembelian.no_pembelian) - 6, 2), Integer).desc(),
-        cast(func.substr(Pembelian.no_pembelian, 7, 4), Integer).desc()
-    )
+    ).filter(Pembelian.is_deleted == False)
 
     # Apply filters
     if is_picker_view is True:
@@ -347,7 +353,7 @@ async def get_all_pembelian(
             query = query.filter(Pembelian.status_pembelian == status_pembelian)
     
     if search_key:
-        query = query.filter(Pembelian.no_pembelian.ilike(f"%{search_key}%"))
+        query = query.filter(Pembelian.id.in_(SearchService.matching_ids("pembelian", search_key)))
 
     if status_pembayaran is not None and status_pembayaran != StatusPembayaranEnum.ALL:
         query = query.filter(Pembelian.status_pembayaran == status_pembayaran)
@@ -369,15 +375,35 @@ async def get_all_pembelian(
     elif to_date:
         query = query.filter(Pembelian.sales_date <= datetime.combine(to_date, time.max))
 
-    # Get total count before pagination
-    total = query.count()
-    
-    # Apply pagination
-    offset = (page - 1) * size
-    pembelians = query.order_by(desc(Pembelian.sales_date)).offset(offset).limit(size).all()
+    # Apply pagination (cursor when given, else page)
+    # Newest document number first, served by ix_pembelians_no_order
+    sort = [
+        (Pembelian.no_year, True),
+        (Pembelian.no_month, True),
+        (Pembelian.no_seq, True),
+        (Pembelian.id, True),
+    ]
+    # Child counts come from correlated COUNT subqueries; lines / attachments aren't loaded
+    items_count = (
+        select(func.count(PembelianItem.id))
+        .where(PembelianItem.pembelian_id == Pembelian.id)
+        .correlate(Pembelian)
+        .scalar_subquery()
+    )
+    attachments_count = (
+        select(func.count(AllAttachment.id))
+        .where(AllAttachment.pembelian_id == Pembelian.id)
+        .correlate(Pembelian)
+        .scalar_subquery()
+    )
+    page_result = paginate_keyset(
+        query, sort, size,
+        cursor=cursor, offset=(page - 1) * size, with_total=with_total,
+        columns=[items_count.label("items_count"), attachments_count.label("attachments_count")],
+    )
 
     result = []
-    for pembelian in pembelians:
+    for pembelian, pembelian_items_count, pembelian_attachments_count in page_result.rows:
         pembelian_dict = {
             "id": pembelian.id,
             "no_pembelian": pembelian.no_pembelian,
@@ -389,18 +415,19 @@ async def get_all_pembelian(
             "total_return": pembelian.total_return.quantize(Decimal('0.0001')),
             "total_price": pembelian.total_price.quantize(Decimal('0.0001')),
             "remaining": pembelian.remaining.quantize(Decimal('0.0001')),  
-            "items_count": len(pembelian.pembelian_items),
-            "attachments_count": len(pembelian.attachments)
+            "items_count": pembelian_items_count,
+            "attachments_count": pembelian_attachments_count
         }
-        result.append(PembelianListResponse(**pembelian_dict))
+        result.append(pembelian_dict)
 
-    return {
-        "data": result,
-        "total": total,
-    }
+    # rows are validated once, straight into the JSON body
+    return validated_json(
+        PaginatedResponse[PembelianListResponse],
+        {"data": result, "total": page_result.total, "next_cursor": page_result.next_cursor},
+    )
 
 @router.get("/{pembelian_id}", response_model=PembelianResponse)
-async def get_pembelian(pembelian_id: int, db: Session = Depends(get_db)): 
+def get_pembelian(pembelian_id: int, db: Session = Depends(get_db)): 
     pembelian = (
         db.query(Pembelian)
           .options(
@@ -420,7 +447,7 @@ async def get_pembelian(pembelian_id: int, db: Session = Depends(get_db)):
     return pembelian
 
 @router.post("", status_code=status.HTTP_201_CREATED)
-async def create_pembelian(request: PembelianCreate, db: Session = Depends(get_db), user_name: str = Depends(get_current_user_name)):
+def create_pembelian(request: PembelianCreate, db: Session = Depends(get_db), user_name: str = Depends(get_current_user_name)):
     """Create new pembelian in DRAFT status - DOES NOT UPDATE STOCK YET"""
 
     pembelian = Pembelian(
@@ -483,7 +510,7 @@ async def create_pembelian(request: PembelianCreate, db: Session = Depends(get_d
     }
 
 @router.put("/{pembelian_id}", response_model=PembelianResponse)
-async def update_pembelian(
+def update_pembelian(
     pembelian_id: int,
     request: PembelianUpdate,
     db: Session = Depends(get_db),
@@ -680,10 +707,10 @@ async def update_pembelian(
     else:
         db.rollback()
 
-    return await get_pembelian(pembelian_id, db)    
+    return get_pembelian(pembelian_id, db)    
     
 @router.patch("/{pembelian_id}", status_code=status.HTTP_200_OK)
-async def rollback_pembelian_status(
+def rollback_pembelian_status(
     pembelian_id: int, 
     db: Session = Depends(get_db), 
     user_name: str = Depends(get_current_user_name)
@@ -802,13 +829,13 @@ async def rollback_pembelian_status(
 
 
 @router.post("/{pembelian_id}/finalize", response_model=PembelianResponse)
-async def finalize_pembelian_endpoint(pembelian_id: int, db: Session = Depends(get_db), user_name : str  = Depends(get_current_user_name)):
+def finalize_pembelian_endpoint(pembelian_id: int, db: Session = Depends(get_db), user_name : str  = Depends(get_current_user_name)):
     """Finalize pembelian - convert from DRAFT to ACTIVE and update stock"""
     finalize_pembelian(db, pembelian_id, user_name)
-    return await get_pembelian(pembelian_id, db)
+    return get_pembelian(pembelian_id, db)
 
 @router.put("/{pembelian_id}/status", response_model=PembelianResponse)
-async def update_status(
+def update_status(
         pembelian_id: int,
         request: PembelianStatusUpdate,
         db: Session = Depends(get_db)
@@ -826,10 +853,10 @@ async def update_status(
         pembelian.status_pembayaran = request.status_pembayaran
 
     db.commit()
-    return await get_pembelian(pembelian_id, db)
+    return get_pembelian(pembelian_id, db)
 
 @router.post("/{pembelian_id}/upload-attachments", response_model=UploadResponse)
-async def upload_attachments(
+def upload_attachments(
         pembelian_id: str,
         files: List[UploadFile] = File(...),
         db: Session = Depends(get_db)
@@ -877,7 +904,7 @@ async def upload_attachments(
     )
 
 @router.delete("/{pembelian_id}/attachments/{attachment_id}", response_model=SuccessResponse)
-async def delete_attachment(
+def delete_attachment(
         pembelian_id: str,
         attachment_id: int,
         db: Session = Depends(get_db)
@@ -905,7 +932,7 @@ async def delete_attachment(
     return SuccessResponse(message="Attachment deleted successfully")
 
 @router.get("/{pembelian_id}/download/{attachment_id}")
-async def download_attachment(
+def download_attachment(
         pembelian_id: str,
         attachment_id: int,
         db: Session = Depends(get_db)
@@ -933,17 +960,20 @@ async def download_attachment(
 
 
 @router.get("/{pembelian_id}/totals", response_model=TotalsResponse)
-async def get_totals(pembelian_id: int, db: Session = Depends(get_db)):
-    data = calculate_pembelian_totals(db, pembelian_id)
+def get_totals(pembelian_id: int, db: Session = Depends(get_db)):
+    pembelian = db.query(Pembelian).filter(Pembelian.id == pembelian_id).first()
+    if not pembelian:
+        raise HTTPException(status_code=404, detail="Pembelian not found")
+    data = compute_pembelian_totals(pembelian, pembelian.pembelian_items)
     return TotalsResponse(**data)
 
 @router.post("/{pembelian_id}/recalculate", response_model=TotalsResponse)
-async def recalc_totals(pembelian_id: int, db: Session = Depends(get_db)):
+def recalc_totals(pembelian_id: int, db: Session = Depends(get_db)):
     data = calculate_pembelian_totals(db, pembelian_id)
     return TotalsResponse(**data)
 
 @router.delete("/{pembelian_id}", response_model=SuccessResponse)
-async def delete_pembelian(pembelian_id: int, db: Session = Depends(get_db)):
+def delete_pembelian(pembelian_id: int, db: Session = Depends(get_db)):
     """
     Delete pembelian:
       - If DRAFT and no payments -> HARD DELETE (doc + lines + files).
@@ -1008,7 +1038,7 @@ async def delete_pembelian(pembelian_id: int, db: Session = Depends(get_db)):
 
 # Statistics endpoints
 @router.get("/stats/summary")
-async def get_pembelian_summary(db: Session = Depends(get_db)):
+def get_pembelian_summary(db: Session = Depends(get_db)):
     """Get pembelian statistics summary"""
 
     total_count = db.query(func.count(Pembelian.id)).scalar()
@@ -1070,8 +1100,22 @@ def calculate_pembelian_item_totals(item: PembelianItem) -> None:
     # For compatibility - price_after_tax as unit equivalent
     item.price_after_tax = (row_total / qty) if qty > 0 else Decimal('0')
 
-@router.get("/{pembelian_id}/invoice/html", response_class=HTMLResponse)
-async def view_pembelian_invoice_html(pembelian_id: int, request: Request, db: Session = Depends(get_db)):
+def _pembelian_invoice_version(db: Session, pembelian_id: int) -> Optional[str]:
+    """Version of a finalized pembelian's invoice (its row + line rows); None for drafts / missing."""
+    head = db.query(Pembelian.__table__).filter(Pembelian.id == pembelian_id).first()
+    if head is None or head.status_pembelian == StatusPembelianEnum.DRAFT:
+        return None
+    lines = (
+        db.query(PembelianItem.__table__, Item.name, Item.satuan_id)
+        .outerjoin(Item, Item.id == PembelianItem.item_id)
+        .filter(PembelianItem.pembelian_id == pembelian_id)
+        .order_by(PembelianItem.id)
+        .all()
+    )
+    return InvoiceService.document_version(head, *lines)
+
+
+def _render_pembelian_invoice(db: Session, pembelian_id: int, request: Request) -> str:
     pembelian = (
         db.query(Pembelian)
         .options(
@@ -1087,8 +1131,8 @@ async def view_pembelian_invoice_html(pembelian_id: int, request: Request, db: S
 
     BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
 
-    # Use the fixed calculation function to ensure consistency
-    totals_data = calculate_pembelian_totals(db, pembelian_id, msg="", user_name="")
+    # read-only: totals are computed, never written back from a GET
+    totals_data = compute_pembelian_totals(pembelian, pembelian.pembelian_items)
 
     # Helper function to safely get Decimal values from totals_data
     def safe_decimal(key, fallback=0):
@@ -1109,70 +1153,12 @@ async def view_pembelian_invoice_html(pembelian_id: int, request: Request, db: S
         )
     )
 
-    def get_image_as_base64(raw_image_path):
-        """Convert image file to base64 data URL for reliable embedding"""
-        if not raw_image_path:
-            return None
-        
-        try:
-            # Handle different path formats
-            cleaned_path = str(raw_image_path).strip()
-            
-            # Remove unwanted prefixes
-            unwanted_prefixes = [
-                "root/backend/",
-                "/root/backend/",
-                "backend/",
-                "/backend/",
-                "static/items/",
-                "/static/items/",
-            ]
-            
-            for prefix in unwanted_prefixes:
-                if cleaned_path.startswith(prefix):
-                    cleaned_path = cleaned_path[len(prefix):]
-                    break
-            
-            # Get UPLOAD_DIR from env
-            upload_dir = os.getenv("UPLOAD_DIR", "uploads/items")
-            
-            # Try different path combinations
-            possible_paths = [
-                cleaned_path,
-                f"static/items/{os.path.basename(cleaned_path)}",
-                f"uploads/items/{os.path.basename(cleaned_path)}",
-                os.path.join(upload_dir, os.path.basename(cleaned_path)),
-                os.path.join("uploads/items", os.path.basename(cleaned_path))
-            ]
-            
-            for path in possible_paths:
-                if os.path.exists(path):
-                    with open(path, "rb") as f:
-                        img_data = base64.b64encode(f.read()).decode("ascii")
-                        # Detect mime type
-                        mime_type = "image/jpeg"
-                        if path.lower().endswith('.png'):
-                            mime_type = "image/png"
-                        elif path.lower().endswith('.webp'):
-                            mime_type = "image/webp"
-                        return f"data:{mime_type};base64,{img_data}"
-            
-            # If file not found, return None
-            return None
-            
-        except Exception as e:
-            print(f"Error loading image {raw_image_path}: {e}")
-            return None
-
     enhanced_items = []
     for it in pembelian.pembelian_items:
         raw_image_path = it.primary_image_url if it.item_rel else None
         
-        # Convert image to base64 for reliable display in invoice
-        img_url = get_image_as_base64(raw_image_path)
-
-        # Keep your per-item calculation
-        calculate_pembelian_item_totals(it)
+        # Cached thumbnail data URL for reliable display in invoice
+        img_url = InvoiceService.item_image_data_url(raw_image_path)
 
         qty = Decimal(str(it.qty or 0))
         unit_price = Decimal(str(it.unit_price or 0))
@@ -1224,34 +1210,9 @@ async def view_pembelian_invoice_html(pembelian_id: int, request: Request, db: S
         "total_before_tax": total_before_discount,
     }
     
-    # Load logo as base64 with fallback handling
-    import pathlib
-    logo_data_url = None
-    
-    # Try multiple possible logo locations
-    possible_logo_paths = [
-        pathlib.Path("static/items/logo.png"),
-        pathlib.Path("uploads/items/logo.png"),
-        pathlib.Path("logo.png"),
-    ]
-    
-    for logo_path in possible_logo_paths:
-        if logo_path.exists():
-            try:
-                with logo_path.open("rb") as f:
-                    logo_b64 = base64.b64encode(f.read()).decode("ascii")
-                    logo_data_url = f"data:image/png;base64,{logo_b64}"
-                break
-            except Exception as e:
-                print(f"Error reading logo from {logo_path}: {e}")
-                continue
-    
-    # Fallback: use empty string or placeholder
-    if not logo_data_url:
-        logo_data_url = ""  # Or use a placeholder image URL
+    logo_data_url = InvoiceService.logo_data_url()
 
-    return templates.TemplateResponse(
-        "pembelian.html",
+    return templates.get_template("pembelian.html").render(
         {
             "request": request,
             "pembelian": pembelian,
@@ -1270,6 +1231,74 @@ async def view_pembelian_invoice_html(pembelian_id: int, request: Request, db: S
                 "account_number_bca": "7285834627",
                 "representative": "",
             },
-            "css": open("templates/invoice.css").read(),
-        },
-    )
\ No newline at end of file
+            "css": InvoiceService.css(),
+        }
+    )
+
+
+@router.get("/{pembelian_id}/invoice/html", response_class=HTMLResponse)
+def view_pembelian_invoice_html(pembelian_id: int, request: Request, db: Session = Depends(get_db)):
+    version = _pembelian_invoice_version(db, pembelian_id)
+    html = InvoiceService.cached_html(
+        "pembelian", pembelian_id, version,
+        lambda: _render_pembelian_invoice(db, pembelian_id, request),
+    )
+    return HTMLResponse(html)
+
+
+def _pembelian_pdf_documents(db: Session, ids: List[int], request: Request):
+    """(documents for InvoiceService.render_pdf / render_pdf_zip, ids not found); sync, runs in the threadpool."""
+    numbers = dict(db.query(Pembelian.id, Pembelian.no_pembelian).filter(Pembelian.id.in_(ids)).all())
+    documents = [
+        (
+            InvoiceService.pdf_filename(numbers[doc_id], "pembelian", doc_id),
+            "pembelian",
+            doc_id,
+            _pembelian_invoice_version(db, doc_id),
+            (lambda doc_id=doc_id: _render_pembelian_invoice(db, doc_id, request)),
+        )
+        for doc_id in ids if doc_id in numbers
+    ]
+    return documents, [doc_id for doc_id in ids if doc_id not in numbers]
+
+
+@router.get("/{pembelian_id}/invoice/pdf")
+async def download_pembelian_invoice_pdf(pembelian_id: int, request: Request, db: Session = Depends(get_db)):
+    """Invoice as PDF (same template as /invoice/html), cached per document version."""
+    # async for the process pool; DB work and HTML rendering go through the threadpool
+    documents, _ = await run_in_threadpool(_pembelian_pdf_documents, db, [pembelian_id], request)
+    if not documents:
+        raise HTTPException(status_code=404, detail="Pembelian not found")
+    filename, _, _, version, render_html = documents[0]
+
+    try:
+        pdf = await InvoiceService.render_pdf("pembelian", pembelian_id, version, render_html)
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'inline; filename="{filename}"'},
+    )
+
+
+@router.post("/invoice/pdf/batch")
+async def download_pembelian_invoice_pdf_batch(
+        payload: InvoicePdfBatchRequest, request: Request, db: Session = Depends(get_db)
+):
+    """ZIP of invoice PDFs for many pembelian ids (month-end printing); PDFs render in parallel."""
+    ids = list(dict.fromkeys(payload.ids))
+    documents, missing = await run_in_threadpool(_pembelian_pdf_documents, db, ids, request)
+    if not documents:
+        raise HTTPException(status_code=404, detail=f"Pembelian not found: {missing}")
+
+    try:
+        archive = await InvoiceService.render_pdf_zip(documents)
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    headers = {"Content-Disposition": f'attachment; filename="invoices-pembelian-{datetime.now():%Y%m%d-%H%M%S}.zip"'}
+    if missing:
+        headers["X-Missing-Ids"] = ",".join(str(doc_id) for doc_id in missing)
+    return Response(content=archive, media_type="application/zip", headers=headers)
\ No newline at end of file
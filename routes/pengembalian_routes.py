@@ -12,6 +12,7 @@ from models.Pembelian import Pembelian, StatusPembayaranEnum, StatusPembelianEnu
 from models.Penjualan import Penjualan
 from models.Item import Item
 from routes.pembayaran_routes import update_payment_status
+from routes.helper import paginate_keyset
 from schemas.PembayaranSchemas import PembayaranPengembalianType
 from schemas.PengembalianSchema import (
     PengembalianCreate, PengembalianUpdate, PengembalianResponse,
@@ -257,6 +258,8 @@ def get_pengembalians(
     search_key: Optional[str] = Query(None, description="Search by return number"),
     to_date: Optional[date] = Query(None, description="Filter by date"),
     from_date: Optional[date] = Query(None, description="Filter by date"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides page)"),
+    with_total: bool = Query(True, description="Set false to skip the total count"),
     db: Session = Depends(get_db)
 ):
     """Get list of return records with filtering"""
@@ -286,9 +289,7 @@ def get_pengembalians(
     if search_key:
         base_query = base_query.filter(Pengembalian.no_pengembalian.ilike(f"%{search_key}%"))
 
-    total = base_query.count()
-
-    pengembalians = (
+    page_result = paginate_keyset(
         base_query.options(
             joinedload(Pengembalian.pengembalian_items).joinedload(PengembalianItem.item_rel),
             joinedload(Pengembalian.pembelian_rel),
@@ -297,18 +298,18 @@ def get_pengembalians(
             joinedload(Pengembalian.vend_rel),
             joinedload(Pengembalian.warehouse_rel),
             joinedload(Pengembalian.curr_rel),
-        )
-        .order_by(Pengembalian.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
+        ),
+        [(Pengembalian.created_at, True), (Pengembalian.id, True)],
+        limit,
+        cursor=cursor, offset=offset, with_total=with_total,
     )
 
     return PengembalianListResponse(
-        data=pengembalians,
-        total=total,
+        data=page_result.rows,
+        total=page_result.total,
         skip=offset,
         limit=limit,
+        next_cursor=page_result.next_cursor,
     )
 
 
@@ -1,10 +1,9 @@
-import base64
 import random
 
 from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Query, status
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session, selectinload, joinedload
-from sqlalchemy import and_, func, desc, cast, Integer
+from sqlalchemy import and_, func, select
 from typing import List, Optional
 import uuid
 import os
@@ -13,8 +12,9 @@ import enum
 from datetime import datetime, time, date
 from decimal import Decimal, InvalidOperation
 
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
-from starlette.responses import HTMLResponse
+from starlette.responses import HTMLResponse, Response
 
 from database import get_db
 from models.AuditTrail import AuditEntityEnum
@@ -29,11 +29,15 @@ from models.Item import Item
 
 from models.AllAttachment import ParentType, AllAttachment
 from routes.upload_routes import get_public_image_url, to_public_image_url, templates
+from routes.helper import paginate_keyset, validated_json
 from schemas.PaginatedResponseSchemas import PaginatedResponse
 from schemas.PenjualanSchema import PenjualanCreate, PenjualanListResponse, PenjualanResponse, PenjualanStatusUpdate, PenjualanUpdate, SuccessResponse, TotalsResponse, UploadResponse
 from services.audit_services import AuditService
 from services.fifo_services import FifoService
+from schemas.InvoiceSchemas import InvoicePdfBatchRequest
+from services.invoice_services import InvoiceService
 from services.inventoryledger_services import InventoryService
+from services.search_services import SearchService
 from utils import generate_unique_record_number, get_current_user_name
 from decimal import Decimal, InvalidOperation  # add InvalidOperation
 
@@ -77,17 +81,11 @@ def calculate_item_totals(item: PenjualanItem) -> None:
     item.price_after_tax = (row_total / qty) if qty > 0 else Decimal('0')
 
 
-def calculate_penjualan_totals(db: Session, penjualan_id: int, msg : str, user_name : str = "" ):
+def compute_penjualan_totals(penjualan: Penjualan, items) -> dict:
     """
-    Calculate penjualan totals following the exact frontend logic
+    Penjualan totals following the exact frontend logic, without writing anything
+    (used by read-only views; calculate_penjualan_totals persists them).
     """
-    audit_service = AuditService(db)
-    items = db.query(PenjualanItem).filter(PenjualanItem.penjualan_id == penjualan_id).all()
-
-    # Recalculate each item first
-    for item in items:
-        calculate_item_totals(item)
-
     # Frontend variables
     sub_total = Decimal('0')  # sum of all rowSubTotal
     total_item_discounts = Decimal('0')  # sum of all item discounts
@@ -113,11 +111,6 @@ def calculate_penjualan_totals(db: Session, penjualan_id: int, msg : str, user_n
         total_tax += row_tax
         grand_total_items += row_total
 
-    # Get penjualan for additional fields
-    penjualan = db.query(Penjualan).filter(Penjualan.id == penjualan_id).first()
-    if not penjualan:
-        raise HTTPException(status_code=404, detail="Penjualan not found")
-
     additional_discount = Decimal(str(penjualan.additional_discount or 0))
     expense = Decimal(str(penjualan.expense or 0))
 
@@ -127,15 +120,49 @@ def calculate_penjualan_totals(db: Session, penjualan_id: int, msg : str, user_n
     total = max(sub_total - total_item_discounts, Decimal('0'))  # This is 'total' in frontend
     grand_total = final_total_before_tax + total_tax + expense
 
+    return {
+        "total_subtotal": sub_total,  # subTotal in frontend
+        "total_discount": total_item_discounts,  # totalItemDiscounts in frontend
+        "additional_discount": additional_discount,
+        "total_before_discount": final_total_before_tax,  # finalTotalBeforeTax in frontend
+        "total_tax": total_tax,  # totalTax in frontend
+        "expense": expense,
+        "total_price": grand_total,  # grandTotal in frontend
+        "total_qty": sum(int(it.qty or 0) for it in items),
+        "total_grand_total_items": grand_total_items,  # grandTotalItems in frontend
+        "subtotal_after_item_discounts": subtotal_after_item_discounts,  # For debugging
+        "total": total,  # 'total' variable in frontend
+    }
+
+
+def calculate_penjualan_totals(db: Session, penjualan_id: int, msg : str, user_name : str = "" ):
+    """
+    Calculate penjualan totals following the exact frontend logic and persist them
+    """
+    audit_service = AuditService(db)
+    items = db.query(PenjualanItem).filter(PenjualanItem.penjualan_id == penjualan_id).all()
+
+    # Recalculate each item first
+    for item in items:
+        calculate_item_totals(item)
+
+    # Get penjualan for additional fields
+    penjualan = db.query(Penjualan).filter(Penjualan.id == penjualan_id).first()
+    if not penjualan:
+        raise HTTPException(status_code=404, detail="Penjualan not found")
+
+    totals = compute_penjualan_totals(penjualan, items)
+    grand_total = totals["total_price"]
+
     # Update penjualan with calculated values
-    penjualan.total_subtotal = sub_total  # This is subTotal in frontend
-    penjualan.total_discount = total_item_discounts  # This is totalItemDiscounts in frontend
-    penjualan.additional_discount = additional_discount
-    penjualan.total_before_discount = final_total_before_tax  # This is finalTotalBeforeTax in frontend
-    penjualan.total_tax = total_tax  # This is totalTax in frontend
-    penjualan.expense = expense
+    penjualan.total_subtotal = totals["total_subtotal"]  # This is subTotal in frontend
+    penjualan.total_discount = totals["total_discount"]  # This is totalItemDiscounts in frontend
+    penjualan.additional_discount = totals["additional_discount"]
+    penjualan.total_before_discount = totals["total_before_discount"]  # This is finalTotalBeforeTax in frontend
+    penjualan.total_tax = totals["total_tax"]  # This is totalTax in frontend
+    penjualan.expense = totals["expense"]
     penjualan.total_price = grand_total  # This is grandTotal in frontend
-    penjualan.total_qty = sum(int(it.qty or 0) for it in items)
+    penjualan.total_qty = totals["total_qty"]
 
     if (msg !=  "" or msg != None) :
         audit_service.default_log(
@@ -147,19 +174,7 @@ def calculate_penjualan_totals(db: Session, penjualan_id: int, msg : str, user_n
 
     db.commit()
 
-    return {
-        "total_subtotal": sub_total,  # subTotal in frontend
-        "total_discount": total_item_discounts,  # totalItemDiscounts in frontend
-        "additional_discount": additional_discount,
-        "total_before_discount": final_total_before_tax,  # finalTotalBeforeTax in frontend
-        "total_tax": total_tax,  # totalTax in frontend
-        "expense": expense,
-        "total_price": grand_total,  # grandTotal in frontend
-        "total_qty": penjualan.total_qty,
-        "total_grand_total_items": grand_total_items,  # grandTotalItems in frontend
-        "subtotal_after_item_discounts": subtotal_after_item_discounts,  # For debugging
-        "total": total,  # 'total' variable in frontend
-    }
+    return totals
 
 
 
@@ -453,7 +468,7 @@ def _validate_items_payload(items_data: List):
 # API Endpoints
 # ------------------------------
 @router.get("", response_model=PaginatedResponse[PenjualanListResponse])
-async def get_all_penjualan(
+def get_all_penjualan(
     status_penjualan: Optional[StatusPembelianEnum] = Query(None),
     status_pembayaran: Optional[StatusPembayaranEnum] = Query(None),
     customer_id: Optional[str] = Query(None),
@@ -465,26 +480,19 @@ async def get_all_penjualan(
     size: int = Query(50, ge=1, le=100),
     db: Session = Depends(get_db),
     to_date : Optional[date] = Query(None, description="Filter by date"),
-    from_date : Optional[date] = Query(None, description="Filter by date")
+    from_date : Optional[date] = Query(None, description="Filter by date"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides page)"),
+    with_total: bool = Query(True, description="Set false to skip the total count"),
 
 ):
     query = (
         db.query(Penjualan)
         .options(
-            selectinload(Penjualan.penjualan_items),
-            selectinload(Penjualan.attachments),
             selectinload(Penjualan.customer_rel),
             selectinload(Penjualan.warehouse_rel),
             selectinload(Penjualan.kode_lambung_rel),  # NEW: Add kode_lambung loading
         )
         .filter(Penjualan.is_deleted == False)
-        .order_by(
-            cast(func.substr(Penjualan.no_penjualan,
-                             func.length(Penjualan.no_penjualan) - 3), Integer).desc(),
-            cast(func.substr(Penjualan.no_penjualan,
-                             func.length(Penjualan.no_penjualan) - 6, 2), Integer).desc(),
-            cast(func.substr(Penjualan.no_penjualan, 7, 4), Integer).desc()
-        )
     )
     if is_picker_view is True:
         query = query.filter(Penjualan.status_pembayaran != StatusPembayaranEnum.PAID, Penjualan.status_penjualan != StatusPembelianEnum.DRAFT,  Penjualan.status_penjualan != StatusPembelianEnum.COMPLETED)
@@ -502,7 +510,7 @@ async def get_all_penjualan(
         query = query.filter(Penjualan.status_pembayaran == status_pembayaran)
 
     if search_key:
-        query = query.filter(Penjualan.no_penjualan.ilike(f"%{search_key}%"))
+        query = query.filter(Penjualan.id.in_(SearchService.matching_ids("penjualan", search_key)))
     if customer_id:
         query = query.filter(Penjualan.customer_id == customer_id)
     if warehouse_id:
@@ -522,40 +530,64 @@ async def get_all_penjualan(
     elif to_date:
         query = query.filter(Penjualan.sales_date <= datetime.combine(to_date, time.max))
 
-    total = query.count()
-    offset = (page - 1) * size
-    rows = query.order_by(desc(Penjualan.sales_date)).offset(offset).limit(size).all()
+    # Newest document number first, served by ix_penjualans_no_order
+    sort = [
+        (Penjualan.no_year, True),
+        (Penjualan.no_month, True),
+        (Penjualan.no_seq, True),
+        (Penjualan.id, True),
+    ]
+    # Child counts come from correlated COUNT subqueries; lines / attachments aren't loaded
+    items_count = (
+        select(func.count(PenjualanItem.id))
+        .where(PenjualanItem.penjualan_id == Penjualan.id)
+        .correlate(Penjualan)
+        .scalar_subquery()
+    )
+    attachments_count = (
+        select(func.count(AllAttachment.id))
+        .where(AllAttachment.penjualan_id == Penjualan.id)
+        .correlate(Penjualan)
+        .scalar_subquery()
+    )
+    page_result = paginate_keyset(
+        query, sort, size,
+        cursor=cursor, offset=(page - 1) * size, with_total=with_total,
+        columns=[items_count.label("items_count"), attachments_count.label("attachments_count")],
+    )
 
     data = []
-    for p in rows:
+    for p, p_items_count, p_attachments_count in page_result.rows:
         customer_name = p.customer_name or (p.customer_rel.name if p.customer_rel else None)
         warehouse_name = p.warehouse_name or (p.warehouse_rel.name if p.warehouse_rel else None)
         kode_lambung_name = p.kode_lambung_rel.name if p.kode_lambung_rel else None
 
-        data.append(
-            PenjualanListResponse(
-                id=p.id,
-                no_penjualan=p.no_penjualan,
-                status_pembayaran=p.status_pembayaran,
-                status_penjualan=p.status_penjualan,
-                sales_date=p.sales_date,
-                total_paid=p.total_paid.quantize(Decimal("0.0001")),
-                total_return=p.total_return.quantize(Decimal("0.0001")),
-                total_price=p.total_price.quantize(Decimal("0.0001")),
-                remaining=p.remaining.quantize(Decimal("0.0001")),
-                items_count=len(p.penjualan_items),
-                attachments_count=len(p.attachments),
-                customer_name=customer_name,
-                warehouse_name=warehouse_name,
-                kode_lambung_name=kode_lambung_name,
-            )
-        )
+        data.append({
+            "id": p.id,
+            "no_penjualan": p.no_penjualan,
+            "status_pembayaran": p.status_pembayaran,
+            "status_penjualan": p.status_penjualan,
+            "sales_date": p.sales_date,
+            "total_paid": p.total_paid.quantize(Decimal("0.0001")),
+            "total_return": p.total_return.quantize(Decimal("0.0001")),
+            "total_price": p.total_price.quantize(Decimal("0.0001")),
+            "remaining": p.remaining.quantize(Decimal("0.0001")),
+            "items_count": p_items_count,
+            "attachments_count": p_attachments_count,
+            "customer_name": customer_name,
+            "warehouse_name": warehouse_name,
+            "kode_lambung_name": kode_lambung_name,
+        })
 
-    return {"data": data, "total": total}
+    # rows are validated once, straight into the JSON body
+    return validated_json(
+        PaginatedResponse[PenjualanListResponse],
+        {"data": data, "total": page_result.total, "next_cursor": page_result.next_cursor},
+    )
 
 
 @router.get("/{penjualan_id}", response_model=PenjualanResponse)
-async def get_penjualan(penjualan_id: int, db: Session = Depends(get_db)):
+def get_penjualan(penjualan_id: int, db: Session = Depends(get_db)):
     penjualan = (
         db.query(Penjualan)
         .options(
@@ -573,7 +605,7 @@ async def get_penjualan(penjualan_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Penjualan not found")
     return penjualan
 @router.post("", status_code=status.HTTP_201_CREATED)
-async def create_penjualan(request: PenjualanCreate, db: Session = Depends(get_db),user_name : str = Depends(get_current_user_name)):
+def create_penjualan(request: PenjualanCreate, db: Session = Depends(get_db),user_name : str = Depends(get_current_user_name)):
     """
     Create new penjualan in DRAFT (no stock manipulation yet).
     We still validate stock availability per line so you don't draft impossible orders.
@@ -625,7 +657,7 @@ async def create_penjualan(request: PenjualanCreate, db: Session = Depends(get_d
     return {"detail": "Penjualan created successfully", "id": p.id}
 
 @router.put("/{penjualan_id}", response_model=PenjualanResponse)
-async def update_penjualan(
+def update_penjualan(
         penjualan_id: int,
         request: PenjualanUpdate,
         db: Session = Depends(get_db),
@@ -875,12 +907,12 @@ async def update_penjualan(
     else:
         db.rollback()
 
-    return await get_penjualan(penjualan_id, db)
+    return get_penjualan(penjualan_id, db)
 
 
 
 @router.patch("/{penjualan_id}", status_code=status.HTTP_200_OK)
-async def rollback_penjualan_status(
+def rollback_penjualan_status(
         penjualan_id: int,
         db: Session = Depends(get_db),
         user_name: str = Depends(get_current_user_name)
@@ -953,13 +985,13 @@ async def rollback_penjualan_status(
 
     
 @router.post("/{penjualan_id}/finalize", response_model=PenjualanResponse)
-async def finalize_penjualan_endpoint(penjualan_id: int, db: Session = Depends(get_db), user_name : str = Depends(get_current_user_name)):
+def finalize_penjualan_endpoint(penjualan_id: int, db: Session = Depends(get_db), user_name : str = Depends(get_current_user_name)):
     finalize_penjualan(db, penjualan_id, user_name)
-    return await get_penjualan(penjualan_id, db)
+    return get_penjualan(penjualan_id, db)
 
 
 @router.put("/{penjualan_id}/status", response_model=PenjualanResponse)
-async def update_status(penjualan_id: int, request: PenjualanStatusUpdate, db: Session = Depends(get_db)):
+def update_status(penjualan_id: int, request: PenjualanStatusUpdate, db: Session = Depends(get_db)):
     penjualan = db.query(Penjualan).filter(Penjualan.id == penjualan_id).first()
     if not penjualan:
         raise HTTPException(status_code=404, detail="Penjualan not found")
@@ -970,12 +1002,12 @@ async def update_status(penjualan_id: int, request: PenjualanStatusUpdate, db: S
         penjualan.status_pembayaran = request.status_pembayaran
 
     db.commit()
-    return await get_penjualan(penjualan_id, db)
+    return get_penjualan(penjualan_id, db)
 
 
 
 @router.post("/{penjualan_id}/upload-attachments", response_model=UploadResponse)
-async def upload_attachments(
+def upload_attachments(
         penjualan_id: str,
         files: List[UploadFile] = File(...),
         db: Session = Depends(get_db)
@@ -1023,7 +1055,7 @@ async def upload_attachments(
     )
 
 @router.delete("/{penjualan_id}/attachments/{attachment_id}", response_model=SuccessResponse)
-async def delete_attachment(
+def delete_attachment(
         penjualan_id: str,
         attachment_id: int,
         db: Session = Depends(get_db)
@@ -1050,7 +1082,7 @@ async def delete_attachment(
     return SuccessResponse(message="Attachment deleted successfully")
 
 @router.get("/{penjualan_id}/download/{attachment_id}")
-async def download_attachment(
+def download_attachment(
         penjualan_id: str,
         attachment_id: int,
         db: Session = Depends(get_db)
@@ -1077,17 +1109,20 @@ async def download_attachment(
     )
 
 @router.get("/{penjualan_id}/totals", response_model=TotalsResponse)
-async def get_totals(penjualan_id: int, db: Session = Depends(get_db)):
-    data = calculate_penjualan_totals(db, penjualan_id)
+def get_totals(penjualan_id: int, db: Session = Depends(get_db)):
+    penjualan = db.query(Penjualan).filter(Penjualan.id == penjualan_id).first()
+    if not penjualan:
+        raise HTTPException(status_code=404, detail="Penjualan not found")
+    data = compute_penjualan_totals(penjualan, penjualan.penjualan_items)
     return TotalsResponse(**data)
 
 @router.post("/{penjualan_id}/recalculate", response_model=TotalsResponse)
-async def recalc_totals(penjualan_id: int, db: Session = Depends(get_db)):
+def recalc_totals(penjualan_id: int, db: Session = Depends(get_db)):
     data = calculate_penjualan_totals(db, penjualan_id)
     return TotalsResponse(**data)
 
 @router.delete("/{penjualan_id}", response_model=SuccessResponse)
-async def delete_penjualan(penjualan_id: int, db: Session = Depends(get_db)):
+def delete_penjualan(penjualan_id: int, db: Session = Depends(get_db)):
     """
     Delete Penjualan:
       - If DRAFT and no payments -> HARD DELETE (doc + lines + files).
@@ -1183,8 +1218,22 @@ async def delete_penjualan(penjualan_id: int, db: Session = Depends(get_db)):
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error archiving penjualan: {str(e)}")
         
-@router.get("/{penjualan_id}/invoice/html", response_class=HTMLResponse)
-async def view_penjualan_invoice_html(penjualan_id: int, request: Request, db: Session = Depends(get_db)):
+def _penjualan_invoice_version(db: Session, penjualan_id: int) -> Optional[str]:
+    """Version of a finalized penjualan's invoice (its row + line rows); None for drafts / missing."""
+    head = db.query(Penjualan.__table__).filter(Penjualan.id == penjualan_id).first()
+    if head is None or head.status_penjualan == StatusPembelianEnum.DRAFT:
+        return None
+    lines = (
+        db.query(PenjualanItem.__table__, Item.name, Item.satuan_id)
+        .outerjoin(Item, Item.id == PenjualanItem.item_id)
+        .filter(PenjualanItem.penjualan_id == penjualan_id)
+        .order_by(PenjualanItem.id)
+        .all()
+    )
+    return InvoiceService.document_version(head, *lines)
+
+
+def _render_penjualan_invoice(db: Session, penjualan_id: int, request: Request) -> str:
     penjualan = (
         db.query(Penjualan)
         .options(
@@ -1201,57 +1250,14 @@ async def view_penjualan_invoice_html(penjualan_id: int, request: Request, db: S
         raise HTTPException(status_code=404, detail="Penjualan not found")
 
     BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
-    totals_data = calculate_penjualan_totals(db, penjualan_id, "")
-
-    def get_image_as_base64(raw_image_path):
-        """Convert image to base64 so it embeds in downloaded HTML"""
-        if not raw_image_path:
-            return None
-        
-        try:
-            cleaned_path = str(raw_image_path).strip()
-            
-            # Remove unwanted prefixes
-            for prefix in ["root/backend/", "/root/backend/", "backend/", "/backend/", "static/items/", "/static/items/"]:
-                if cleaned_path.startswith(prefix):
-                    cleaned_path = cleaned_path[len(prefix):]
-                    break
-            
-            upload_dir = os.getenv("UPLOAD_DIR", "uploads/items")
-            
-            # Try different paths
-            possible_paths = [
-                cleaned_path,
-                f"static/items/{os.path.basename(cleaned_path)}",
-                f"uploads/items/{os.path.basename(cleaned_path)}",
-                os.path.join(upload_dir, os.path.basename(cleaned_path)),
-            ]
-            
-            for path in possible_paths:
-                if os.path.exists(path):
-                    with open(path, "rb") as f:
-                        img_data = base64.b64encode(f.read()).decode("ascii")
-                        mime_type = "image/jpeg"
-                        if path.lower().endswith('.png'):
-                            mime_type = "image/png"
-                        elif path.lower().endswith('.webp'):
-                            mime_type = "image/webp"
-                        return f"data:{mime_type};base64,{img_data}"
-            
-            print(f"⚠️ Image not found: {raw_image_path}, tried: {possible_paths}")
-            return None
-            
-        except Exception as e:
-            print(f"❌ Error loading image {raw_image_path}: {e}")
-            return None
+    # read-only: totals are computed, never written back from a GET
+    totals_data = compute_penjualan_totals(penjualan, penjualan.penjualan_items)
 
     enhanced_items = []
     
     for it in penjualan.penjualan_items:
         raw_image_path = it.primary_image_url if it.item_rel else None
-        img_url = get_image_as_base64(raw_image_path)  # Use base64 instead of URL
-        
-        calculate_item_totals(it)
+        img_url = InvoiceService.item_image_data_url(raw_image_path)  # cached thumbnail data URL
         
         qty = Decimal(str(it.qty or 0))
         unit_price = Decimal(str(it.unit_price or 0))
@@ -1298,31 +1304,9 @@ async def view_penjualan_invoice_html(penjualan_id: int, request: Request, db: S
         "total_item_discount": totals_data["total_discount"],
     }
 
-    # Load logo as base64
-    import pathlib
-    logo_data_url = None
-    
-    possible_logo_paths = [
-        pathlib.Path("static/items/logo.png"),
-        pathlib.Path("uploads/items/logo.png"),
-        pathlib.Path("logo.png"),
-    ]
-    
-    for logo_path in possible_logo_paths:
-        if logo_path.exists():
-            try:
-                with logo_path.open("rb") as f:
-                    logo_b64 = base64.b64encode(f.read()).decode("ascii")
-                    logo_data_url = f"data:image/png;base64,{logo_b64}"
-                break
-            except Exception as e:
-                print(f"Error reading logo from {logo_path}: {e}")
-    
-    if not logo_data_url:
-        logo_data_url = ""
+    logo_data_url = InvoiceService.logo_data_url()
 
-    return templates.TemplateResponse(
-        "penjualan.html",
+    return templates.get_template("penjualan.html").render(
         {
             "request": request,
             "penjualan": penjualan,
@@ -1342,6 +1326,74 @@ async def view_penjualan_invoice_html(penjualan_id: int, request: Request, db: S
                 "account_number_bca": "7285834627",
                 "representative": "",
             },
-            "css": open("templates/invoice.css").read(),
-        },
-    )
\ No newline at end of file
+            "css": InvoiceService.css(),
+        }
+    )
+
+
+@router.get("/{penjualan_id}/invoice/html", response_class=HTMLResponse)
+def view_penjualan_invoice_html(penjualan_id: int, request: Request, db: Session = Depends(get_db)):
+    version = _penjualan_invoice_version(db, penjualan_id)
+    html = InvoiceService.cached_html(
+        "penjualan", penjualan_id, version,
+        lambda: _render_penjualan_invoice(db, penjualan_id, request),
+    )
+    return HTMLResponse(html)
+
+
+def _penjualan_pdf_documents(db: Session, ids: List[int], request: Request):
+    """(documents for InvoiceService.render_pdf / render_pdf_zip, ids not found); sync, runs in the threadpool."""
+    numbers = dict(db.query(Penjualan.id, Penjualan.no_penjualan).filter(Penjualan.id.in_(ids)).all())
+    documents = [
+        (
+            InvoiceService.pdf_filename(numbers[doc_id], "penjualan", doc_id),
+            "penjualan",
+            doc_id,
+            _penjualan_invoice_version(db, doc_id),
+            (lambda doc_id=doc_id: _render_penjualan_invoice(db, doc_id, request)),
+        )
+        for doc_id in ids if doc_id in numbers
+    ]
+    return documents, [doc_id for doc_id in ids if doc_id not in numbers]
+
+
+@router.get("/{penjualan_id}/invoice/pdf")
+async def download_penjualan_invoice_pdf(penjualan_id: int, request: Request, db: Session = Depends(get_db)):
+    """Invoice as PDF (same template as /invoice/html), cached per document version."""
+    # async for the process pool; DB work and HTML rendering go through the threadpool
+    documents, _ = await run_in_threadpool(_penjualan_pdf_documents, db, [penjualan_id], request)
+    if not documents:
+        raise HTTPException(status_code=404, detail="Penjualan not found")
+    filename, _, _, version, render_html = documents[0]
+
+    try:
+        pdf = await InvoiceService.render_pdf("penjualan", penjualan_id, version, render_html)
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'inline; filename="{filename}"'},
+    )
+
+
+@router.post("/invoice/pdf/batch")
+async def download_penjualan_invoice_pdf_batch(
+        payload: InvoicePdfBatchRequest, request: Request, db: Session = Depends(get_db)
+):
+    """ZIP of invoice PDFs for many penjualan ids (month-end printing); PDFs render in parallel."""
+    ids = list(dict.fromkeys(payload.ids))
+    documents, missing = await run_in_threadpool(_penjualan_pdf_documents, db, ids, request)
+    if not documents:
+        raise HTTPException(status_code=404, detail=f"Penjualan not found: {missing}")
+
+    try:
+        archive = await InvoiceService.render_pdf_zip(documents)
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    headers = {"Content-Disposition": f'attachment; filename="invoices-penjualan-{datetime.now():%Y%m%d-%H%M%S}.zip"'}
+    if missing:
+        headers["X-Missing-Ids"] = ",".join(str(doc_id) for doc_id in missing)
+    return Response(content=archive, media_type="application/zip", headers=headers)
\ No newline at end of file
@@ -11,6 +11,7 @@ from starlette import status
 from starlette.exceptions import HTTPException
 
 from models.Satuan import Satuan
+from routes.helper import paginate_keyset
 from schemas.PaginatedResponseSchemas import PaginatedResponse
 from schemas.SatuanSchemas import SatuanOut, SatuanCreate, SatuanUpdate
 from database import Base, engine, SessionLocal, get_db
@@ -26,13 +27,15 @@ def _build_satuans_lookup(db: Session) -> Dict[str, int]:
     return {sat.symbol.lower().strip(): sat.id for sat in satuans}
 
 @router.get("", response_model=PaginatedResponse[SatuanOut])
-async def get_all_satuan(
+def get_all_satuan(
         db: Session = Depends(get_db),
         is_active: Optional[bool] = None,
         search_key: Optional[str] = None,
         contains_deleted : Optional[bool] = False,
         skip: int = Query(0, ge=0),
         limit: int = Query(5, ge=1, le=1000),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides skip)"),
+        with_total: bool = Query(True, description="Set false to skip the total count"),
         to_date : Optional[date] = Query(None, description="Filter by date"),
         from_date : Optional[date] = Query(None, description="Filter by date")
 ):
@@ -60,16 +63,20 @@ async def get_all_satuan(
     if search_key:
         query = query.filter(Satuan.name.ilike(f"%{search_key}%"))
 
-    paginated_data =query.offset(skip).limit(limit).all()
-    total_data = query.count()
+    page_result = paginate_keyset(
+        query, [(Satuan.id, False)], limit,
+        cursor=cursor, offset=skip, with_total=with_total,
+    )
+
     return {
-        "data" : paginated_data,
-        "total" : total_data
+        "data": page_result.rows,
+        "total": page_result.total,
+        "next_cursor": page_result.next_cursor,
     }
 
 # Get one
 @router.get("/{satuan_id}", response_model=SatuanOut)
-async def get_satuan(satuan_id: int, db: Session = Depends(get_db)):
+def get_satuan(satuan_id: int, db: Session = Depends(get_db)):
     satuan = db.query(Satuan).filter(Satuan.id == satuan_id).first()
     if not satuan:
         raise HTTPException(status_code=404, detail="Satuan not found")
@@ -77,7 +84,7 @@ async def get_satuan(satuan_id: int, db: Session = Depends(get_db)):
 
 # Create
 @router.post("", response_model=SatuanOut, status_code=status.HTTP_201_CREATED)
-async def create_satuan(satuan_data: SatuanCreate, db: Session = Depends(get_db)):
+def create_satuan(satuan_data: SatuanCreate, db: Session = Depends(get_db)):
 
     satuan = Satuan(**satuan_data.dict())
 
@@ -88,7 +95,7 @@ async def create_satuan(satuan_data: SatuanCreate, db: Session = Depends(get_db)
 
 # Update
 @router.put("/{satuan_id}", response_model=SatuanOut)
-async def update_satuan(satuan_id: int, satuan_data: SatuanUpdate, db: Session = Depends(get_db)):
+def update_satuan(satuan_id: int, satuan_data: SatuanUpdate, db: Session = Depends(get_db)):
     satuan = db.query(Satuan).filter(Satuan.id == satuan_id).first()
     if not satuan:
         raise HTTPException(status_code=404, detail="Satuan not found")
@@ -102,7 +109,7 @@ async def update_satuan(satuan_id: int, satuan_data: SatuanUpdate, db: Session =
 
 # Delete
 @router.delete("/{satuan_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_satuan(satuan_id: int, db: Session = Depends(get_db)):
+def delete_satuan(satuan_id: int, db: Session = Depends(get_db)):
     satuan = db.query(Satuan).filter(Satuan.id == satuan_id).first()
     if not satuan:
         raise HTTPException(status_code=404, detail="Satuan not found")
@@ -0,0 +1,57 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from database import get_db
+from services.search_services import SEARCH_ENTITIES, SearchService
+
+router = APIRouter()
+
+
+def _parse_types(types: Optional[str]) -> Optional[List[str]]:
+    if not types:
+        return None
+    parsed = [t.strip() for t in types.split(",") if t.strip()]
+    unknown = [t for t in parsed if t not in SEARCH_ENTITIES]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown type(s): {', '.join(unknown)}. Allowed: {', '.join(SEARCH_ENTITIES.keys())}",
+        )
+    return parsed
+
+
+@router.get("/suggest")
+def search_suggest(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix of a name / SKU / code / document number"),
+    types: Optional[str] = Query(None, description="Comma separated: item,customer,vendor,penjualan,pembelian"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    """
+    Prefix autocomplete over items, customers, vendors and sales / purchase documents.
+    Matches the start of the title (name) or key (SKU / code / number), case-insensitive.
+    """
+    return {
+        "q": q,
+        "data": SearchService.suggest(db, q, _parse_types(types), limit),
+    }
+
+
+@router.post("/rebuild")
+def rebuild_search_index(
+    types: Optional[str] = Query(None, description="Comma separated entity types (default: all)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Recreate search_index from the source tables.
+    Normal create / update / delete keeps it current; use after direct SQL edits.
+
+    Same as running `python -m services.search_services`.
+    """
+    parsed = _parse_types(types)
+    try:
+        return SearchService.rebuild(db, parsed)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search index rebuild failed: {str(e)}")
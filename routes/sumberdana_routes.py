@@ -12,6 +12,7 @@ from starlette.exceptions import HTTPException
 
 from models.SumberDana import SumberDana
 from models.SumberDana import SumberDana
+from routes.helper import paginate_keyset
 from schemas.PaginatedResponseSchemas import PaginatedResponse
 from schemas.SumberDanaSchemas import SumberDanaOut, SumberDanaCreate, SumberDanaUpdate
 from database import Base, engine, SessionLocal, get_db
@@ -21,13 +22,15 @@ router =APIRouter()
 
 
 @router.get("", response_model=PaginatedResponse[SumberDanaOut])
-async def get_all_sumberdana(
+def get_all_sumberdana(
         db: Session = Depends(get_db),
         is_active: Optional[bool] = None,
         search_key: Optional[str] = None,
         contains_deleted : Optional[bool] = False,
         skip: int = Query(0, ge=0),
         limit: int = Query(5, ge=1, le=1000),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides skip)"),
+        with_total: bool = Query(True, description="Set false to skip the total count"),
         to_date : Optional[date] = Query(None, description="Filter by date"),
         from_date : Optional[date] = Query(None, description="Filter by date")
 ):
@@ -54,16 +57,20 @@ async def get_all_sumberdana(
     if search_key:
         query = query.filter(SumberDana.name.ilike(f"%{search_key}%"))
 
-    paginated_data =query.offset(skip).limit(limit).all()
-    total_data = query.count()
+    page_result = paginate_keyset(
+        query, [(SumberDana.id, False)], limit,
+        cursor=cursor, offset=skip, with_total=with_total,
+    )
+
     return {
-        "data" : paginated_data,
-        "total" : total_data
+        "data": page_result.rows,
+        "total": page_result.total,
+        "next_cursor": page_result.next_cursor,
     }
 
 # Get one
 @router.get("/{sumberdana_id}", response_model=SumberDanaOut)
-async def get_sumberdana(sumberdana_id: int, db: Session = Depends(get_db)):
+def get_sumberdana(sumberdana_id: int, db: Session = Depends(get_db)):
     sumberdana = db.query(SumberDana).filter(SumberDana.id == sumberdana_id).first()
     if not sumberdana:
         raise HTTPException(status_code=404, detail="SumberDana not found")
@@ -71,7 +78,7 @@ async def get_sumberdana(sumberdana_id: int, db: Session = Depends(get_db)):
 
 # Create
 @router.post("", response_model=SumberDanaOut, status_code=status.HTTP_201_CREATED)
-async def create_sumberdana(sumberdana_data: SumberDanaCreate, db: Session = Depends(get_db)):
+def create_sumberdana(sumberdana_data: SumberDanaCreate, db: Session = Depends(get_db)):
 
     sumberdana = SumberDana(**sumberdana_data.dict())
 
@@ -82,7 +89,7 @@ async def create_sumberdana(sumberdana_data: SumberDanaCreate, db: Session = Dep
 
 # Update
 @router.put("/{sumberdana_id}", response_model=SumberDanaOut)
-async def update_sumberdana(sumberdana_id: int, sumberdana_data: SumberDanaUpdate, db: Session = Depends(get_db)):
+def update_sumberdana(sumberdana_id: int, sumberdana_data: SumberDanaUpdate, db: Session = Depends(get_db)):
     sumberdana = db.query(SumberDana).filter(SumberDana.id == sumberdana_id).first()
     if not sumberdana:
         raise HTTPException(status_code=404, detail="SumberDana not found")
@@ -96,7 +103,7 @@ async def update_sumberdana(sumberdana_id: int, sumberdana_data: SumberDanaUpdat
 
 # Delete
 @router.delete("/{sumberdana_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_sumberdana(sumberdana_id: int, db: Session = Depends(get_db)):
+def delete_sumberdana(sumberdana_id: int, db: Session = Depends(get_db)):
     sumberdana = db.query(SumberDana).filter(SumberDana.id == sumberdana_id).first()
     if not sumberdana:
         raise HTTPException(status_code=404, detail="SumberDana not found")
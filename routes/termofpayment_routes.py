@@ -8,6 +8,7 @@ from fastapi.params import Depends, Query
 from sqlalchemy.orm import Session
 from starlette import status
 
+from routes.helper import paginate_keyset
 from schemas.PaginatedResponseSchemas import PaginatedResponse
 from schemas.TopSchemas import TopOut, TopCreate, TopUpdate
 from starlette.exceptions import HTTPException
@@ -19,12 +20,14 @@ from utils import soft_delete_record
 router =APIRouter()
 
 @router.get("", response_model=PaginatedResponse[TopOut])
-async def getAllTOP(db : Session = Depends(get_db),
+def getAllTOP(db : Session = Depends(get_db),
                     search_key : Optional[str] = None,
                     is_active : Optional[bool] = None,
                     contains_deleted: Optional[bool] = False, 
                     skip: int = Query(0, ge=0),
                     limit: int = Query(5, ge=1, le=1000),
+                    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides skip)"),
+                    with_total: bool = Query(True, description="Set false to skip the total count"),
                     to_date : Optional[date] = Query(None, description="Filter by date"),
                     from_date : Optional[date] = Query(None, description="Filter by date")):
 
@@ -53,16 +56,19 @@ async def getAllTOP(db : Session = Depends(get_db),
         query = query.filter(TermOfPayment.name.ilike(f"%{search_key}%"))
 
 
-    total_data = query.count()
-    paginated_data = query.offset(skip).limit(limit).all()
+    page_result = paginate_keyset(
+        query, [(TermOfPayment.id, False)], limit,
+        cursor=cursor, offset=skip, with_total=with_total,
+    )
 
     return {
-    "data" : paginated_data,
-    "total" : total_data
+        "data": page_result.rows,
+        "total": page_result.total,
+        "next_cursor": page_result.next_cursor,
     }
 
 @router.get("/{top_id}", response_model=TopOut, status_code=status.HTTP_200_OK)
-async def getTOPById(top_id : int, db : Session = Depends(get_db)):
+def getTOPById(top_id : int, db : Session = Depends(get_db)):
     result = db.query(TermOfPayment).filter(top_id == TermOfPayment.id).first()
     if not result:
         raise HTTPException(status_code=404, detail="Term of Payment not found")
@@ -70,7 +76,7 @@ async def getTOPById(top_id : int, db : Session = Depends(get_db)):
 
 
 @router.post("", response_model=TopOut, status_code=status.HTTP_201_CREATED)
-async def createTOP(top_data :TopCreate ,db: Session = Depends(get_db)):
+def createTOP(top_data :TopCreate ,db: Session = Depends(get_db)):
     top  = TermOfPayment(**top_data.dict())
     db.add(top)
     db.commit()
@@ -79,7 +85,7 @@ async def createTOP(top_data :TopCreate ,db: Session = Depends(get_db)):
 
 
 @router.put("/{top_id}", response_model=TopUpdate, status_code=status.HTTP_200_OK)
-async def updateTOP(top_data :  TopUpdate,top_id : int, db:Session = Depends(get_db)):
+def updateTOP(top_data :  TopUpdate,top_id : int, db:Session = Depends(get_db)):
     top = db.query(TermOfPayment).filter(top_id  == TermOfPayment.id).first()
     if not top:
         raise HTTPException(status_code=404, detail="Term of Payment ID tidak ditemukan")
@@ -93,7 +99,7 @@ async def updateTOP(top_data :  TopUpdate,top_id : int, db:Session = Depends(get
 
 
 @router.delete("/{top_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_top(top_id: int, db: Session = Depends(get_db)):
+def delete_top(top_id: int, db: Session = Depends(get_db)):
     top = db.query(TermOfPayment).filter(TermOfPayment.id == top_id).first()
     if not top:
         raise HTTPException(status_code=404, detail="TOP not found")
@@ -23,6 +23,7 @@ from database import get_db
 
 from models.Item import Item
 from models.Pembelian import Pembelian, PembelianItem
+from services.image_services import ImageService
 import os
 from sqlalchemy.orm import joinedload
 
@@ -220,10 +221,12 @@ def upload_image(
     db.add(attachment)
     db.commit()
     db.refresh(attachment)
+    ImageService.schedule_thumbnails(filepath)
     return {
         "attachment_id": attachment.id,
         "file_path": attachment.file_path,
-        "url": f"/static/items/{filename}"
+        "url": f"/static/items/{filename}",
+        "thumbnails": ImageService.thumbnail_urls(filepath),
     }
 
 def _secure_path(base_dir: str, candidate: str) -> str:
@@ -233,6 +236,25 @@ def _secure_path(base_dir: str, candidate: str) -> str:
         raise HTTPException(status_code=400, detail="Invalid file path")
     return cand_abs
 
+@router.get("/thumbs/{size}/{filename}")
+def get_thumbnail(size: str, filename: str):
+    """
+    WebP thumbnail of an uploaded image (sizes: services.image_services.THUMBNAIL_SIZES).
+    Generated on first request and served from the disk cache afterwards.
+    """
+    source = _secure_path(UPLOAD_DIR, os.path.join(UPLOAD_DIR, os.path.basename(filename)))
+    try:
+        thumb = ImageService.thumbnail_path(source, size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not thumb:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(
+        thumb,
+        media_type="image/webp",
+        headers={"Cache-Control": "public, max-age=86400"},
+    )
+
 @router.get("/attachments/{attachment_id}/download")
 def download_attachment(
     attachment_id: int,
@@ -2,7 +2,7 @@ import os
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import FastAPI,  APIRouter
+from fastapi import FastAPI,  APIRouter, Query
 
 from fastapi.params import Depends
 from sqlalchemy.orm import Session
@@ -10,6 +10,7 @@ from starlette import status
 
 from starlette.exceptions import HTTPException
 
+from routes.helper import paginate_keyset
 from schemas.PaginatedResponseSchemas import PaginatedResponse
 from schemas.UserSchemas import UserCreate, TokenSchema, RequestDetails, UserOut, UserUpdate, UserType
 from database import  get_db
@@ -35,6 +36,8 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db)):
 @router.get("", response_model=PaginatedResponse[UserOut])
 def list_users(skip: int = 0,
                limit: int = 50,
+               cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides skip)"),
+               with_total: bool = Query(True, description="Set false to skip the total count"),
                is_active: Optional[bool] = None,
                 search_key: Optional[str] = None,
 
@@ -47,11 +50,15 @@ def list_users(skip: int = 0,
     if search_key:
         query = query.filter(User.username.ilike(f"%{search_key}%"))
 
-    total_count = query.count()
-    paginated_data = query.offset(skip).limit(limit).all()
+    page_result = paginate_keyset(
+        query, [(User.id, False)], limit,
+        cursor=cursor, offset=skip, with_total=with_total,
+    )
+
     return {
-        "data": paginated_data,
-        "total": total_count
+        "data": page_result.rows,
+        "total": page_result.total,
+        "next_cursor": page_result.next_cursor,
     }
 
 @router.get("/{user_id}", response_model=UserOut)
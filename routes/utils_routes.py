@@ -2,6 +2,7 @@ import csv
 from datetime import date, time, timedelta, datetime
 from decimal import Decimal
 import io
+import pandas as pd
 from openpyxl.styles import Font
 from typing import Dict, List, Optional
 
@@ -24,13 +25,17 @@ from models.Customer import Customer
 from models.Item import Item
 from models.Pembelian import Pembelian, PembelianItem, StatusPembelianEnum
 from models.Penjualan import Penjualan, PenjualanItem
+from models.ProfitDaily import ProfitDaily
 from models.StockAdjustment import StockAdjustment
 from models.Vendor import Vendor
+from routes.helper import validated_json
 from schemas.PaginatedResponseSchemas import PaginatedResponse
 from database import  get_db
-from schemas.UtilsSchemas import DashboardStatistics, ItemStockAdjustmentReportRow, LabaRugiDetailRow, LabaRugiResponse, PurchaseReportResponse, PurchaseReportRow, \
-    SalesReportRow, SalesReportResponse, SalesTrendResponse, SalesTrendDataPoint, StockAdjustmentReportResponse, StockAdjustmentReportRow
+from schemas.UtilsSchemas import DashboardStatistics, ItemStockAdjustmentReportRow, LabaRugiPivotResponse, LabaRugiPivotRow, LabaRugiResponse, PurchaseReportResponse, \
+    SalesReportRow, SalesTrendResponse, SalesTrendDataPoint, StockAdjustmentReportResponse, StockAdjustmentReportRow
+from services.analytics_export_services import EXPORT_TABLES, AnalyticsExportService
 from services.audit_services import AuditService
+from services.profit_daily_services import ProfitDailyService
 
 router =APIRouter()
 
@@ -44,7 +49,7 @@ def get_status(this_month: float, last_month: float) -> str:
         return "neutral"
 
 @router.get("/statistics", status_code=status.HTTP_200_OK, response_model=DashboardStatistics)
-async def get_dashboard_statistics(db: Session = Depends(get_db)):
+def get_dashboard_statistics(db: Session = Depends(get_db)):
     now = datetime.now()
     this_month = now.month
     this_year = now.year
@@ -133,36 +138,24 @@ async def get_dashboard_statistics(db: Session = Depends(get_db)):
     
 
 
-@router.get("/laba-rugi", status_code=status.HTTP_200_OK, response_model=LabaRugiResponse)
-async def get_laba_rugi(
-    from_date: datetime = Query(..., description="Start datetime (ISO-8601)"),
-    to_date: Optional[datetime] = Query(None, description="End datetime (inclusive)"),
-    item_id: Optional[int] = Query(None, description="Filter by specific item"),
-    include_adjustments: bool = Query(False, description="Include stock adjustments (damaged goods, theft, etc.)"),
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
-    db: Session = Depends(get_db),
-):
+def _laba_rugi_rows(
+        db: Session,
+        from_date_only: date,
+        to_date_only: date,
+        item_id: Optional[int],
+        include_adjustments: bool,
+        per_invoice: bool,
+) -> list:
     """
-    Get Laba Rugi (Profit & Loss) report based on FIFO logs.
-    Shows detailed breakdown by invoice with HPP calculation.
-    
-    Automatically filters out:
-    - Rollback transactions (netted out with originals - if sum = 0, both hidden)
-    - Stock adjustments by default (set include_adjustments=true to show cost of lost/damaged inventory)
-    
-    Report shows:
-    - Qty Terjual: Total quantity sold
-    - HPP: Cost of goods sold (FIFO-based)
-    - Total Penjualan: Sales revenue
-    - Laba Kotor: Gross profit (revenue - COGS)
+    Rows for the Laba Rugi report.
+    per_invoice=False reads the pre-aggregated profit_daily table (one row per
+    tanggal x item); otherwise FifoLog is grouped per base invoice.
     """
-    if to_date is None:
-        to_date = datetime.now()
+    if not per_invoice:
+        return ProfitDailyService.get_daily_rows(
+            db, from_date_only, to_date_only, item_id, include_adjustments
+        )
 
-    from_date_only = from_date.date()
-    to_date_only = to_date.date()
-    
     # Get base invoice_id by removing -ROLLBACK suffix
     base_invoice_case = func.replace(FifoLog.invoice_id, '-ROLLBACK', '')
     
@@ -216,6 +209,44 @@ async def get_laba_rugi(
             (abs(float(row.total_penjualan or 0)) < 0.01)
         )
     ]
+
+    return results
+
+
+@router.get("/laba-rugi", status_code=status.HTTP_200_OK, response_model=LabaRugiResponse)
+def get_laba_rugi(
+    from_date: datetime = Query(..., description="Start datetime (ISO-8601)"),
+    to_date: Optional[datetime] = Query(None, description="End datetime (inclusive)"),
+    item_id: Optional[int] = Query(None, description="Filter by specific item"),
+    include_adjustments: bool = Query(False, description="Include stock adjustments (damaged goods, theft, etc.)"),
+    per_invoice: bool = Query(True, description="False = net rows per tanggal x item from profit_daily, without invoice detail"),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
+    db: Session = Depends(get_db),
+):
+    """
+    Get Laba Rugi (Profit & Loss) report based on FIFO logs.
+    Shows detailed breakdown by invoice with HPP calculation.
+    
+    Automatically filters out:
+    - Rollback transactions (netted out with originals - if sum = 0, both hidden)
+    - Stock adjustments by default (set include_adjustments=true to show cost of lost/damaged inventory)
+    
+    Report shows:
+    - Qty Terjual: Total quantity sold
+    - HPP: Cost of goods sold (FIFO-based)
+    - Total Penjualan: Sales revenue
+    - Laba Kotor: Gross profit (revenue - COGS)
+    """
+    if to_date is None:
+        to_date = datetime.now()
+
+    from_date_only = from_date.date()
+    to_date_only = to_date.date()
+    
+    results = _laba_rugi_rows(
+        db, from_date_only, to_date_only, item_id, include_adjustments, per_invoice
+    )
     
     # Get total count after filtering
     total_count = len(results)
@@ -238,19 +269,23 @@ async def get_laba_rugi(
         
         # Calculate HPP per unit
         hpp_per_unit = total_hpp / qty if qty != 0 else Decimal("0")
-
-        detail_rows.append(LabaRugiDetailRow(
-            tanggal=datetime.combine(row.invoice_date, datetime.min.time()),
-            no_invoice=row.base_invoice_id,
-            item_code=row.item_code or "N/A",
-            item_name=row.item_name or "N/A",
-            qty_terjual=qty,
-            hpp=hpp_per_unit,
-            total_hpp=total_hpp,
-            harga_jual=row.harga_jual or Decimal("0"),
-            total_penjualan=total_penjualan,
-            laba_kotor=laba_kotor,
-        ))
+        if per_invoice:
+            harga_jual = row.harga_jual or Decimal("0")
+        else:
+            harga_jual = total_penjualan / qty if qty != 0 else Decimal("0")
+
+        detail_rows.append({
+            "tanggal": datetime.combine(row.invoice_date, datetime.min.time()),
+            "no_invoice": row.base_invoice_id if per_invoice else "-",
+            "item_code": row.item_code or "N/A",
+            "item_name": row.item_name or "N/A",
+            "qty_terjual": qty,
+            "hpp": hpp_per_unit,
+            "total_hpp": total_hpp,
+            "harga_jual": harga_jual,
+            "total_penjualan": total_penjualan,
+            "laba_kotor": laba_kotor,
+        })
 
         # Accumulate totals
         grand_total_hpp += total_hpp
@@ -262,17 +297,17 @@ async def get_laba_rugi(
     title_suffix = " (termasuk penyesuaian stok)" if include_adjustments else ""
     title = f"Laporan Laba Rugi {from_date:%d/%m/%Y} - {to_date:%d/%m/%Y}{title_suffix}"
 
-    return LabaRugiResponse(
-        title=title,
-        date_from=from_date,
-        date_to=to_date,
-        details=detail_rows,
-        total_qty=total_qty,
-        total_hpp=grand_total_hpp,
-        total_penjualan=grand_total_penjualan,
-        total_laba_kotor=grand_total_laba,
-        total=total_count,
-    )
+    return validated_json(LabaRugiResponse, {
+        "title": title,
+        "date_from": from_date,
+        "date_to": to_date,
+        "details": detail_rows,
+        "total_qty": total_qty,
+        "total_hpp": grand_total_hpp,
+        "total_penjualan": grand_total_penjualan,
+        "total_laba_kotor": grand_total_laba,
+        "total": total_count,
+    })
 
  
 @router.get(
@@ -280,11 +315,12 @@ async def get_laba_rugi(
     status_code=status.HTTP_200_OK,
     summary="Download Laporan Laba Rugi as XLSX",
 )
-async def download_laba_rugi(
+def download_laba_rugi(
     from_date: datetime = Query(..., description="Start datetime (ISO-8601)"),
     to_date: Optional[datetime] = Query(None, description="End datetime (inclusive)"),
     item_id: Optional[int] = Query(None, description="Filter by specific item"),
     include_adjustments: bool = Query(False, description="Include stock adjustments (damaged goods, theft, etc.)"),
+    per_invoice: bool = Query(True, description="False = net rows per tanggal x item from profit_daily, without invoice detail"),
     db: Session = Depends(get_db),
 ):
     """
@@ -299,101 +335,9 @@ async def download_laba_rugi(
     from_date_only = from_date.date()
     to_date_only = to_date.date()
 
-    # Get base invoice_id by removing -ROLLBACK suffix
-    base_invoice_case = func.replace(FifoLog.invoice_id, '-ROLLBACK', '')
-    
-    # Query and GROUP BY base invoice to net out rollbacks
-    query = (
-        db.query(
-            FifoLog.invoice_date,
-            base_invoice_case.label("base_invoice_id"),
-            FifoLog.item_id,
-            Item.code.label("item_code"),
-            Item.name.label("item_name"),
-            func.sum(FifoLog.qty_terpakai).label("qty_terjual"),
-            func.sum(FifoLog.total_hpp).label("total_hpp"),
-            func.sum(FifoLog.total_penjualan).label("total_penjualan"),
-            func.sum(FifoLog.laba_kotor).label("laba_kotor"),
-            FifoLog.harga_jual,
-        )
-        .join(Item, Item.id == FifoLog.item_id)
-        .filter(
-            FifoLog.invoice_date >= from_date_only,
-            FifoLog.invoice_date <= to_date_only,
-        )
-    )
-    
-    # Exclude adjustments by default
-    if not include_adjustments:
-        query = query.filter(~FifoLog.invoice_id.like("ADJ-%"))
-    
-    query = query.group_by(
-        FifoLog.invoice_date,
-        base_invoice_case,
-        FifoLog.item_id,
-        Item.code,
-        Item.name,
-        FifoLog.harga_jual,
-    ).order_by(FifoLog.invoice_date.asc(), base_invoice_case.asc())
-
-    if item_id is not None:
-        query = query.filter(FifoLog.item_id == item_id)
-
-    all_results = query.all()
-    
-    # Filter out fully rolled back transactions
-    results = [
-    row for row in all_results
-    if not (
-        (abs(float(row.total_hpp or 0)) < 0.01) and
-        (abs(float(row.total_penjualan or 0)) < 0.01)
-    )
-]
-
-    # Get detailed batch usage for notes section
-    fifo_logs_query = (
-        db.query(FifoLog, BatchStock, Item)
-        .join(BatchStock, BatchStock.id_batch == FifoLog.id_batch)
-        .join(Item, Item.id == FifoLog.item_id)
-        .filter(
-            FifoLog.invoice_date >= from_date_only,
-            FifoLog.invoice_date <= to_date_only,
-        )
+    results = _laba_rugi_rows(
+        db, from_date_only, to_date_only, item_id, include_adjustments, per_invoice
     )
-    
-    # Exclude adjustments from notes too
-    if not include_adjustments:
-        fifo_logs_query = fifo_logs_query.filter(~FifoLog.invoice_id.like("ADJ-%"))
-    
-    fifo_logs_query = fifo_logs_query.order_by(
-        FifoLog.invoice_date.asc(), 
-        FifoLog.invoice_id.asc()
-    )
-
-    if item_id is not None:
-        fifo_logs_query = fifo_logs_query.filter(FifoLog.item_id == item_id)
-
-    all_fifo_logs = fifo_logs_query.all()
-    
-    # Group fifo logs by base invoice and net them out
-    invoice_batches = {}
-    for fifo_log, batch, item in all_fifo_logs:
-        base_inv = fifo_log.invoice_id.replace('-ROLLBACK', '')
-        key = (fifo_log.invoice_date, base_inv, item.name)
-        if key not in invoice_batches:
-            invoice_batches[key] = []
-        invoice_batches[key].append({
-            'batch_id': batch.id_batch,
-            'qty': fifo_log.qty_terpakai,
-            'harga_beli': batch.harga_beli,
-            'hpp': fifo_log.total_hpp,
-        })
-    
-    # Remove fully cancelled invoices from notes
-    invoice_batches = {
-        key: batches for key, batches in invoice_batches.items()
-        if sum(b['qty'] for b in batches) != 0
-    }
 
     # Create workbook
     wb = Workbook()
@@ -440,16 +384,20 @@ async def download_laba_rugi(
         laba_kotor = row.laba_kotor or Decimal("0")
         
         hpp_per_unit = total_hpp / qty if qty != 0 else Decimal("0")
+        if per_invoice:
+            harga_jual = row.harga_jual or Decimal("0")
+        else:
+            harga_jual = total_penjualan / qty if qty != 0 else Decimal("0")
 
         ws.append([
             row.invoice_date.strftime("%d/%m/%Y"),
-            row.base_invoice_id,
+            row.base_invoice_id if per_invoice else "-",
             row.item_code or "N/A",
             row.item_name or "N/A",
             int(qty),
             float(hpp_per_unit),
             float(total_hpp),
-            float(row.harga_jual or 0),
+            float(harga_jual),
             float(total_penjualan),
             float(laba_kotor),
         ])
@@ -536,6 +484,229 @@ async def download_laba_rugi(
         },
     ) 
       
+LABA_RUGI_PIVOT_METRICS = {
+    "laba_kotor": "Laba Kotor",
+    "total_penjualan": "Total Penjualan",
+    "total_hpp": "Total HPP",
+    "qty_terjual": "Qty Terjual",
+}
+
+
+def _laba_rugi_pivot_frame(
+        db: Session,
+        from_date_only: date,
+        to_date_only: date,
+        group_by: str,
+        item_id: Optional[int],
+        include_adjustments: bool,
+) -> pd.DataFrame:
+    """
+    Pull netted aggregates per (year, month, item/customer) in one query.
+    Item grouping reads profit_daily; customer grouping needs the invoice, so it
+    reads FifoLog, where rollback rows carry negative amounts but positive qty.
+    """
+    if group_by == "customer":
+        is_rollback = FifoLog.invoice_id.like("%-ROLLBACK")
+        signed_qty = case((is_rollback, -FifoLog.qty_terpakai), else_=FifoLog.qty_terpakai)
+        year_col = extract("year", FifoLog.invoice_date)
+        month_col = extract("month", FifoLog.invoice_date)
+        base_invoice = func.replace(FifoLog.invoice_id, "-ROLLBACK", "")
+
+        query = (
+            db.query(
+                year_col.label("tahun"),
+                month_col.label("bulan"),
+                Penjualan.customer_id.label("key"),
+                # one row per customer even if the name stored on the invoices changed
+                func.max(func.coalesce(Penjualan.customer_name, Customer.name)).label("label"),
+                func.sum(signed_qty).label("qty_terjual"),
+                func.sum(FifoLog.total_hpp).label("total_hpp"),
+                func.sum(FifoLog.total_penjualan).label("total_penjualan"),
+                func.sum(FifoLog.laba_kotor).label("laba_kotor"),
+            )
+            .select_from(FifoLog)
+            .outerjoin(Penjualan, Penjualan.no_penjualan == base_invoice)
+            .outerjoin(Customer, Customer.id == Penjualan.customer_id)
+            .filter(
+                FifoLog.invoice_date >= from_date_only,
+                FifoLog.invoice_date <= to_date_only,
+            )
+        )
+        if not include_adjustments:
+            query = query.filter(~FifoLog.invoice_id.like("ADJ-%"))
+        if item_id is not None:
+            query = query.filter(FifoLog.item_id == item_id)
+        group_cols = [Penjualan.customer_id]
+    else:
+        year_col = extract("year", ProfitDaily.date)
+        month_col = extract("month", ProfitDaily.date)
+
+        query = (
+            db.query(
+                year_col.label("tahun"),
+                month_col.label("bulan"),
+                Item.code.label("key"),
+                Item.name.label("label"),
+                func.sum(ProfitDaily.qty).label("qty_terjual"),
+                func.sum(ProfitDaily.hpp).label("total_hpp"),
+                func.sum(ProfitDaily.revenue).label("total_penjualan"),
+                func.sum(ProfitDaily.gross_profit).label("laba_kotor"),
+            )
+            .join(Item, Item.id == ProfitDaily.item_id)
+            .filter(
+                ProfitDaily.date >= from_date_only,
+                ProfitDaily.date <= to_date_only,
+            )
+        )
+        if not include_adjustments:
+            query = query.filter(ProfitDaily.is_adjustment.is_(False))
+        if item_id is not None:
+            query = query.filter(ProfitDaily.item_id == item_id)
+        group_cols = [ProfitDaily.item_id, Item.code, Item.name]
+
+    rows = query.group_by(year_col, month_col, *group_cols).all()
+
+    df = pd.DataFrame(
+        rows,
+        columns=["tahun", "bulan", "key", "label", "qty_terjual", "total_hpp", "total_penjualan", "laba_kotor"],
+    )
+    if df.empty:
+        return df
+
+    for col in ("qty_terjual", "total_hpp", "total_penjualan", "laba_kotor"):
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(float)
+
+    # Drop groups that net to zero (sale fully rolled back within the month)
+    df = df[~((df["total_hpp"].abs() < 0.01) & (df["total_penjualan"].abs() < 0.01))].copy()
+    if df.empty:
+        return df
+
+    df["periode"] = (
+        df["tahun"].astype(int).astype(str) + "-" + df["bulan"].astype(int).astype(str).str.zfill(2)
+    )
+    if group_by == "customer":
+        # a NULL customer_id makes pandas read the ids as float: keep "1", not "1.0"
+        df["key"] = df["key"].astype("Int64")
+    df["key"] = df["key"].astype(object).where(df["key"].notna(), "-").astype(str)
+    df["label"] = df["label"].fillna("Tanpa Customer" if group_by == "customer" else "N/A").astype(str)
+    # one label per key across all months too, so the pivot has one row per key
+    df["label"] = df.groupby("key")["label"].transform("max")
+    return df
+
+
+def _pivot_laba_rugi(df: pd.DataFrame, metric: str) -> pd.DataFrame:
+    """Reshape the aggregate frame into rows=(key, label), columns=periode."""
+    pivot = pd.pivot_table(
+        df,
+        index=["key", "label"],
+        columns="periode",
+        values=metric,
+        aggfunc="sum",
+        fill_value=0,
+    )
+    pivot = pivot.reindex(sorted(pivot.columns), axis=1)
+    pivot.columns = [str(c) for c in pivot.columns]
+    pivot["Total"] = pivot.sum(axis=1)
+    return pivot.sort_values("Total", ascending=False)
+
+
+@router.get(
+    "/laba-rugi/pivot",
+    status_code=status.HTTP_200_OK,
+    response_model=LabaRugiPivotResponse,
+    summary="Laporan Laba Rugi per bulan x item / customer",
+)
+def get_laba_rugi_pivot(
+    from_date: datetime = Query(..., description="Start datetime (ISO-8601)"),
+    to_date: Optional[datetime] = Query(None, description="End datetime (inclusive)"),
+    group_by: str = Query("item", regex="^(item|customer)$", description="Pivot rows: 'item' or 'customer'"),
+    metric: str = Query("laba_kotor", regex="^(laba_kotor|total_penjualan|total_hpp|qty_terjual)$"),
+    item_id: Optional[int] = Query(None, description="Filter by specific item"),
+    include_adjustments: bool = Query(False, description="Include stock adjustments (damaged goods, theft, etc.)"),
+    format: str = Query("json", regex="^(json|xlsx)$", description="'json' or 'xlsx'"),
+    db: Session = Depends(get_db),
+):
+    """
+    Comparative multi-period Laba Rugi.
+    Aggregates netted FIFO logs once per (month, item) or (month, customer) and
+    pivots them into one row per item/customer with one column per month.
+    """
+    if to_date is None:
+        to_date = datetime.now()
+
+    df = _laba_rugi_pivot_frame(
+        db, from_date.date(), to_date.date(), group_by, item_id, include_adjustments
+    )
+
+    metric_label = LABA_RUGI_PIVOT_METRICS[metric]
+    title_suffix = " (termasuk penyesuaian stok)" if include_adjustments else ""
+    title = (
+        f"Laporan {metric_label} per {'Customer' if group_by == 'customer' else 'Item'} "
+        f"{from_date:%d/%m/%Y} - {to_date:%d/%m/%Y}{title_suffix}"
+    )
+
+    pivot = _pivot_laba_rugi(df, metric) if not df.empty else pd.DataFrame(columns=["Total"])
+    periods = [c for c in pivot.columns if c != "Total"]
+
+    if format == "xlsx":
+        sheet = pivot.reset_index().rename(columns={
+            "key": "Customer ID" if group_by == "customer" else "Item Code",
+            "label": "Customer" if group_by == "customer" else "Item",
+        })
+        totals_row = {col: "" for col in sheet.columns}
+        totals_row[sheet.columns[0]] = "TOTAL"
+        for col in periods + ["Total"]:
+            totals_row[col] = float(sheet[col].sum()) if not sheet.empty else 0
+        sheet = pd.concat([sheet, pd.DataFrame([totals_row])], ignore_index=True)
+
+        output = io.BytesIO()
+        with pd.ExcelWriter(output, engine="openpyxl") as writer:
+            sheet.to_excel(writer, index=False, sheet_name="Laba Rugi Pivot", startrow=2)
+            ws = writer.sheets["Laba Rugi Pivot"]
+            ws.cell(row=1, column=1, value=title).font = Font(bold=True)
+            for col_idx in range(1, len(sheet.columns) + 1):
+                ws.cell(row=3, column=col_idx).font = Font(bold=True)
+                ws.cell(row=ws.max_row, column=col_idx).font = Font(bold=True)
+                if col_idx > 2:
+                    for row_idx in range(4, ws.max_row + 1):
+                        ws.cell(row=row_idx, column=col_idx).number_format = '#,##0.00'
+            ws.column_dimensions['A'].width = 15
+            ws.column_dimensions['B'].width = 30
+        output.seek(0)
+
+        adj_suffix = "_with_adjustments" if include_adjustments else ""
+        filename = f"laba_rugi_pivot_{group_by}_{from_date:%Y%m%d}_{to_date:%Y%m%d}{adj_suffix}.xlsx"
+        return StreamingResponse(
+            output,
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    data = [
+        LabaRugiPivotRow(
+            key=key,
+            label=label,
+            values={p: float(v) for p, v in zip(periods, values[:-1])},
+            total=float(values[-1]),
+        )
+        for (key, label), values in zip(pivot.index, pivot.to_numpy().tolist())
+    ]
+    period_totals = {p: float(pivot[p].sum()) for p in periods}
+
+    return LabaRugiPivotResponse(
+        title=title,
+        date_from=from_date,
+        date_to=to_date,
+        group_by=group_by,
+        metric=metric,
+        periods=periods,
+        data=data,
+        period_totals=period_totals,
+        grand_total=float(pivot["Total"].sum()) if not pivot.empty else 0,
+        total=len(data),
+    )
+
+
 @router.get(
     "/penjualan",
     status_code=status.HTTP_200_OK,
@@ -543,7 +714,7 @@ async def download_laba_rugi(
     summary="Laporan Penjualan (consolidated per sale)",
 )
 
-async def get_penjualan_laporan(
+def get_penjualan_laporan(
         from_date: datetime = Query(..., description="Start datetime (inclusive)"),
         to_date: Optional[datetime] = Query(None, description="End datetime (inclusive)"),
         customer_id: Optional[int] = Query(None, description="Customer ID"),
@@ -596,7 +767,7 @@ async def get_penjualan_laporan(
     def _dec(x) -> Decimal:
         return Decimal(str(x or 0))
 
-    report_rows: List[SalesReportRow] = []
+    report_rows: List[dict] = []
 
     for sale in sales:
         items = (
@@ -638,35 +809,30 @@ async def get_penjualan_laporan(
         final_total = max(total_subtotal - total_discount, Decimal("0"))
         grand_total = final_total + total_tax
 
-        report_rows.append(
-            SalesReportRow(
-                date=sale.date,
-                sales_due_date=sale.sales_due_date,
-                customer=sale.customer_name or sale.customer_name_rel or "—",
-                kode_lambung_rel=sale.penjualan_kode_lambung,
-                kode_lambung_penjualan=sale.penjualan_kode_lambung,
-                no_penjualan=sale.no_penjualan,
-                status=(sale.status_pembayaran.name.capitalize()
-                        if hasattr(sale.status_pembayaran, "name")
-                        else str(sale.status_pembayaran)),
-                item_code=", ".join(item_codes) or "No items",
-                item_name=", ".join(item_names) or "No items",
-                qty=total_qty,
-                price=(total_subtotal / total_qty) if total_qty > 0 else Decimal("0"),
-                sub_total=total_subtotal,
-                total=final_total,
-                tax=total_tax,
-                grand_total=grand_total,
-            )
-        )
+        report_rows.append({
+            "date": sale.date,
+            "sales_due_date": sale.sales_due_date,
+            "customer": sale.customer_name or sale.customer_name_rel or "—",
+            "kode_lambung_rel": sale.penjualan_kode_lambung,
+            "kode_lambung_penjualan": sale.penjualan_kode_lambung,
+            "no_penjualan": sale.no_penjualan,
+            "status": (sale.status_pembayaran.name.capitalize()
+                       if hasattr(sale.status_pembayaran, "name")
+                       else str(sale.status_pembayaran)),
+            "item_code": ", ".join(item_codes) or "No items",
+            "item_name": ", ".join(item_names) or "No items",
+            "qty": total_qty,
+            "price": (total_subtotal / total_qty) if total_qty > 0 else Decimal("0"),
+            "sub_total": total_subtotal,
+            "total": final_total,
+            "tax": total_tax,
+            "grand_total": grand_total,
+        })
 
-    title = f"Laporan Penjualan {from_date:%d/%m/%Y} - {to_date:%d/%m/%Y}"
-    return SalesReportResponse(
-        title=title,
-        date_from=from_date,
-        date_to=to_date,
-        data=report_rows,
-        total=total_count,
+    # Same body the response_model has always produced (data + total)
+    return validated_json(
+        PaginatedResponse[SalesReportRow],
+        {"data": report_rows, "total": total_count},
     )
 @router.get(
     "/penjualan/download",
@@ -680,7 +846,7 @@ async def get_penjualan_laporan(
     status_code=status.HTTP_200_OK,
     summary="Download Laporan Penjualan as XLSX (all records)",
 )
-async def download_penjualan_laporan(
+def download_penjualan_laporan(
     from_date: datetime = Query(..., description="Start datetime (inclusive)"),
     to_date: Optional[datetime ] = Query(None, description="End datetime (inclusive)"),
     customer_id: Optional[int] = Query(None, description="Customer ID"),
@@ -836,7 +1002,7 @@ async def download_penjualan_laporan(
         }
     )
 @router.get("/pembelian")
-async def get_pembelian_laporan(
+def get_pembelian_laporan(
     from_date: datetime = Query(...),
     to_date: Optional[datetime] = Query(None),
     skip: int = Query(0, ge=0),
@@ -878,7 +1044,7 @@ async def get_pembelian_laporan(
     def _dec(x) -> Decimal:
         return Decimal(str(x or 0))
 
-    report_rows: List[PurchaseReportRow] = []
+    report_rows: List[dict] = []
     
     for purchase in purchases:
         # Get all items for this purchase with proper Item.name
@@ -942,40 +1108,38 @@ async def get_pembelian_laporan(
             final_total = Decimal("0")
         grand_total = final_total + total_tax
 
-        report_rows.append(
-            PurchaseReportRow(
-                date=purchase.date,
-                sales_due_date = purchase.sales_due_date,
-                vendor=purchase.vendor_name_rel or "—",
-                no_pembelian=purchase.no_pembelian,
-                status=(purchase.status_pembayaran.name.capitalize() if hasattr(purchase.status_pembayaran, "name")
-                        else str(purchase.status_pembayaran)),
-                item_code=item_codes_str,  # Concatenated item codes
-                item_name=item_names_str,  # Concatenated actual item names from Item.name
-                qty=total_qty,
-                price=total_subtotal / total_qty if total_qty > 0 else Decimal("0"),  # Average price
-                sub_total=total_subtotal,
-                total=final_total,
-                tax=total_tax,
-                grand_total=grand_total,
-            )
-        )
+        report_rows.append({
+            "date": purchase.date,
+            "sales_due_date": purchase.sales_due_date,
+            "vendor": purchase.vendor_name_rel or "—",
+            "no_pembelian": purchase.no_pembelian,
+            "status": (purchase.status_pembayaran.name.capitalize() if hasattr(purchase.status_pembayaran, "name")
+                       else str(purchase.status_pembayaran)),
+            "item_code": item_codes_str,  # Concatenated item codes
+            "item_name": item_names_str,  # Concatenated actual item names from Item.name
+            "qty": total_qty,
+            "price": total_subtotal / total_qty if total_qty > 0 else Decimal("0"),  # Average price
+            "sub_total": total_subtotal,
+            "total": final_total,
+            "tax": total_tax,
+            "grand_total": grand_total,
+        })
 
     title = f"Laporan Pembelian {from_date:%d/%m/%Y} - {to_date:%d/%m/%Y}"
-    return PurchaseReportResponse(
-        title=title,
-        date_from=from_date,
-        date_to=to_date,
-        data=report_rows,
-        total=total_count,
-    )
+    return validated_json(PurchaseReportResponse, {
+        "title": title,
+        "date_from": from_date,
+        "date_to": to_date,
+        "data": report_rows,
+        "total": total_count,
+    })
 
 @router.get(
     "/pembelian/download",
     status_code=status.HTTP_200_OK,
     summary="Download Laporan Pembelian as XLSX (all records)",
 )
-async def download_pembelian_laporan(
+def download_pembelian_laporan(
     from_date: datetime = Query(..., description="Start datetime (inclusive)"),
     to_date: Optional[datetime ] = Query(None, description="End datetime (inclusive)"),
     db: Session = Depends(get_db),
@@ -1096,7 +1260,7 @@ async def download_pembelian_laporan(
         }
     )
 @router.get("/tren-penjualan", response_model=SalesTrendResponse)
-async def get_sales_trend(
+def get_sales_trend(
         period: str = Query(
             "mtd",
             regex="^(daily|mtd|custom)$",
@@ -1240,7 +1404,7 @@ def _D(x) -> Decimal:
     status_code=status.HTTP_200_OK,
     response_model=StockAdjustmentReportResponse,
 )
-async def get_stock_adjustment_report(
+def get_stock_adjustment_report(
     from_date: datetime = Query(..., description="Start datetime (inclusive)"),
     to_date: Optional[datetime] = Query(None, description="End datetime (inclusive)"),
     item_id: Optional[int] = Query(None, description="Filter by specific item"),
@@ -1715,7 +1879,7 @@ def _determine_source_type_from_invoice(invoice_id: str) -> str:
     status_code=status.HTTP_200_OK,
     summary="Download Stock Adjustment Report as XLSX (from BatchStock + FifoLog)",
 )
-async def download_stock_adjustment_report(
+def download_stock_adjustment_report(
     from_date: datetime = Query(..., description="Start datetime (inclusive)"),
     to_date: Optional[datetime] = Query(None, description="End datetime (inclusive)"),
     item_id: Optional[int] = Query(None, description="Filter by specific item"),
@@ -1902,7 +2066,7 @@ from datetime import datetime
 import pytz
 
 @router.post("/migrate-batch-stocks")
-async def migrate_batch_stocks_for_all_items(
+def migrate_batch_stocks_for_all_items(
     db: Session = Depends(get_db),
     batch_size: int = Query(100, description="Number of items to process per batch (default: 100)"),
     dry_run: bool = Query(False, description="Preview migration without committing changes"),
@@ -2088,7 +2252,7 @@ async def migrate_batch_stocks_for_all_items(
 
 
 @router.get("/migration-status")
-async def check_migration_status(
+def check_migration_status(
     db: Session = Depends(get_db),
 ):
     """
@@ -2154,4 +2318,49 @@ async def check_migration_status(
         raise HTTPException(
             status_code=500,
             detail=f"Error checking migration status: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.post("/analytics-export")
+def export_analytics_parquet(
+    db: Session = Depends(get_db),
+    tables: Optional[List[str]] = Query(None, description=f"Tables to export (default: all of {', '.join(EXPORT_TABLES.keys())})"),
+    incremental: bool = Query(True, description="Only export rows past the stored watermark"),
+    chunk_size: int = Query(50000, ge=1000, le=500000, description="Rows read and written per chunk"),
+):
+    """
+    Export FIFO, ledger, sales and purchase tables to month-partitioned Parquet
+    files under ANALYTICS_EXPORT_DIR for the BI team.
+
+    Same as running `python -m services.analytics_export_services`.
+    """
+    try:
+        return AnalyticsExportService.export_all(
+            db,
+            tables=tables,
+            incremental=incremental,
+            chunk_size=chunk_size,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analytics export failed: {str(e)}")
+
+
+@router.post("/profit-daily/rebuild")
+def rebuild_profit_daily(
+    db: Session = Depends(get_db),
+    from_date: Optional[date] = Query(None, description="Rebuild from this date (default: all)"),
+    to_date: Optional[date] = Query(None, description="Rebuild up to this date (default: all)"),
+):
+    """
+    Recreate the profit_daily summary from fifo_log.
+    Use after manual fixes to fifo_log; sale / rollback paths keep it up to date otherwise.
+
+    Same as running `python -m services.profit_daily_services`.
+    """
+    if from_date and to_date and from_date > to_date:
+        raise HTTPException(status_code=400, detail="from_date must be before to_date")
+    try:
+        return ProfitDailyService.rebuild(db, from_date, to_date)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Profit daily rebuild failed: {str(e)}")
@@ -1,19 +1,18 @@
 from datetime import date, datetime, time
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import or_
 from sqlalchemy.orm import Session, joinedload
 from typing import Dict, List, Optional
 
 from database import get_db
-from models.AuditTrail import AuditEntityEnum
 from models.Currency import Currency
 from models.TermOfPayment import TermOfPayment
 from models.Vendor import Vendor
+from routes.helper import paginate_keyset
 from schemas.PaginatedResponseSchemas import PaginatedResponse
 from schemas.UtilsSchemas import SearchableSelectResponse, SearchableSelectResponseVendor
 from schemas.VendorSchemas import VendorCreate, VendorUpdate, VendorOut
-from services.audit_services import AuditService
+from services.search_services import SearchService
 from utils import soft_delete_record, get_current_user_name, generate_incremental_id
 
 router = APIRouter()
@@ -32,6 +31,8 @@ def get_all_vendors(
         db: Session = Depends(get_db),
         page: int = 1,
         rowsPerPage: int = 10,
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides page)"),
+        with_total: bool = Query(True, description="Set false to skip the total count"),
         is_active: Optional[bool] = None,
         contains_deleted: Optional[bool] = False, 
         search_key: Optional[str] = None,
@@ -47,10 +48,7 @@ def get_all_vendors(
         query = query.filter(Vendor.is_active == is_active)
 
     if search_key is not None:
-        query = query.filter(or_(
-            Vendor.name.ilike(f"%{search_key}%"),
-            Vendor.id.ilike(f"%{search_key}%")
-        ))
+        query = query.filter(Vendor.id.in_(SearchService.matching_ids("vendor", search_key)))
 
     if from_date and to_date:
         query = query.filter(
@@ -64,17 +62,15 @@ def get_all_vendors(
     elif to_date:
         query = query.filter(Vendor.created_at <= datetime.combine(to_date, time.max))
 
-    total_count = query.count()
-
-    paginated_data = (
-        query.offset((page - 1) * rowsPerPage)
-        .limit(rowsPerPage)
-        .all()
+    page_result = paginate_keyset(
+        query, [(Vendor.id, False)], rowsPerPage,
+        cursor=cursor, offset=(page - 1) * rowsPerPage, with_total=with_total,
     )
 
     return {
-        "data": paginated_data,
-        "total": total_count,
+        "data": page_result.rows,
+        "total": page_result.total,
+        "next_cursor": page_result.next_cursor,
     }
 
 @router.get("/{vendor_id}", response_model=VendorOut)
@@ -97,7 +93,6 @@ def get_vendor_for_searchable(vendor_id: str, db: Session = Depends(get_db)):
 @router.post("", response_model=VendorOut, status_code=status.HTTP_201_CREATED)
 def create_vendor(data: VendorCreate, db: Session = Depends(get_db),    user_name: str = Depends(get_current_user_name)):
     # Validate foreign key relationships
-    audit_service = AuditService(db)
     if not db.query(Currency).filter(Currency.id == data.currency_id).first():
         raise HTTPException(400, f"Currency with ID '{data.currency_id}' not found.")
     if not db.query(TermOfPayment).filter(TermOfPayment.id == data.top_id).first():
@@ -126,10 +121,6 @@ def create_vendor(data: VendorCreate, db: Session = Depends(get_db),    user_nam
     vendor_data = data.dict()
     vendor_data['id'] = vendor_id
     vendor = Vendor(**vendor_data)
-    audit_service.default_log( entity_id=vendor.id,
-                               entity_type=AuditEntityEnum.VENDOR,
-                               description=f"Vendor {vendor.name} telah dibuat",
-                               user_name=user_name)
     db.add(vendor)
     db.commit()
     db.refresh(vendor)
@@ -139,7 +130,6 @@ def create_vendor(data: VendorCreate, db: Session = Depends(get_db),    user_nam
 
 @router.put("/{vendor_id}", response_model=VendorOut)
 def update_vendor(vendor_id: str, data: VendorUpdate, db: Session = Depends(get_db),    user_name: str = Depends(get_current_user_name)):
-    audit_service = AuditService(db)
     vendor = db.query(Vendor).filter(Vendor.id == vendor_id).first()
 
     if not vendor:
@@ -148,11 +138,6 @@ def update_vendor(vendor_id: str, data: VendorUpdate, db: Session = Depends(get_
     for key, value in data.dict().items():
         setattr(vendor, key, value)
 
-    audit_service.default_log(entity_id=vendor.id,
-                               entity_type=AuditEntityEnum.VENDOR,
-                               description=f"Data Vendor {vendor.name} telah diubah",
-                               user_name=user_name)
-
     db.commit()
     db.refresh(vendor)
     return vendor
@@ -8,6 +8,7 @@ from starlette import status
 from starlette.exceptions import HTTPException
 
 from models.Warehouse import Warehouse
+from routes.helper import paginate_keyset
 from schemas.PaginatedResponseSchemas import PaginatedResponse
 from schemas.UtilsSchemas import SearchableSelectResponse
 from schemas.WarehouseSchemas import WarehouseOut, WarehouseCreate, WarehouseUpdate
@@ -18,10 +19,12 @@ router = APIRouter()
 
 # Get all
 @router.get("", response_model=PaginatedResponse[WarehouseOut])
-async def get_all_warehouses(
+def get_all_warehouses(
         db: Session = Depends(get_db),
         skip: int = 0,
         limit: int = 10,
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides skip)"),
+        with_total: bool = Query(True, description="Set false to skip the total count"),
         is_active: Optional[bool] = None,
         contains_deleted: Optional[bool] = False, 
         search: Optional[str] = Query(None, description="Search warehouse by name"),
@@ -51,24 +54,27 @@ async def get_all_warehouses(
     elif to_date:
         query = query.filter(Warehouse.created_at <= datetime.combine(to_date, time.max))
 
-    total_count = query.count()
-    paginated_data = query.offset(skip).limit(limit).all()
+    page_result = paginate_keyset(
+        query, [(Warehouse.id, False)], limit,
+        cursor=cursor, offset=skip, with_total=with_total,
+    )
 
     return {
-        "data": paginated_data,
-        "total": total_count
+        "data": page_result.rows,
+        "total": page_result.total,
+        "next_cursor": page_result.next_cursor,
     }
 
 
 @router.get("/{warehouse_id}", response_model=WarehouseOut)
-async def get_warehouse(warehouse_id: int, db: Session = Depends(get_db)):
+def get_warehouse(warehouse_id: int, db: Session = Depends(get_db)):
     warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_id).first()
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
     return warehouse
 
 @router.get("/searchable/{warehouse_id}", response_model=SearchableSelectResponse)
-async def get_warehouse_for_searchable(warehouse_id: int, db: Session = Depends(get_db)):
+def get_warehouse_for_searchable(warehouse_id: int, db: Session = Depends(get_db)):
     warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_id).first()
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
@@ -76,7 +82,7 @@ async def get_warehouse_for_searchable(warehouse_id: int, db: Session = Depends(
 
 
 @router.post("", response_model=WarehouseOut, status_code=status.HTTP_201_CREATED)
-async def create_warehouse(warehouse_data: WarehouseCreate, db: Session = Depends(get_db)):
+def create_warehouse(warehouse_data: WarehouseCreate, db: Session = Depends(get_db)):
     warehouse = Warehouse(**warehouse_data.dict())
     db.add(warehouse)
     db.commit()
@@ -85,7 +91,7 @@ async def create_warehouse(warehouse_data: WarehouseCreate, db: Session = Depend
 
 # Update
 @router.put("/{warehouse_id}", response_model=WarehouseOut)
-async def update_warehouse(warehouse_id: int, warehouse_data: WarehouseUpdate, db: Session = Depends(get_db)):
+def update_warehouse(warehouse_id: int, warehouse_data: WarehouseUpdate, db: Session = Depends(get_db)):
     warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_id).first()
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
@@ -99,7 +105,7 @@ async def update_warehouse(warehouse_id: int, warehouse_data: WarehouseUpdate, d
 
 # Delete
 @router.delete("/{warehouse_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_warehouse(warehouse_id: int, db: Session = Depends(get_db)):
+def delete_warehouse(warehouse_id: int, db: Session = Depends(get_db)):
     warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_id).first()
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
@@ -0,0 +1,9 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+INVOICE_PDF_BATCH_MAX = 500
+
+
+class InvoicePdfBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=INVOICE_PDF_BATCH_MAX)
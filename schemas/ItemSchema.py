@@ -1,6 +1,6 @@
 import os
-from typing import List, Optional
-from datetime import datetime
+from typing import Dict, List, Optional
+from datetime import date, datetime
 from pydantic import BaseModel, computed_field
 
 from models.Item import ItemTypeEnum
@@ -8,6 +8,7 @@ from schemas.CategorySchemas import CategoryOut
 from schemas.SatuanSchemas import SatuanOut
 from schemas.TopSchemas import TopOut
 from schemas.VendorSchemas import VendorOut
+from services.image_services import ImageService
 
 class AttachmentResponse(BaseModel):
     id: int
@@ -34,6 +35,12 @@ class AttachmentResponse(BaseModel):
 
         return f"{base_url}/static/{relative_path}"
 
+    @computed_field
+    @property
+    def thumbnails(self) -> Optional[Dict[str, str]]:
+        # WebP variants {sm, md, lg}; None when the attachment isn't an image
+        return ImageService.thumbnail_urls(self.file_path)
+
 
 class ItemBase(BaseModel):
     type: ItemTypeEnum
@@ -79,4 +86,21 @@ class ItemResponse(ItemBase):
     attachments: List[AttachmentResponse] = []
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ItemWithStockResponse(ItemResponse):
+    # FIFO stock from open batches (GET /item?with_stock=true)
+    available_qty: int = 0
+    fifo_value: float = 0
+    oldest_batch_date: Optional[date] = None
+
+
+class LowStockItemResponse(BaseModel):
+    item_id: int
+    code: Optional[str] = None
+    name: str
+    sku: str
+    min_item: int
+    available_qty: int
+    shortage: int
+    since: datetime
@@ -9,10 +9,12 @@ class PaginatedResponse(BaseModel, Generic[T]):
     """
     A generic Pydantic model for paginated responses.
     `data` will be a list of items of type T.
-    `total` will be the total count of items.
+    `total` will be the total count of items (None when the caller passed with_total=false).
+    `next_cursor` is the token for the next page (keyset pagination), None on the last page.
     """
     data: List[T]
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
     # You can add more fields here if you need more pagination metadata, e.g.:
     # skip: int
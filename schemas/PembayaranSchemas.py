@@ -192,9 +192,10 @@ class PembayaranResponse(BaseModel):
 
 class PembayaranListResponse(BaseModel):
     data: List[PembayaranResponse]
-    total: int
+    total: Optional[int] = None
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
 
 # Filter schema for queries
 class PembayaranFilter(BaseModel):
@@ -182,9 +182,10 @@ class PengembalianResponse(BaseModel):
 
 class PengembalianListResponse(BaseModel):
     data: List[PengembalianResponse]
-    total: int
+    total: Optional[int] = None
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
 
 
 # Filter schema for queries
@@ -1,6 +1,6 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional, List, Union
+from typing import Dict, Optional, List, Union
 
 from pydantic import BaseModel, Field
 
@@ -68,6 +68,28 @@ class LabaRugiResponse(BaseModel):
     details: List[LabaRugiDetailRow] = Field(description="A list of all transaction detail rows.")
 
 
+class LabaRugiPivotRow(BaseModel):
+    """One pivot row (an item or a customer) with its value per period."""
+    key: str = Field(description="Item code or customer id of the row.")
+    label: str = Field(description="Item name or customer name of the row.")
+    values: Dict[str, float] = Field(description="Metric value per period (YYYY-MM).")
+    total: float = Field(default=0, description="Row total across all periods.")
+
+
+class LabaRugiPivotResponse(BaseModel):
+    """Laba Rugi pivoted by month x item (or x customer)."""
+    title: str
+    date_from: datetime
+    date_to: datetime
+    group_by: str
+    metric: str
+    periods: List[str] = Field(description="Period columns (YYYY-MM) in ascending order.")
+    data: List[LabaRugiPivotRow]
+    period_totals: Dict[str, float] = Field(description="Column totals per period.")
+    grand_total: float = 0
+    total: int = Field(description="Number of pivot rows.")
+
+
 class SalesReportRow(BaseModel):
     date: datetime                         # Penjualan.sales_date
     sales_due_date: datetime    
@@ -0,0 +1,268 @@
+import argparse
+import enum
+import json
+import os
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import Enum as SAEnum, select
+from sqlalchemy.orm import Session
+
+from models.BatchStock import BatchStock, FifoLog
+from models.InventoryLedger import InventoryLedger
+from models.Pembelian import Pembelian, PembelianItem
+from models.Penjualan import Penjualan, PenjualanItem
+
+ANALYTICS_EXPORT_DIR = os.getenv("ANALYTICS_EXPORT_DIR", "exports/analytics")
+WATERMARK_FILE = "_watermarks.json"
+
+# table name -> how to read it
+#   model:      ORM model whose table is exported
+#   watermark:  monotonic column used for incremental runs
+#   partition:  date column used for the month=YYYY-MM partition
+#   parent:     (parent model, fk column) when the partition date lives on the header
+EXPORT_TABLES = {
+    "fifo_log": {
+        "model": FifoLog,
+        "watermark": "id",
+        "partition": FifoLog.invoice_date,
+    },
+    "batch_stocks": {
+        "model": BatchStock,
+        "watermark": "updated_at",
+        "partition": BatchStock.tanggal_masuk,
+    },
+    "inventory_ledger": {
+        "model": InventoryLedger,
+        "watermark": "id",
+        "partition": InventoryLedger.trx_date,
+    },
+    "penjualans": {
+        "model": Penjualan,
+        "watermark": "id",
+        "partition": Penjualan.sales_date,
+    },
+    "penjualan_items": {
+        "model": PenjualanItem,
+        "watermark": "id",
+        "partition": Penjualan.sales_date,
+        "parent": (Penjualan, PenjualanItem.penjualan_id),
+    },
+    "pembelians": {
+        "model": Pembelian,
+        "watermark": "id",
+        "partition": Pembelian.sales_date,
+    },
+    "pembelian_items": {
+        "model": PembelianItem,
+        "watermark": "id",
+        "partition": Pembelian.sales_date,
+        "parent": (Pembelian, PembelianItem.pembelian_id),
+    },
+}
+
+
+class AnalyticsExportService:
+    """Chunked, month-partitioned Parquet export of the FIFO / sales / purchase tables."""
+
+    @staticmethod
+    def load_watermarks(output_dir: str) -> Dict[str, dict]:
+        path = os.path.join(output_dir, WATERMARK_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r") as f:
+            return json.load(f)
+
+    @staticmethod
+    def save_watermarks(output_dir: str, watermarks: Dict[str, dict]) -> None:
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, WATERMARK_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(watermarks, f, indent=2)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _decode_watermark(value, column):
+        if value is None:
+            return None
+        if column == "id":
+            return int(value)
+        return datetime.fromisoformat(value)
+
+    @staticmethod
+    def _encode_watermark(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def _normalize_frame(df: pd.DataFrame, table) -> pd.DataFrame:
+        """Enums become their string value so Parquet keeps a plain string column."""
+        for col in table.columns:
+            if isinstance(col.type, SAEnum) and col.name in df.columns:
+                df[col.name] = df[col.name].map(
+                    lambda v: v.value if isinstance(v, enum.Enum) else v
+                )
+        return df
+
+    @staticmethod
+    def export_table(
+        db: Session,
+        table_name: str,
+        output_dir: str,
+        incremental: bool = True,
+        chunk_size: int = 50000,
+        watermarks: Optional[Dict[str, dict]] = None,
+    ) -> dict:
+        """
+        Stream one table in keyset-ordered chunks and write each chunk as
+        `<output_dir>/<table>/month=YYYY-MM/part-<run>-<chunk>.parquet`.
+
+        Incremental runs only read rows whose watermark column is beyond the
+        value stored from the previous run. Rows re-exported because their
+        `updated_at` moved (batch_stocks) appear again in a newer part file;
+        consumers keep the latest copy per primary key.
+        """
+        if table_name not in EXPORT_TABLES:
+            raise ValueError(f"Unknown table {table_name}")
+
+        config = EXPORT_TABLES[table_name]
+        model = config["model"]
+        table = model.__table__
+        pk_col = list(table.primary_key.columns)[0]
+        wm_name = config["watermark"]
+        wm_col = table.c[wm_name]
+
+        watermarks = watermarks if watermarks is not None else {}
+        previous = watermarks.get(table_name, {}) if incremental else {}
+        last_value = AnalyticsExportService._decode_watermark(previous.get("value"), wm_name)
+
+        partition_col = config["partition"].label("_partition_date")
+        base = select(table, partition_col)
+        if "parent" in config:
+            parent_model, fk_col = config["parent"]
+            parent_table = parent_model.__table__
+            parent_pk = list(parent_table.primary_key.columns)[0]
+            base = base.select_from(table.outerjoin(parent_table, fk_col == parent_pk))
+
+        if last_value is not None:
+            base = base.where(wm_col > last_value)
+
+        run_id = datetime.now().strftime("%Y%m%d%H%M%S")
+        table_dir = os.path.join(output_dir, table_name)
+
+        rows_written = 0
+        files_written = 0
+        chunk_no = 0
+        max_watermark = last_value
+
+        # Keyset pagination on (watermark, pk) keeps every chunk an index range scan
+        # and memory bounded by chunk_size regardless of table size.
+        cursor = None
+        while True:
+            stmt = base.order_by(wm_col, pk_col).limit(chunk_size)
+            if cursor is not None:
+                cur_wm, cur_pk = cursor
+                stmt = stmt.where((wm_col > cur_wm) | ((wm_col == cur_wm) & (pk_col > cur_pk)))
+
+            rows = db.execute(stmt).mappings().all()
+            if not rows:
+                break
+
+            df = pd.DataFrame(rows)
+            df = AnalyticsExportService._normalize_frame(df, table)
+
+            partition_dates = pd.to_datetime(df.pop("_partition_date"), errors="coerce")
+            df["month"] = partition_dates.dt.strftime("%Y-%m").fillna("unknown")
+
+            for month, part in df.groupby("month", sort=False):
+                part_dir = os.path.join(table_dir, f"month={month}")
+                os.makedirs(part_dir, exist_ok=True)
+                part.drop(columns=["month"]).to_parquet(
+                    os.path.join(part_dir, f"part-{run_id}-{chunk_no:05d}.parquet"),
+                    engine="pyarrow",
+                    index=False,
+                )
+                files_written += 1
+
+            last_row = rows[-1]
+            cursor = (last_row[wm_name], last_row[pk_col.name])
+            if max_watermark is None or last_row[wm_name] > max_watermark:
+                max_watermark = last_row[wm_name]
+
+            rows_written += len(rows)
+            chunk_no += 1
+
+        if max_watermark is not None:
+            watermarks[table_name] = {
+                "column": wm_name,
+                "value": AnalyticsExportService._encode_watermark(max_watermark),
+                "exported_at": datetime.now().isoformat(),
+            }
+
+        return {
+            "table": table_name,
+            "rows": rows_written,
+            "files": files_written,
+            "watermark": watermarks.get(table_name, {}).get("value"),
+        }
+
+    @staticmethod
+    def export_all(
+        db: Session,
+        tables: Optional[List[str]] = None,
+        output_dir: Optional[str] = None,
+        incremental: bool = True,
+        chunk_size: int = 50000,
+    ) -> dict:
+        output_dir = output_dir or ANALYTICS_EXPORT_DIR
+        tables = tables or list(EXPORT_TABLES.keys())
+
+        unknown = [t for t in tables if t not in EXPORT_TABLES]
+        if unknown:
+            raise ValueError(f"Unknown table(s): {', '.join(unknown)}")
+
+        watermarks = AnalyticsExportService.load_watermarks(output_dir)
+        results = []
+        for table_name in tables:
+            results.append(
+                AnalyticsExportService.export_table(
+                    db, table_name, output_dir, incremental, chunk_size, watermarks
+                )
+            )
+            # Persist after every table so a crash mid-run doesn't re-export finished tables
+            AnalyticsExportService.save_watermarks(output_dir, watermarks)
+
+        return {
+            "output_dir": os.path.abspath(output_dir),
+            "incremental": incremental,
+            "tables": results,
+            "total_rows": sum(r["rows"] for r in results),
+        }
+
+
+if __name__ == "__main__":
+    # python -m services.analytics_export_services [--full] [--tables fifo_log penjualans]
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Export analytics tables to partitioned Parquet")
+    parser.add_argument("--tables", nargs="*", default=None, choices=list(EXPORT_TABLES.keys()))
+    parser.add_argument("--output-dir", default=ANALYTICS_EXPORT_DIR)
+    parser.add_argument("--full", action="store_true", help="Ignore watermarks and export everything")
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        summary = AnalyticsExportService.export_all(
+            session,
+            tables=args.tables,
+            output_dir=args.output_dir,
+            incremental=not args.full,
+            chunk_size=args.chunk_size,
+        )
+        print(json.dumps(summary, indent=2))
+    finally:
+        session.close()
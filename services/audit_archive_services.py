@@ -0,0 +1,207 @@
+import argparse
+import gzip
+import json
+import os
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pytz
+from sqlalchemy.orm import Session
+
+from models.AuditArchive import AuditArchive
+from models.AuditTrail import AuditTrail
+
+AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", "archive/audit")
+# entries older than this many whole months are moved out of audit_trails
+AUDIT_ARCHIVE_MONTHS = int(os.getenv("AUDIT_ARCHIVE_MONTHS", "6"))
+AUDIT_ARCHIVE_CHUNK_SIZE = int(os.getenv("AUDIT_ARCHIVE_CHUNK_SIZE", "5000"))
+
+_JAKARTA = pytz.timezone("Asia/Jakarta")
+
+
+def _naive(value: datetime) -> datetime:
+    """audit timestamps are Jakarta time; MySQL / SQLite hand them back without tzinfo"""
+    if value.tzinfo is not None:
+        return value.astimezone(_JAKARTA).replace(tzinfo=None)
+    return value
+
+
+class AuditArchiveService:
+    """
+    Rolling archive for audit_trails.
+
+    compact() moves entries older than N months into one gzip-compressed
+    JSONL file per month (AUDIT_ARCHIVE_DIR/audit-YYYY-MM.jsonl.gz), one gzip
+    member per batch, and records each batch in audit_archives. search()
+    reads those files for the archive query endpoint, so the hot table stays
+    small and its indexed entity / user lookups stay fast.
+    """
+
+    @staticmethod
+    def cutoff(months: int = AUDIT_ARCHIVE_MONTHS, today: Optional[date] = None) -> datetime:
+        """Start of the month `months` months before the current one (Jakarta time)."""
+        today = today or datetime.now(_JAKARTA).date()
+        index = today.year * 12 + (today.month - 1) - months
+        return datetime(index // 12, index % 12 + 1, 1)
+
+    @staticmethod
+    def archive_path(year: int, month: int) -> str:
+        return os.path.join(AUDIT_ARCHIVE_DIR, f"audit-{year:04d}-{month:02d}.jsonl.gz")
+
+    @staticmethod
+    def to_record(row: AuditTrail) -> dict:
+        return {
+            "id": row.id,
+            "entity_type": row.entity_type.value if row.entity_type else None,
+            "entity_id": row.entity_id,
+            "description": row.description,
+            "changes": row.changes,
+            "user_name": row.user_name,
+            "timestamp": _naive(row.timestamp).isoformat(sep=" ", timespec="seconds"),
+        }
+
+    @staticmethod
+    def compact(db: Session, months: int = AUDIT_ARCHIVE_MONTHS, chunk_size: int = AUDIT_ARCHIVE_CHUNK_SIZE) -> dict:
+        """
+        Move entries older than cutoff(months) into the archive files, in id
+        order and chunks of chunk_size. Each chunk is written and fsynced
+        before its rows are deleted (by id) and the batch is recorded in the
+        same commit; a crash in between can only duplicate entries, which
+        search() drops.
+        """
+        cutoff = AuditArchiveService.cutoff(months)
+        os.makedirs(AUDIT_ARCHIVE_DIR, exist_ok=True)
+        moved = 0
+        files = set()
+        last_id = 0
+
+        try:
+            while True:
+                # keyset on the primary key: one pass over the table for the whole run
+                batch = (
+                    db.query(AuditTrail)
+                    .filter(AuditTrail.id > last_id, AuditTrail.timestamp < cutoff)
+                    .order_by(AuditTrail.id)
+                    .limit(chunk_size)
+                    .all()
+                )
+                if not batch:
+                    break
+
+                by_month: Dict[Tuple[int, int], List[AuditTrail]] = {}
+                for row in batch:
+                    ts = _naive(row.timestamp)
+                    by_month.setdefault((ts.year, ts.month), []).append(row)
+
+                for (year, month), month_rows in by_month.items():
+                    path = AuditArchiveService.archive_path(year, month)
+                    AuditArchiveService._append(path, month_rows)
+                    db.add(AuditArchive(
+                        year=year,
+                        month=month,
+                        file_path=path,
+                        row_count=len(month_rows),
+                        first_id=month_rows[0].id,
+                        last_id=month_rows[-1].id,
+                    ))
+                    files.add(path)
+
+                ids = [row.id for row in batch]
+                db.query(AuditTrail).filter(AuditTrail.id.in_(ids)).delete(synchronize_session=False)
+                db.commit()
+                db.expunge_all()
+
+                moved += len(batch)
+                last_id = ids[-1]
+                if len(batch) < chunk_size:
+                    break
+        except Exception:
+            db.rollback()
+            raise
+
+        return {"cutoff": cutoff.isoformat(), "moved": moved, "files": sorted(files)}
+
+    @staticmethod
+    def _append(path: str, rows: List[AuditTrail]) -> None:
+        # one gzip member per batch; gzip readers read concatenated members as one stream
+        with open(path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as archive:
+                for row in rows:
+                    line = json.dumps(AuditArchiveService.to_record(row), ensure_ascii=False, separators=(",", ":"))
+                    archive.write(line.encode("utf-8") + b"\n")
+            raw.flush()
+            os.fsync(raw.fileno())
+
+    @staticmethod
+    def _read(path: str) -> Iterator[dict]:
+        if not os.path.exists(path):
+            return
+        with gzip.open(path, "rt", encoding="utf-8") as archive:
+            for line in archive:
+                if line.strip():
+                    yield json.loads(line)
+
+    @staticmethod
+    def search(
+        db: Session,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[str] = None,
+        user_name: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        limit: int = 50,
+    ) -> dict:
+        """
+        Archived entries matching the filters, newest first. Only the month
+        files overlapping date_from / date_to are read, newest month first,
+        stopping once `limit` matches are found.
+        """
+        query = db.query(AuditArchive.year, AuditArchive.month, AuditArchive.file_path).distinct()
+        if date_from:
+            query = query.filter(AuditArchive.year * 12 + AuditArchive.month >= date_from.year * 12 + date_from.month)
+        if date_to:
+            query = query.filter(AuditArchive.year * 12 + AuditArchive.month <= date_to.year * 12 + date_to.month)
+        periods = query.order_by(AuditArchive.year.desc(), AuditArchive.month.desc()).all()
+
+        entity_type = entity_type.upper() if entity_type else None
+        user_prefix = user_name.lower() if user_name else None
+        start = date_from.isoformat() if date_from else None
+        end = date_to.isoformat() if date_to else None
+
+        matches = {}
+        scanned = 0
+        for _, _, path in periods:
+            scanned += 1
+            for record in AuditArchiveService._read(path):
+                if entity_type and record["entity_type"] != entity_type:
+                    continue
+                if entity_id and record["entity_id"] != entity_id:
+                    continue
+                if user_prefix and not (record["user_name"] or "").lower().startswith(user_prefix):
+                    continue
+                day = record["timestamp"][:10]
+                if (start and day < start) or (end and day > end):
+                    continue
+                matches[record["id"]] = record
+            if len(matches) >= limit:
+                break
+
+        items = sorted(matches.values(), key=lambda r: (r["timestamp"], r["id"]), reverse=True)[:limit]
+        return {"items": items, "limit": limit, "scanned_files": scanned}
+
+
+if __name__ == "__main__":
+    # python -m services.audit_archive_services --months 6
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Move old audit_trails entries into compressed JSONL archive files")
+    parser.add_argument("--months", type=int, default=AUDIT_ARCHIVE_MONTHS,
+                        help="keep this many whole months in audit_trails")
+    parser.add_argument("--chunk-size", type=int, default=AUDIT_ARCHIVE_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        print(json.dumps(AuditArchiveService.compact(session, args.months, args.chunk_size), indent=2))
+    finally:
+        session.close()
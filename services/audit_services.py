@@ -1,13 +1,114 @@
-import json
-from typing import Any, Dict, Optional
+import atexit
+import os
+import queue
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, insert, inspect, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
-from fastapi import Request, Depends
 
-from models.AuditTrail import AuditTrail, AuditEntityEnum
+from models.AuditTrail import AuditTrail, AuditEntityEnum, get_jkt_now
+from models.mixin.AuditMixin import AUDIT_PENDING_KEY
+
+# "true": entries are handed to a background writer after commit instead of
+# being inserted inside the committing transaction
+AUDIT_ASYNC = os.getenv("AUDIT_ASYNC", "false").lower() in ("1", "true", "yes")
+AUDIT_QUEUE_BATCH_SIZE = int(os.getenv("AUDIT_QUEUE_BATCH_SIZE", "500"))
+AUDIT_QUEUE_FLUSH_INTERVAL = float(os.getenv("AUDIT_QUEUE_FLUSH_INTERVAL", "1.0"))
+
+# session.info keys
+# shared with the AuditMixin change capture, which buffers its rows there too
+_PENDING_KEY = AUDIT_PENDING_KEY
+_COMMITTED_KEY = "audit_committed_entries"
+_SAVEPOINTS_KEY = "audit_savepoint_marks"
+
+
+class AuditQueueWriter:
+    """
+    Background writer for AUDIT_ASYNC: committed entries are queued and
+    bulk-inserted by one daemon thread, in batches of AUDIT_QUEUE_BATCH_SIZE
+    or every AUDIT_QUEUE_FLUSH_INTERVAL seconds. Drained at interpreter exit.
+    """
+
+    def __init__(self, batch_size: int = AUDIT_QUEUE_BATCH_SIZE, interval: float = AUDIT_QUEUE_FLUSH_INTERVAL):
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._batch_size = batch_size
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def put(self, entries: List[dict]) -> None:
+        self._ensure_started()
+        for entry in entries:
+            self._queue.put(entry)
 
+    def stop(self) -> None:
+        """Write whatever is queued and stop the thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            batch = []
+            try:
+                entry = self._queue.get(timeout=self._interval)
+                while True:
+                    if entry is None:
+                        running = False
+                        break
+                    batch.append(entry)
+                    if len(batch) >= self._batch_size:
+                        break
+                    entry = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            if batch:
+                self._write(batch)
+
+    @staticmethod
+    def _write(batch: List[dict]) -> None:
+        from database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            db.execute(insert(AuditTrail), batch)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Failed to write {len(batch)} audit entries: {e}")
+        finally:
+            db.close()
+
+
+writer = AuditQueueWriter()
 
 
 class AuditService:
+    """
+    Audit trail writer. default_log() only buffers the entry in the session;
+    the entries of a transaction are bulk-inserted when it commits (same
+    transaction, so they are atomic with the change they describe) or, with
+    AUDIT_ASYNC, queued for the background writer after the commit.
+    Rolled back transactions / savepoints drop their entries.
+
+    An entity that AuditMixin already captured in the transaction doesn't get
+    a second row: the default_log() description replaces the generic one of
+    its change row (several are joined with "; ").
+    """
+
     def __init__(self, db: Session):
         self.db = db
 
@@ -16,16 +117,119 @@ class AuditService:
               entity_id: str,
               entity_type: AuditEntityEnum,
               description: str,
-              user_name: str ):
+              user_name: str ) -> dict:
 
-        audit_entry = AuditTrail(
-            entity_id=entity_id,
-            entity_type=entity_type,
-            description=description,
-            user_name=user_name
-        )
-        self.db.add(audit_entry)
-        self.db.commit()
+        audit_entry = {
+            "entity_id": str(entity_id),
+            "entity_type": entity_type,
+            "description": description,
+            "changes": None,
+            "user_name": user_name,
+            "timestamp": get_jkt_now(),
+        }
+        self.db.info.setdefault(_PENDING_KEY, []).append(audit_entry)
         return audit_entry
 
+    @staticmethod
+    def ensure_columns(engine: Engine) -> list:
+        """
+        create_all() doesn't add columns to existing tables: add audit_trails
+        columns introduced later (changes, the AuditMixin JSON diff). Idempotent.
+        """
+        table = AuditTrail.__table__
+        existing = {c["name"] for c in inspect(engine).get_columns(table.name)}
+        missing = [c for c in table.columns if c.name not in existing]
+        if missing:
+            with engine.begin() as conn:
+                for column in missing:
+                    ddl_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {ddl_type} NULL"))
+        return [c.name for c in missing]
+
+    @staticmethod
+    def ensure_indexes(engine: Engine) -> list:
+        """Create the audit_trails indexes missing on an existing table; returns their names."""
+        existing = {ix["name"] for ix in inspect(engine).get_indexes(AuditTrail.__tablename__)}
+        created = []
+        with engine.begin() as conn:
+            for index in AuditTrail.__table__.indexes:
+                if index.name not in existing:
+                    index.create(conn, checkfirst=True)
+                    created.append(index.name)
+        return created
+
+    @staticmethod
+    def flush(db: Session) -> int:
+        """Insert the buffered entries now (still inside the current transaction)."""
+        entries = AuditService._merge_descriptions(db.info.pop(_PENDING_KEY, None) or [])
+        if not entries:
+            return 0
+        db.execute(insert(AuditTrail), entries)
+        return len(entries)
+
+    @staticmethod
+    def _merge_descriptions(entries: List[dict]) -> List[dict]:
+        """Fold default_log() entries into the latest change row of the same entity."""
+        captured = {}
+        for entry in entries:
+            if entry["changes"] is not None:
+                captured[(entry["entity_type"], entry["entity_id"])] = entry
+        merged, described = [], set()
+        for entry in entries:
+            target = captured.get((entry["entity_type"], entry["entity_id"])) if entry["changes"] is None else None
+            if target is None:
+                merged.append(entry)
+            elif id(target) in described:
+                target["description"] = f"{target['description']}; {entry['description']}"
+            else:
+                target["description"] = entry["description"]
+                described.add(id(target))
+        return merged
+
+
+@event.listens_for(Session, "after_transaction_create")
+def _mark_savepoint(session: Session, transaction):
+    if transaction.nested:
+        marks: Dict[int, int] = session.info.setdefault(_SAVEPOINTS_KEY, {})
+        marks[id(transaction)] = len(session.info.get(_PENDING_KEY, ()))
+
+
+@event.listens_for(Session, "before_commit")
+def _write_before_commit(session: Session):
+    # also fires when a savepoint is released; entries wait for the outer commit
+    if session.in_nested_transaction():
+        return
+    # commit() flushes only after before_commit: flush first so the change capture sees everything
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+    if not session.info.get(_PENDING_KEY):
+        return
+    if AUDIT_ASYNC:
+        session.info.setdefault(_COMMITTED_KEY, []).extend(
+            AuditService._merge_descriptions(session.info.pop(_PENDING_KEY))
+        )
+    else:
+        AuditService.flush(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_after_commit(session: Session):
+    if session.in_nested_transaction():
+        return
+    session.info.pop(_SAVEPOINTS_KEY, None)
+    entries = session.info.pop(_COMMITTED_KEY, None)
+    if entries:
+        writer.put(entries)
+
 
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session: Session, previous_transaction):
+    mark = session.info.get(_SAVEPOINTS_KEY, {}).pop(id(previous_transaction), None)
+    if previous_transaction.nested:
+        # savepoint: keep what was logged before it started
+        if mark is not None and session.info.get(_PENDING_KEY):
+            del session.info[_PENDING_KEY][mark:]
+        return
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_COMMITTED_KEY, None)
+    session.info.pop(_SAVEPOINTS_KEY, None)
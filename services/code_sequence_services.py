@@ -0,0 +1,163 @@
+import argparse
+import json
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import Integer, cast, func, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.CodeSequence import CodeSequence
+from models.Customer import Customer
+from models.Item import Item
+from models.Vendor import Vendor
+
+# prefix -> column its codes live in (item prefixes: routes.item_routes.get_item_prefix)
+CODE_SEQUENCE_SOURCES = {
+    "FG-": Item.code,
+    "RAW-": Item.code,
+    "SERVICE-": Item.code,
+    "CUS-": Customer.code,
+    "VEN-": Vendor.id,
+}
+
+
+class CodeSequenceService:
+    """
+    Per-prefix counters for master data codes (code_sequences).
+
+    reserve() runs in its own short transaction, like a database sequence:
+    the counter is committed right away, so the caller's rollback never hands
+    the same code out twice and concurrent creates / imports only wait for
+    one UPDATE. Codes of rolled back creates are skipped (gaps are fine).
+
+    SQLite is the exception: a second connection can't write while the
+    caller's transaction holds the database lock, so there the counter is
+    moved inside the caller's transaction (writers are serialized anyway).
+    """
+
+    @staticmethod
+    def reserve(db: Session, prefix: str, n: int = 1, column=None) -> range:
+        """
+        Reserve n consecutive numbers for prefix; returns them as a range.
+        column (where the codes are stored) seeds the counter from existing
+        codes the first time a prefix is used.
+        """
+        if n < 1:
+            return range(0)
+        column = column if column is not None else CODE_SEQUENCE_SOURCES.get(prefix)
+
+        if CodeSequenceService._in_caller_transaction(db):
+            return CodeSequenceService._reserve(db, prefix, n, column)
+        with Session(bind=db.get_bind()) as session:
+            reserved = CodeSequenceService._reserve(session, prefix, n, column)
+            session.commit()
+            return reserved
+
+    @staticmethod
+    def _reserve(session: Session, prefix: str, n: int, column) -> range:
+        """Increment (or create) the counter of prefix in session's transaction; the caller commits."""
+        for _ in range(2):
+            result = session.execute(
+                update(CodeSequence)
+                .where(CodeSequence.prefix == prefix)
+                .values(last_value=CodeSequence.last_value + n, updated_at=datetime.now())
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                last = session.query(CodeSequence.last_value).filter(CodeSequence.prefix == prefix).scalar()
+                return range(last - n + 1, last + 1)
+
+            start = CodeSequenceService.max_existing(session, prefix, column) if column is not None else 0
+            try:
+                with session.begin_nested():
+                    session.execute(insert(CodeSequence).values(prefix=prefix, last_value=start + n))
+                return range(start + 1, start + n + 1)
+            except IntegrityError:
+                # another worker created the counter first
+                pass
+        raise ValueError(f"Could not reserve codes for prefix '{prefix}'")
+
+    @staticmethod
+    def _in_caller_transaction(db: Session) -> bool:
+        # SQLite allows one writer at a time: a separate connection would wait
+        # for the caller's own write lock until busy_timeout ("database is locked")
+        return db.get_bind().dialect.name == "sqlite"
+
+    @staticmethod
+    def next_codes(db: Session, prefix: str, n: int, column, padding: int = 5) -> List[str]:
+        """
+        n new codes PREFIX00001... that are not in column yet. Codes written
+        without the counter (client supplied codes, manual inserts) are caught
+        by one IN lookup; the counter then jumps past them and reserves again.
+        """
+        codes: List[str] = []
+        for _ in range(3):
+            batch = [f"{prefix}{i:0{padding}d}" for i in CodeSequenceService.reserve(db, prefix, n - len(codes), column)]
+            taken = {code for (code,) in db.query(column).filter(column.in_(batch))}
+            codes.extend(code for code in batch if code not in taken)
+            if len(codes) == n:
+                return codes
+            CodeSequenceService.catch_up(db, prefix, column)
+        raise ValueError(f"Could not generate {n} free codes for prefix '{prefix}'")
+
+    @staticmethod
+    def catch_up(db: Session, prefix: str, column) -> None:
+        """Raise the counter of prefix to the highest code in column (own transaction, see reserve)."""
+        existing = CodeSequenceService.max_existing(db, prefix, column)
+        statement = (
+            update(CodeSequence)
+            .where(CodeSequence.prefix == prefix, CodeSequence.last_value < existing)
+            .values(last_value=existing, updated_at=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        if CodeSequenceService._in_caller_transaction(db):
+            db.execute(statement)
+            return
+        with Session(bind=db.get_bind()) as session:
+            session.execute(statement)
+            session.commit()
+
+    @staticmethod
+    def max_existing(db: Session, prefix: str, column) -> int:
+        """Highest numeric tail of codes in column that start with prefix."""
+        return db.query(
+            func.coalesce(func.max(cast(func.substr(column, len(prefix) + 1), Integer)), 0)
+        ).filter(column.like(f"{prefix}%")).scalar() or 0
+
+    @staticmethod
+    def seed(db: Session, sources: Optional[dict] = None) -> dict:
+        """
+        Migration: create / raise the counters of the known prefixes to the
+        highest code already in the data. Idempotent, never lowers a counter.
+        """
+        sources = sources or CODE_SEQUENCE_SOURCES
+        counters = {}
+        try:
+            for prefix, column in sources.items():
+                existing = CodeSequenceService.max_existing(db, prefix, column)
+                row = db.query(CodeSequence).filter(CodeSequence.prefix == prefix).with_for_update().first()
+                if row is None:
+                    db.add(CodeSequence(prefix=prefix, last_value=existing))
+                elif row.last_value < existing:
+                    row.last_value = existing
+                counters[prefix] = max(existing, row.last_value if row else 0)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return counters
+
+
+if __name__ == "__main__":
+    # python -m services.code_sequence_services
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Seed master data code counters from existing codes")
+    parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        print(json.dumps(CodeSequenceService.seed(session), indent=2))
+    finally:
+        session.close()
@@ -0,0 +1,102 @@
+import argparse
+import json
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.DocumentSequence import DocumentSequence
+
+
+class DocumentSequenceService:
+    """
+    Counters behind the PREFIX/NNNN/MM/YYYY document numbers (document_sequences).
+
+    next_value() increments the (prefix, year, month) row with a single
+    UPDATE, which takes the row lock (MySQL) / write lock (SQLite) until the
+    caller's transaction ends. Concurrent creates with the same prefix wait
+    for each other instead of scanning and retrying, and a rolled back create
+    also rolls back its increment, so numbers stay gap-free.
+    """
+
+    @staticmethod
+    def next_value(
+        db: Session,
+        prefix: str,
+        year: int,
+        month: int,
+        seed: Optional[Callable[[], int]] = None,
+    ) -> int:
+        """
+        Next sequence number for prefix in year/month.
+        seed() gives the highest number already used, it is only called the
+        first time a prefix is used in a month (documents created before the
+        counter existed).
+        """
+        for _ in range(2):
+            if DocumentSequenceService._increment(db, prefix, year, month):
+                return DocumentSequenceService.current_value(db, prefix, year, month)
+
+            start = (seed() if seed else 0) or 0
+            try:
+                # savepoint: a worker that inserts the same row first only costs us a retry
+                with db.begin_nested():
+                    db.add(DocumentSequence(prefix=prefix, year=year, month=month, last_value=start + 1))
+                return start + 1
+            except IntegrityError:
+                continue
+        raise ValueError(f"Could not allocate a document number for {prefix} {month:02d}/{year}")
+
+    @staticmethod
+    def current_value(db: Session, prefix: str, year: int, month: int) -> int:
+        return (
+            db.query(DocumentSequence.last_value)
+            .filter(
+                DocumentSequence.prefix == prefix,
+                DocumentSequence.year == year,
+                DocumentSequence.month == month,
+            )
+            .scalar()
+        ) or 0
+
+    @staticmethod
+    def format_number(prefix: str, value: int, year: int, month: int) -> str:
+        return f"{prefix}/{value:04d}/{month:02d}/{year}"
+
+    @staticmethod
+    def _increment(db: Session, prefix: str, year: int, month: int) -> bool:
+        result = db.execute(
+            update(DocumentSequence)
+            .where(
+                DocumentSequence.prefix == prefix,
+                DocumentSequence.year == year,
+                DocumentSequence.month == month,
+            )
+            .values(last_value=DocumentSequence.last_value + 1, updated_at=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount > 0
+
+
+if __name__ == "__main__":
+    # python -m services.document_sequence_services QP/SI
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Show document number counters")
+    parser.add_argument("prefix", nargs="?")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        query = session.query(DocumentSequence)
+        if args.prefix:
+            query = query.filter(DocumentSequence.prefix == args.prefix)
+        rows = query.order_by(DocumentSequence.prefix, DocumentSequence.year, DocumentSequence.month).all()
+        print(json.dumps([
+            {"prefix": r.prefix, "year": r.year, "month": r.month, "last_value": r.last_value}
+            for r in rows
+        ], indent=2))
+    finally:
+        session.close()
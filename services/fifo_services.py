@@ -1,10 +1,11 @@
 from decimal import Decimal
 from datetime import date
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from sqlalchemy import and_, desc, func, or_
 
 from models.BatchStock import BatchStock, FifoLog, SourceTypeEnum
+from services.profit_daily_services import ProfitDailyService
 
 class FifoService:
     """Service untuk handle FIFO logic"""
@@ -130,6 +131,7 @@ class FifoService:
             db.add(reversal_log)
             reversal_logs.append(reversal_log)
         
+        ProfitDailyService.apply_logs(db, reversal_logs)
         db.commit()
         
         return {
@@ -141,91 +143,6 @@ class FifoService:
         }
 
 
-    @staticmethod
-    def get_laporan_laba_rugi(
-        db: Session,
-        start_date: date,
-        end_date: date,
-        item_id: Optional[int] = None,
-        include_rollbacks: bool = False
-    ) -> List[dict]:
-        """
-        Generate Laporan Laba Rugi dari FIFO logs.
-        Completely excludes rolled-back transactions from report.
-        
-        Args:
-            start_date: Start date for report
-            end_date: End date for report
-            item_id: Optional filter by item
-            include_rollbacks: If False (default), excludes rolled-back sales
-        """
-        query = db.query(FifoLog).filter(
-            and_(
-                FifoLog.invoice_date >= start_date,
-                FifoLog.invoice_date <= end_date
-            )
-        )
-        
-        if item_id is not None:
-            query = query.filter(FifoLog.item_id == item_id)
-        
-        # Always exclude the rollback entries themselves
-        query = query.filter(~FifoLog.invoice_id.like("%-ROLLBACK"))
-        
-        query = query.order_by(FifoLog.invoice_date.asc(), FifoLog.invoice_id.asc())
-        
-        logs = query.all()
-        
-        # Find all rolled-back invoice IDs
-        rolled_back_invoices = set()
-        if not include_rollbacks:
-            rollback_logs = db.query(FifoLog.invoice_id).filter(
-                FifoLog.invoice_id.like("%-ROLLBACK")
-            ).distinct().all()
-            
-            for row in rollback_logs:
-                original_id = row.invoice_id.replace('-ROLLBACK', '')
-                rolled_back_invoices.add(original_id)
-        
-        # Group by invoice
-        invoice_groups = {}
-        for log in logs:
-            # Skip if this invoice has been rolled back
-            if log.invoice_id in rolled_back_invoices:
-                continue
-            
-            key = (log.invoice_date, log.invoice_id, log.item_id)
-            if key not in invoice_groups:
-                invoice_groups[key] = {
-                    'tanggal': log.invoice_date,
-                    'no_invoice': log.invoice_id,
-                    'item_id': log.item_id,
-                    'qty_terjual': 0,
-                    'total_hpp': Decimal("0"),
-                    'total_penjualan': Decimal("0"),
-                    'laba_kotor': Decimal("0"),
-                    'harga_jual': log.harga_jual,
-                    'is_rollback': False
-                }
-            
-            # Sum up quantities and amounts
-            invoice_groups[key]['qty_terjual'] += log.qty_terpakai
-            invoice_groups[key]['total_hpp'] += log.total_hpp
-            invoice_groups[key]['total_penjualan'] += log.total_penjualan
-            invoice_groups[key]['laba_kotor'] += log.laba_kotor
-        
-        # Convert to list and calculate averages
-        result = []
-        for data in invoice_groups.values():
-            if data['qty_terjual'] > 0:
-                data['hpp'] = data['total_hpp'] / data['qty_terjual']
-            else:
-                data['hpp'] = Decimal("0")
-            result.append(data)
-        
-        return result
-
-
     @staticmethod
     def get_rollback_chain(
         db: Session,
@@ -410,6 +327,52 @@ class FifoService:
         query = query.order_by(BatchStock.tanggal_masuk.asc(), BatchStock.id_batch.asc())
         
         return query.all()
+
+    @staticmethod
+    def get_stock_summary(
+        db: Session,
+        item_ids: List[int],
+        warehouse_id: Optional[int] = None
+    ) -> Dict[int, dict]:
+        """
+        Stok FIFO per item untuk banyak item sekaligus (satu GROUP BY di batch OPEN):
+        {item_id: {available_qty, fifo_value, oldest_batch_date}}.
+        Warehouse filter sama dengan get_open_batches (termasuk batch tanpa warehouse).
+        Item tanpa batch open tetap ada dengan qty 0.
+        """
+        summary = {
+            item_id: {"available_qty": 0, "fifo_value": Decimal("0"), "oldest_batch_date": None}
+            for item_id in item_ids
+        }
+        if not item_ids:
+            return summary
+
+        query = db.query(
+            BatchStock.item_id,
+            func.sum(BatchStock.sisa_qty),
+            func.sum(BatchStock.sisa_qty * BatchStock.harga_beli),
+            func.min(BatchStock.tanggal_masuk),
+        ).filter(
+            BatchStock.item_id.in_(item_ids),
+            BatchStock.is_open == True,
+            BatchStock.sisa_qty > 0,
+        )
+
+        if warehouse_id is not None:
+            query = query.filter(
+                or_(
+                    BatchStock.warehouse_id == warehouse_id,
+                    BatchStock.warehouse_id.is_(None)
+                )
+            )
+
+        for item_id, qty, value, oldest in query.group_by(BatchStock.item_id):
+            summary[item_id] = {
+                "available_qty": int(qty or 0),
+                "fifo_value": Decimal(str(value or 0)),
+                "oldest_batch_date": oldest,
+            }
+        return summary
     
     @staticmethod
     def process_sale_fifo(
@@ -488,6 +451,7 @@ class FifoService:
                 f"Insufficient stock! Still need {sisa_qty_keluar} units for item_id={item_id}"
             )
         
+        ProfitDailyService.apply_logs(db, fifo_logs)
         db.commit()
         
         return total_hpp, fifo_logs
@@ -498,14 +462,35 @@ class FifoService:
         start_date: date,
         end_date: date,
         item_id: Optional[int] = None,
-        include_rollbacks: bool = False
+        include_rollbacks: bool = False,
+        per_invoice: bool = True
     ) -> List[dict]:
         """
         Generate Laporan Laba Rugi dari FIFO logs.
         
         Args:
             include_rollbacks: If False, excludes rollback entries from report
+            per_invoice: If False, returns net rows per (tanggal, item) from
+                profit_daily instead of scanning fifo_log (rollbacks already netted)
         """
+        if not per_invoice:
+            result = []
+            for row in ProfitDailyService.get_daily_rows(db, start_date, end_date, item_id):
+                qty = row.qty_terjual or 0
+                result.append({
+                    'tanggal': row.invoice_date,
+                    'no_invoice': None,
+                    'item_id': row.item_id,
+                    'qty_terjual': qty,
+                    'total_hpp': row.total_hpp,
+                    'total_penjualan': row.total_penjualan,
+                    'laba_kotor': row.laba_kotor,
+                    'harga_jual': row.total_penjualan / qty if qty else Decimal("0"),
+                    'hpp': row.total_hpp / qty if qty else Decimal("0"),
+                    'is_rollback': False
+                })
+            return result
+
         query = db.query(FifoLog).filter(
             and_(
                 FifoLog.invoice_date >= start_date,
@@ -0,0 +1,120 @@
+import argparse
+import base64
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from PIL import Image, ImageOps
+
+# name -> longest edge in px. sm covers the 60px invoice / list cells at 2x.
+THUMBNAIL_SIZES = {"sm": 128, "md": 400, "lg": 1024}
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+THUMBNAIL_DIR = os.getenv("THUMBNAIL_DIR", os.path.join(os.getenv("STATIC_URL", "static"), "thumbs"))
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", "2"))
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+
+_executor = ThreadPoolExecutor(max_workers=THUMBNAIL_WORKERS, thread_name_prefix="thumbnail")
+
+
+class ImageService:
+    """
+    WebP thumbnails of uploaded images, cached on disk as
+    THUMBNAIL_DIR/<size>/<original name>.webp.
+
+    Uploads queue all sizes on a background thread pool (schedule_thumbnails);
+    anything missing is generated on first request (thumbnail_path), so old
+    uploads need no migration. Originals are never modified.
+    """
+
+    @staticmethod
+    def is_image(path: Optional[str]) -> bool:
+        return bool(path) and os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+
+    @staticmethod
+    def cache_path(source_path: str, size: str) -> str:
+        name = os.path.splitext(os.path.basename(source_path))[0]
+        return os.path.join(THUMBNAIL_DIR, size, f"{name}.webp")
+
+    @staticmethod
+    def thumbnail_path(source_path: str, size: str) -> Optional[str]:
+        """Path of the cached WebP thumbnail, generating it when missing or older than the source."""
+        if size not in THUMBNAIL_SIZES:
+            raise ValueError(f"Unknown thumbnail size '{size}'. Use one of {list(THUMBNAIL_SIZES)}")
+        if not ImageService.is_image(source_path) or not os.path.exists(source_path):
+            return None
+
+        target = ImageService.cache_path(source_path, size)
+        try:
+            if os.path.getmtime(target) >= os.path.getmtime(source_path):
+                return target
+        except OSError:
+            pass
+
+        edge = THUMBNAIL_SIZES[size]
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with Image.open(source_path) as img:
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((edge, edge), Image.LANCZOS)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if img.mode in ("LA", "P", "PA") else "RGB")
+            # write + rename so a concurrent reader never sees half a file
+            tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+            img.save(tmp, "WEBP", quality=THUMBNAIL_QUALITY, method=4)
+        os.replace(tmp, target)
+        return target
+
+    @staticmethod
+    def generate_all(source_path: str, sizes: Iterable[str] = THUMBNAIL_SIZES) -> Dict[str, Optional[str]]:
+        result = {}
+        for size in sizes:
+            try:
+                result[size] = ImageService.thumbnail_path(source_path, size)
+            except Exception as e:
+                print(f"❌ Thumbnail {size} failed for {source_path}: {e}")
+                result[size] = None
+        return result
+
+    @staticmethod
+    def schedule_thumbnails(source_path: str) -> None:
+        """Generate every size in the background; the upload request doesn't wait for it."""
+        if ImageService.is_image(source_path):
+            _executor.submit(ImageService.generate_all, source_path)
+
+    @staticmethod
+    def thumbnail_urls(source_path: Optional[str], base_url: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """{size: url} served by GET /upload/thumbs/{size}/{filename}; None for non-images."""
+        if not ImageService.is_image(source_path):
+            return None
+        if base_url is None:
+            base_url = os.getenv("BASE_URL", "http://localhost:8000")
+        filename = os.path.basename(source_path.replace("\\", "/"))
+        return {size: f"{base_url.rstrip('/')}/upload/thumbs/{size}/{filename}" for size in THUMBNAIL_SIZES}
+
+    @staticmethod
+    def thumbnail_data_url(source_path: str, size: str = "sm") -> Optional[str]:
+        """data: URL of the thumbnail, for self-contained HTML (invoices)."""
+        try:
+            target = ImageService.thumbnail_path(source_path, size)
+        except Exception as e:
+            print(f"❌ Thumbnail {size} failed for {source_path}: {e}")
+            return None
+        if not target:
+            return None
+        with open(target, "rb") as f:
+            return f"data:image/webp;base64,{base64.b64encode(f.read()).decode('ascii')}"
+
+
+if __name__ == "__main__":
+    # python -m services.image_services uploads/items
+    parser = argparse.ArgumentParser(description="Pre-generate WebP thumbnails for every image in a directory")
+    parser.add_argument("directory", nargs="?", default=os.getenv("UPLOAD_DIR", "uploads/items"))
+    args = parser.parse_args()
+
+    done = 0
+    for entry in os.scandir(args.directory):
+        if entry.is_file() and ImageService.is_image(entry.path):
+            ImageService.generate_all(entry.path)
+            done += 1
+    print(json.dumps({"images": done, "thumbnail_dir": THUMBNAIL_DIR}, indent=2))
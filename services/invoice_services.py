@@ -0,0 +1,294 @@
+import asyncio
+import base64
+import glob
+import hashlib
+import io
+import mimetypes
+import multiprocessing
+import os
+import re
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from services.image_services import ImageService
+
+INVOICE_CSS_PATH = "templates/invoice.css"
+INVOICE_LOGO_PATHS = ("static/items/logo.png", "uploads/items/logo.png", "logo.png")
+INVOICE_HTML_CACHE_SIZE = int(os.getenv("INVOICE_HTML_CACHE_SIZE", "256"))
+# upper bound on staleness for data the version doesn't cover (customer / item master edits)
+INVOICE_HTML_CACHE_TTL = int(os.getenv("INVOICE_HTML_CACHE_TTL", "3600"))
+INVOICE_PDF_WORKERS = int(os.getenv("INVOICE_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+INVOICE_PDF_CACHE_DIR = os.getenv("INVOICE_PDF_CACHE_DIR", "uploads/invoice_pdf")
+
+_IMAGE_PATH_PREFIXES = ("root/backend/", "/root/backend/", "backend/", "/backend/", "static/items/", "/static/items/")
+
+_lock = threading.Lock()
+# key -> (mtime, value)
+_assets: Dict[Tuple[str, str], Tuple[float, Optional[str]]] = {}
+# (kind, doc_id) -> (version, rendered_at, html)
+_html: "OrderedDict[Tuple[str, int], Tuple[str, float, str]]" = OrderedDict()
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _html_to_pdf(html: str) -> bytes:
+    """Runs in the PDF process pool (xhtml2pdf is CPU bound and not thread safe)."""
+    from xhtml2pdf import pisa
+
+    output = io.BytesIO()
+    status = pisa.CreatePDF(html, dest=output, encoding="utf-8")
+    if status.err:
+        raise ValueError(f"PDF rendering failed with {status.err} error(s)")
+    return output.getvalue()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    with _lock:
+        if _pdf_pool is None:
+            # spawn: children don't inherit the app's DB connections / threads
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=INVOICE_PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pdf_pool
+
+
+class InvoiceService:
+    """
+    Read-only helpers for the invoice HTML views:
+    - asset cache (CSS, logo, item image data URLs) keyed by path + mtime,
+      so files are read / base64-encoded once until they change on disk
+    - rendered HTML cache for finalized documents keyed by id + version
+    - PDF rendering in a process pool, cached on disk per id + version
+    """
+
+    # ---------- assets ----------
+
+    @staticmethod
+    def _cached_asset(kind: str, path: str, load: Callable[[str], Optional[str]]) -> Optional[str]:
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        key = (kind, path)
+        hit = _assets.get(key)
+        if hit and hit[0] == mtime:
+            return hit[1]
+        value = load(path)
+        with _lock:
+            _assets[key] = (mtime, value)
+        return value
+
+    @staticmethod
+    def read_text(path: str) -> str:
+        def load(p):
+            with open(p, encoding="utf-8") as f:
+                return f.read()
+        return InvoiceService._cached_asset("text", path, load) or ""
+
+    @staticmethod
+    def file_data_url(path: str, mime_type: Optional[str] = None) -> Optional[str]:
+        def load(p):
+            mime = mime_type or mimetypes.guess_type(p)[0] or "application/octet-stream"
+            with open(p, "rb") as f:
+                return f"data:{mime};base64,{base64.b64encode(f.read()).decode('ascii')}"
+        return InvoiceService._cached_asset("data_url", path, load)
+
+    @staticmethod
+    def css() -> str:
+        return InvoiceService.read_text(INVOICE_CSS_PATH)
+
+    @staticmethod
+    def logo_data_url() -> str:
+        for path in INVOICE_LOGO_PATHS:
+            if os.path.exists(path):
+                try:
+                    return InvoiceService.file_data_url(path, "image/png") or ""
+                except Exception as e:
+                    print(f"Error reading logo from {path}: {e}")
+        return ""
+
+    @staticmethod
+    def resolve_image_path(raw_image_path: Optional[str]) -> Optional[str]:
+        """Find the file behind a stored attachment path (paths differ between environments)."""
+        if not raw_image_path:
+            return None
+        cleaned_path = str(raw_image_path).strip()
+        for prefix in _IMAGE_PATH_PREFIXES:
+            if cleaned_path.startswith(prefix):
+                cleaned_path = cleaned_path[len(prefix):]
+                break
+
+        name = os.path.basename(cleaned_path)
+        upload_dir = os.getenv("UPLOAD_DIR", "uploads/items")
+        for path in (
+            cleaned_path,
+            f"static/items/{name}",
+            f"uploads/items/{name}",
+            os.path.join(upload_dir, name),
+        ):
+            if os.path.exists(path):
+                return path
+        return None
+
+    @staticmethod
+    def item_image_data_url(raw_image_path: Optional[str]) -> Optional[str]:
+        """Small WebP thumbnail as data URL (falls back to the original file)."""
+        path = InvoiceService.resolve_image_path(raw_image_path)
+        if not path:
+            if raw_image_path:
+                print(f"⚠️ Image not found: {raw_image_path}")
+            return None
+
+        def load(p):
+            return ImageService.thumbnail_data_url(p, "sm") or InvoiceService.file_data_url(p)
+
+        try:
+            return InvoiceService._cached_asset("thumb_data_url", path, load)
+        except Exception as e:
+            print(f"❌ Error loading image {raw_image_path}: {e}")
+            return None
+
+    # ---------- rendered HTML ----------
+
+    @staticmethod
+    def document_version(*parts: Iterable[Any]) -> str:
+        """Fingerprint of the rows an invoice is rendered from."""
+        digest = hashlib.sha1()
+        for part in parts:
+            digest.update(repr(tuple(part)).encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def cached_html(kind: str, doc_id: int, version: Optional[str], render: Callable[[], str]) -> str:
+        """
+        Rendered HTML of (kind, doc_id) for this version; render() only on a miss.
+        version=None (drafts) always renders and caches nothing.
+        """
+        if version is None:
+            return render()
+
+        key = (kind, doc_id)
+        with _lock:
+            hit = _html.get(key)
+            if hit and hit[0] == version and time.monotonic() - hit[1] < INVOICE_HTML_CACHE_TTL:
+                _html.move_to_end(key)
+                return hit[2]
+
+        html = render()
+        with _lock:
+            _html[key] = (version, time.monotonic(), html)
+            _html.move_to_end(key)
+            while len(_html) > INVOICE_HTML_CACHE_SIZE:
+                _html.popitem(last=False)
+        return html
+
+    # ---------- PDF ----------
+
+    @staticmethod
+    def pdf_filename(document_number: Optional[str], kind: str, doc_id: int) -> str:
+        name = re.sub(r"[^A-Za-z0-9._-]+", "-", document_number or "").strip("-")
+        return f"{name or f'{kind}-{doc_id}'}.pdf"
+
+    @staticmethod
+    def _pdf_cache_path(kind: str, doc_id: int, version: str) -> str:
+        return os.path.join(INVOICE_PDF_CACHE_DIR, f"{kind}-{doc_id}-{version}.pdf")
+
+    @staticmethod
+    def _store_pdf(kind: str, doc_id: int, version: str, pdf: bytes) -> None:
+        os.makedirs(INVOICE_PDF_CACHE_DIR, exist_ok=True)
+        target = InvoiceService._pdf_cache_path(kind, doc_id, version)
+        # older versions of this document are never served again
+        for stale in glob.glob(os.path.join(INVOICE_PDF_CACHE_DIR, f"{kind}-{doc_id}-*.pdf")):
+            if stale != target:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+        tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(pdf)
+        os.replace(tmp, target)
+
+    @staticmethod
+    def _cached_pdf(kind: str, doc_id: int, version: Optional[str]) -> Optional[bytes]:
+        if version is None:
+            return None
+        cached = InvoiceService._pdf_cache_path(kind, doc_id, version)
+        try:
+            # same staleness bound as the HTML cache for master-data edits
+            if time.time() - os.path.getmtime(cached) < INVOICE_HTML_CACHE_TTL:
+                with open(cached, "rb") as f:
+                    return f.read()
+        except OSError:
+            pass
+        return None
+
+    @staticmethod
+    def _prepare_pdf(kind: str, doc_id: int, version: Optional[str], render_html: Callable[[], str]) -> Tuple[Optional[bytes], Optional[str]]:
+        """(cached PDF, None) on a disk cache hit, else (None, HTML to convert)."""
+        pdf = InvoiceService._cached_pdf(kind, doc_id, version)
+        if pdf is not None:
+            return pdf, None
+        return None, InvoiceService.cached_html(kind, doc_id, version, render_html)
+
+    @staticmethod
+    async def _convert_pdf(kind: str, doc_id: int, version: Optional[str], html: str) -> bytes:
+        loop = asyncio.get_running_loop()
+        pdf = await loop.run_in_executor(_get_pdf_pool(), _html_to_pdf, html)
+        if version is not None:
+            await run_in_threadpool(InvoiceService._store_pdf, kind, doc_id, version, pdf)
+        return pdf
+
+    @staticmethod
+    async def render_pdf(kind: str, doc_id: int, version: Optional[str], render_html: Callable[[], str]) -> bytes:
+        """
+        PDF of an invoice. Finalized documents (version set) are served from the
+        disk cache when present; otherwise the HTML is rendered and converted in
+        the process pool. Cache reads and render_html() (DB queries, template)
+        run in the threadpool, never on the event loop.
+        """
+        pdf, html = await run_in_threadpool(InvoiceService._prepare_pdf, kind, doc_id, version, render_html)
+        if pdf is not None:
+            return pdf
+        return await InvoiceService._convert_pdf(kind, doc_id, version, html)
+
+    @staticmethod
+    def _zip_pdfs(documents: List[Tuple[str, str, int, Optional[str], Callable[[], str]]], pdfs: List[bytes]) -> bytes:
+        output = io.BytesIO()
+        used = set()
+        # PDFs are already compressed
+        with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as archive:
+            for (filename, _, doc_id, _, _), pdf in zip(documents, pdfs):
+                if filename in used:
+                    filename = f"{os.path.splitext(filename)[0]}-{doc_id}.pdf"
+                used.add(filename)
+                archive.writestr(filename, pdf)
+        return output.getvalue()
+
+    @staticmethod
+    async def render_pdf_zip(documents: List[Tuple[str, str, int, Optional[str], Callable[[], str]]]) -> bytes:
+        """
+        ZIP of many invoices: documents are (filename, kind, doc_id, version, render_html).
+        HTML is rendered one by one in a single threadpool call (shares the
+        request's DB session), the PDF conversions run in parallel in the process pool.
+        """
+        prepared = await run_in_threadpool(lambda: [
+            InvoiceService._prepare_pdf(kind, doc_id, version, render_html)
+            for _, kind, doc_id, version, render_html in documents
+        ])
+        pdfs = [pdf for pdf, _ in prepared]
+        misses = [i for i, (pdf, _) in enumerate(prepared) if pdf is None]
+        converted = await asyncio.gather(*(
+            InvoiceService._convert_pdf(documents[i][1], documents[i][2], documents[i][3], prepared[i][1])
+            for i in misses
+        ))
+        for i, pdf in zip(misses, converted):
+            pdfs[i] = pdf
+        return await run_in_threadpool(InvoiceService._zip_pdfs, documents, pdfs)
@@ -0,0 +1,235 @@
+import json
+import os
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from openpyxl import load_workbook
+from sqlalchemy.orm import Session
+
+from models.AuditTrail import AuditEntityEnum, AuditTrail
+from models.BatchStock import BatchStock
+from models.InventoryLedger import SourceTypeEnum
+from models.Item import Item
+from services.low_stock_services import LowStockService
+from services.search_services import SearchService
+
+ITEM_IMPORT_CHUNK_SIZE = int(os.getenv("ITEM_IMPORT_CHUNK_SIZE", "1000"))
+ITEM_IMPORT_SPOOL_DIR = os.getenv("ITEM_IMPORT_SPOOL_DIR", "uploads/imports")
+SPOOL_COPY_BUFFER = 1024 * 1024
+
+
+class ItemImportService:
+    """Set-based insert of validated item rows (items + opening FIFO batch + audit)."""
+
+    @staticmethod
+    def _batch_mapping(item_id: int, item_data: Dict[str, Any], tanggal_masuk: date) -> Dict[str, Any]:
+        # Same values FifoService.create_batch_from_purchase would write
+        qty = item_data['total_item']
+        harga_beli = item_data.get('price', Decimal('0'))
+        return {
+            'source_id': str(item_id),
+            'source_type': SourceTypeEnum.ITEM,
+            'item_id': item_id,
+            'warehouse_id': None,
+            'tanggal_masuk': tanggal_masuk,
+            'qty_masuk': qty,
+            'qty_keluar': 0,
+            'sisa_qty': qty,
+            'harga_beli': harga_beli,
+            'nilai_total': Decimal(qty) * harga_beli,
+            'is_open': True,
+        }
+
+    @staticmethod
+    def _audit_mapping(item_id: int, item_data: Dict[str, Any], user_name: str) -> Dict[str, Any]:
+        return {
+            'entity_id': str(item_id),
+            'entity_type': AuditEntityEnum.ITEM,
+            'description': f"Data item {item_data['name']} telah dibuat via import",
+            'user_name': user_name,
+        }
+
+    @staticmethod
+    def _insert_chunk(db: Session, chunk: List[Tuple[int, Dict[str, Any]]], user_name: str) -> Dict[str, int]:
+        """Insert one chunk of new items with their opening batches and audit rows. Caller commits."""
+        db.bulk_insert_mappings(Item, [item_data for _, item_data in chunk])
+
+        # Resolve generated ids in one query instead of RETURNING per row
+        skus = [item_data['sku'] for _, item_data in chunk]
+        created = dict(
+            db.query(Item.sku, Item.id)
+            .filter(Item.sku.in_(skus), Item.deleted_at.is_(None))
+            .all()
+        )
+
+        today = date.today()
+        batches = [
+            ItemImportService._batch_mapping(created[item_data['sku']], item_data, today)
+            for _, item_data in chunk
+            if item_data.get('total_item', 0) > 0
+        ]
+        if batches:
+            db.bulk_insert_mappings(BatchStock, batches)
+
+        db.bulk_insert_mappings(AuditTrail, [
+            ItemImportService._audit_mapping(created[item_data['sku']], item_data, user_name)
+            for _, item_data in chunk
+        ])
+
+        # bulk_insert_mappings skips the after_flush search / low-stock hooks
+        SearchService.index_mappings(db, "item", [
+            {**item_data, 'id': created[item_data['sku']]}
+            for _, item_data in chunk
+        ])
+        LowStockService.touch(db, created.values())
+
+        return created
+
+    @staticmethod
+    def insert_new_items(
+        db: Session,
+        rows: List[Tuple[int, Dict[str, Any]]],
+        user_name: str,
+        chunk_size: int = ITEM_IMPORT_CHUNK_SIZE,
+        atomic: bool = False,
+    ) -> Tuple[Dict[str, int], List[Tuple[int, Dict[str, Any]]]]:
+        """
+        Insert already-validated new items (row index, item_data incl. 'code')
+        in chunks, committing once per chunk.
+
+        If a chunk fails (e.g. a SKU clashing with a soft-deleted item), it is
+        rolled back and retried row by row under savepoints so only the
+        offending rows are reported.
+
+        atomic=True never commits: chunks and retries run under savepoints, so
+        the caller's single commit (or rollback) covers the whole import.
+
+        Returns (sku -> new item id, [(row index, item_data, error message)]).
+        """
+        created: Dict[str, int] = {}
+        failures: List[Tuple[int, Dict[str, Any], str]] = []
+
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            try:
+                if atomic:
+                    with db.begin_nested():
+                        created.update(ItemImportService._insert_chunk(db, chunk, user_name))
+                else:
+                    created.update(ItemImportService._insert_chunk(db, chunk, user_name))
+                    db.commit()
+                continue
+            except Exception:
+                if not atomic:
+                    db.rollback()
+
+            for row in chunk:
+                try:
+                    with db.begin_nested():
+                        created.update(ItemImportService._insert_chunk(db, [row], user_name))
+                except Exception as e:
+                    failures.append((row[0], row[1], str(getattr(e, 'orig', e))))
+            if not atomic:
+                db.commit()
+
+        return created, failures
+
+    @staticmethod
+    def new_spool_path(filename: str) -> Tuple[str, str]:
+        """Job id and on-disk path for a spooled upload (keeps the original extension)."""
+        os.makedirs(ITEM_IMPORT_SPOOL_DIR, exist_ok=True)
+        job_id = uuid.uuid4().hex
+        ext = os.path.splitext(filename)[1].lower()
+        return job_id, os.path.join(ITEM_IMPORT_SPOOL_DIR, f"{job_id}{ext}")
+
+    @staticmethod
+    async def spool_upload(file, path: str) -> int:
+        """Copy an UploadFile to `path` in fixed-size pieces; returns bytes written."""
+        size = 0
+        with open(path, "wb") as out:
+            while True:
+                chunk = await file.read(SPOOL_COPY_BUFFER)
+                if not chunk:
+                    break
+                out.write(chunk)
+                size += len(chunk)
+        return size
+
+    @staticmethod
+    def iter_frames(path: str, chunk_size: int = ITEM_IMPORT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+        """
+        Read a spooled import file in DataFrames of at most `chunk_size` rows.
+
+        Index numbering matches pd.read_excel(header=0, skiprows=[1]) on the
+        whole file, so index + 3 is still the Excel row number.
+        - .xlsx: openpyxl read_only / iter_rows, row 2 (notes) skipped
+        - .csv:  read_csv(chunksize=...)
+        - .xls:  openpyxl can't stream it, so it is read once and sliced
+        """
+        ext = os.path.splitext(path)[1].lower()
+
+        if ext == ".csv":
+            for frame in pd.read_csv(path, sep=None, engine="python", encoding="utf-8", chunksize=chunk_size):
+                yield frame
+            return
+
+        if ext == ".xls":
+            df = pd.read_excel(path, header=0, skiprows=[1])
+            for start in range(0, len(df), chunk_size):
+                yield df.iloc[start:start + chunk_size]
+            return
+
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                raise pd.errors.EmptyDataError("No columns to parse from file")
+            columns = [str(h).strip() if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+            next(rows, None)  # notes row
+
+            buffer = []
+            start = 0
+            for values in rows:
+                buffer.append(values)
+                if len(buffer) >= chunk_size:
+                    yield pd.DataFrame(buffer, columns=columns, index=range(start, start + len(buffer)))
+                    start += len(buffer)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=columns, index=range(start, start + len(buffer)))
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _status_path(job_id: str) -> str:
+        return os.path.join(ITEM_IMPORT_SPOOL_DIR, f"{job_id}.status.json")
+
+    @staticmethod
+    def write_status(job_id: str, **fields) -> dict:
+        """
+        Merge `fields` into the job's status file. Kept on disk (not in memory)
+        so any worker process can answer the status endpoint.
+        """
+        status = ItemImportService.read_status(job_id) or {"job_id": job_id}
+        status.update(fields)
+        status["updated_at"] = datetime.now().isoformat()
+
+        os.makedirs(ITEM_IMPORT_SPOOL_DIR, exist_ok=True)
+        path = ItemImportService._status_path(job_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(status, f, default=str)
+        os.replace(tmp_path, path)
+        return status
+
+    @staticmethod
+    def read_status(job_id: str) -> Optional[dict]:
+        path = ItemImportService._status_path(job_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
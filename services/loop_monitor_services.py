@@ -0,0 +1,196 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+# "true": a task on the event loop measures how late its own wake-ups are
+LOOP_MONITOR = os.getenv("LOOP_MONITOR", "false").lower() in ("1", "true", "yes")
+LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "50"))
+# a wake-up later than this means something ran on the loop without yielding (sync DB call, file IO, ...)
+LOOP_MONITOR_THRESHOLD_MS = float(os.getenv("LOOP_MONITOR_THRESHOLD_MS", "100"))
+# worker threads for sync handlers / dependencies / run_in_threadpool (anyio's default is 40)
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+
+# routes the check CLI hits when none are given: list pages and reports
+DEFAULT_CHECK_PATHS = (
+    "/penjualan",
+    "/pembelian",
+    "/item",
+    "/utils/statistics",
+    "/utils/laba-rugi?from_date=2000-01-01T00:00:00",
+    "/utils/penjualan?from_date=2000-01-01T00:00:00",
+    "/utils/pembelian?from_date=2000-01-01T00:00:00",
+    "/utils/tren-penjualan",
+    "/utils/stock-adjustment?from_date=2000-01-01T00:00:00",
+)
+
+
+class LoopMonitor:
+    """
+    Event loop lag watchdog. A background task sleeps LOOP_MONITOR_INTERVAL_MS
+    and records how much later than that it woke up; any lag above
+    LOOP_MONITOR_THRESHOLD_MS is logged as a stall together with the requests
+    that were running during it, which names the handler that blocked the loop.
+    """
+
+    def __init__(self, interval_ms: float = LOOP_MONITOR_INTERVAL_MS, threshold_ms: float = LOOP_MONITOR_THRESHOLD_MS):
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # id(scope) -> ("METHOD /path", started)
+        self._in_flight: Dict[int, Tuple[str, float]] = {}
+        # (name, started, finished): a blocking handler has usually returned by the time the watchdog wakes up
+        self._finished = deque(maxlen=64)
+        self.checks = 0
+        self.stalls = 0
+        self.max_lag_ms = 0.0
+        self.recent_stalls = deque(maxlen=20)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the watchdog on the running loop (call from the startup event)."""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def request_started(self, scope: dict) -> None:
+        with self._lock:
+            self._in_flight[id(scope)] = (f"{scope.get('method')} {scope.get('path')}", time.perf_counter())
+
+    def request_finished(self, scope: dict) -> None:
+        with self._lock:
+            entry = self._in_flight.pop(id(scope), None)
+            if entry is not None:
+                self._finished.append((entry[0], entry[1], time.perf_counter()))
+
+    async def _run(self) -> None:
+        interval = self.interval_ms / 1000
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag_ms = (time.perf_counter() - started - interval) * 1000
+            self._record(lag_ms)
+
+    def _record(self, lag_ms: float) -> None:
+        with self._lock:
+            self.checks += 1
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            if lag_ms < self.threshold_ms:
+                return
+            self.stalls += 1
+            now = time.perf_counter()
+            window_start = now - (lag_ms + self.interval_ms) / 1000
+            in_flight = [
+                {"request": name, "duration_ms": round((now - started) * 1000, 1), "finished": False}
+                for name, started in self._in_flight.values()
+            ] + [
+                {"request": name, "duration_ms": round((finished - started) * 1000, 1), "finished": True}
+                for name, started, finished in self._finished if finished >= window_start
+            ]
+            self.recent_stalls.append({"at": time.time(), "lag_ms": round(lag_ms, 1), "in_flight": in_flight})
+        print(f"⚠️ Event loop blocked for {lag_ms:.0f} ms; requests during the stall: {[r['request'] for r in in_flight]}")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "running": self.running,
+                "interval_ms": self.interval_ms,
+                "threshold_ms": self.threshold_ms,
+                "checks": self.checks,
+                "stalls": self.stalls,
+                "max_lag_ms": round(self.max_lag_ms, 1),
+                "recent_stalls": list(self.recent_stalls),
+            }
+
+
+monitor = LoopMonitor()
+
+
+class LoopMonitorMiddleware:
+    """Tracks in-flight requests for LoopMonitor stall reports (pure ASGI, no body buffering)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not monitor.running:
+            await self.app(scope, receive, send)
+            return
+        monitor.request_started(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            monitor.request_finished(scope)
+
+
+class LoopMonitorService:
+
+    @staticmethod
+    def configure_threadpool(size: int = THREADPOOL_SIZE) -> int:
+        """Set the worker thread limit of the running loop; returns the previous one."""
+        import anyio.to_thread
+
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        previous = limiter.total_tokens
+        limiter.total_tokens = size
+        return previous
+
+    @staticmethod
+    def check(paths, threshold_ms: float = LOOP_MONITOR_THRESHOLD_MS, rounds: int = 1) -> dict:
+        """
+        Request every path through the app (auth bypassed) with the watchdog
+        running and report the stalls; a stall means a handler blocked the
+        loop for longer than threshold_ms. ok also needs every path to answer
+        2xx: an error response is fast and would hide the handler under test.
+        """
+        from fastapi.testclient import TestClient
+
+        from dependencies import verify_access_token
+        from main import app
+
+        monitor.threshold_ms = threshold_ms
+        app.dependency_overrides[verify_access_token] = lambda: {"un": "loop-check"}
+        statuses = {}
+        try:
+            with TestClient(app) as client:
+                # the startup event does migrations on the loop: measure requests only
+                client.portal.call(monitor.start)
+                stalls_before = monitor.stalls
+                for _ in range(rounds):
+                    for path in paths:
+                        statuses[path] = client.get(path).status_code
+                # give the watchdog one more wake-up to see a stall at the very end
+                time.sleep(monitor.interval_ms * 2 / 1000)
+                report = monitor.snapshot()
+                report["stalls"] -= stalls_before
+        finally:
+            app.dependency_overrides.pop(verify_access_token, None)
+        report["statuses"] = statuses
+        report["ok"] = report["stalls"] == 0 and all(200 <= status < 300 for status in statuses.values())
+        return report
+
+
+if __name__ == "__main__":
+    # python -m services.loop_monitor_services [--threshold-ms 100] [--rounds 3] [/penjualan /utils/laba-rugi ...]
+    parser = argparse.ArgumentParser(description="Fail if a handler blocks the event loop longer than the threshold")
+    parser.add_argument("paths", nargs="*", default=list(DEFAULT_CHECK_PATHS))
+    parser.add_argument("--threshold-ms", type=float, default=LOOP_MONITOR_THRESHOLD_MS)
+    parser.add_argument("--rounds", type=int, default=1)
+    args = parser.parse_args()
+
+    result = LoopMonitorService.check(args.paths, args.threshold_ms, args.rounds)
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result["ok"] else 1)
@@ -0,0 +1,274 @@
+import argparse
+import asyncio
+import json
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import delete, event, func, insert, inspect, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from models.BatchStock import BatchStock
+from models.Item import Item
+from models.LowStockItem import LowStockItem
+
+# session.info keys
+_DIRTY_KEY = "low_stock_dirty_items"
+_EVENTS_KEY = "low_stock_events"
+
+# Item columns that can move an item in / out of the low-stock set
+_ITEM_TRIGGER_FIELDS = ("min_item", "total_item", "is_deleted")
+
+
+class LowStockBroadcaster:
+    """
+    Fan-out of threshold crossings to SSE subscribers (per process).
+    Commits run in the threadpool, so publish() hands events to each
+    subscriber's loop with call_soon_threadsafe.
+    """
+
+    def __init__(self, max_queue: int = 100):
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._max_queue = max_queue
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self._max_queue)
+        with self._lock:
+            self._subscribers.append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers = [(loop, q) for loop, q in self._subscribers if q is not queue]
+
+    def publish(self, events: List[dict]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            for evt in events:
+                try:
+                    loop.call_soon_threadsafe(self._offer, queue, evt)
+                except RuntimeError:
+                    # loop already closed
+                    self.unsubscribe(queue)
+                    break
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, evt: dict) -> None:
+        # slow consumer: drop the oldest event instead of blocking the commit
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(evt)
+
+
+broadcaster = LowStockBroadcaster()
+
+
+class LowStockService:
+    """
+    Maintains low_stock_items: items whose open FIFO stock is below min_item.
+
+    Stock-mutating paths (update_item_stock, FifoService create / consume /
+    rollback, stock adjustments, item edits) only mark item ids as dirty;
+    the after_flush hook below does that for ORM changes on Item / BatchStock,
+    touch() covers bulk inserts. Dirty items are re-evaluated once per commit.
+    """
+
+    @staticmethod
+    def touch(db: Session, item_ids: Iterable[int]) -> None:
+        """Mark items for re-evaluation at the next commit (for bulk writes that skip ORM events)."""
+        db.info.setdefault(_DIRTY_KEY, set()).update(i for i in item_ids if i is not None)
+
+    @staticmethod
+    def refresh(db: Session, item_ids: Iterable[int]) -> List[dict]:
+        """
+        Re-evaluate the given items against min_item and update low_stock_items.
+        Returns the threshold crossings ({"event": "low" | "recovered", ...}).
+        """
+        from services.fifo_services import FifoService
+
+        item_ids = sorted(set(item_ids))
+        if not item_ids:
+            return []
+
+        items = {
+            row.id: row
+            for row in db.query(Item.id, Item.code, Item.name, Item.min_item, Item.is_deleted)
+            .filter(Item.id.in_(item_ids))
+        }
+        stock = FifoService.get_stock_summary(db, list(items), None)
+        table = LowStockItem.__table__
+        existing = {
+            row.item_id: row
+            for row in db.query(LowStockItem.item_id, LowStockItem.available_qty, LowStockItem.min_item)
+            .filter(LowStockItem.item_id.in_(item_ids))
+        }
+
+        events = []
+        now = datetime.now()
+        for item_id in item_ids:
+            item = items.get(item_id)
+            current = existing.get(item_id)
+            available = stock[item_id]["available_qty"] if item else 0
+            is_low = bool(item) and not item.is_deleted and (item.min_item or 0) > 0 \
+                and available < item.min_item
+
+            # plain statements, not ORM add / delete: a concurrent commit flagging the same
+            # item must not turn into a primary key conflict on low_stock_items
+            if is_low and current is None:
+                LowStockService._upsert(db, item_id, available, item.min_item, now)
+                events.append(LowStockService._event("low", item, available))
+            elif is_low:
+                if current.available_qty != available or current.min_item != item.min_item:
+                    db.execute(
+                        update(table).where(table.c.item_id == item_id)
+                        .values(available_qty=available, min_item=item.min_item, updated_at=now)
+                    )
+            elif current is not None:
+                db.execute(delete(table).where(table.c.item_id == item_id))
+                if item:
+                    events.append(LowStockService._event("recovered", item, available))
+        return events
+
+    @staticmethod
+    def _upsert(db: Session, item_id: int, available: int, min_item: int, now: datetime) -> None:
+        """Insert the low_stock_items row, or update it when another transaction inserted it first."""
+        table = LowStockItem.__table__
+        values = {"item_id": item_id, "available_qty": available, "min_item": min_item, "since": now, "updated_at": now}
+        changes = {"available_qty": available, "min_item": min_item, "updated_at": now}
+        dialect = db.get_bind().dialect.name
+
+        if dialect in ("mysql", "mariadb"):
+            db.execute(mysql_insert(table).values(**values).on_duplicate_key_update(**changes))
+        elif dialect in ("postgresql", "sqlite"):
+            insert_fn = pg_insert if dialect == "postgresql" else sqlite_insert
+            db.execute(insert_fn(table).values(**values).on_conflict_do_update(
+                index_elements=[table.c.item_id], set_=changes,
+            ))
+        else:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(table).values(**values))
+            except IntegrityError:
+                db.execute(update(table).where(table.c.item_id == item_id).values(**changes))
+
+    @staticmethod
+    def rebuild(db: Session) -> dict:
+        """Recompute the whole set with one grouped query (startup / CLI)."""
+        stock_sq = (
+            db.query(BatchStock.item_id.label("item_id"), func.sum(BatchStock.sisa_qty).label("qty"))
+            .filter(BatchStock.is_open == True, BatchStock.sisa_qty > 0)
+            .group_by(BatchStock.item_id)
+            .subquery()
+        )
+        available = func.coalesce(stock_sq.c.qty, 0)
+        rows = (
+            db.query(Item.id, Item.min_item, available)
+            .outerjoin(stock_sq, stock_sq.c.item_id == Item.id)
+            .filter(Item.is_deleted == False, Item.min_item > 0, available < Item.min_item)
+            .all()
+        )
+
+        try:
+            low = {item_id: (min_item, int(qty or 0)) for item_id, min_item, qty in rows}
+            existing = {row.item_id: row for row in db.query(LowStockItem)}
+            for item_id, row in existing.items():
+                if item_id not in low:
+                    db.delete(row)
+            for item_id, (min_item, qty) in low.items():
+                row = existing.get(item_id)
+                if row is None:
+                    db.add(LowStockItem(item_id=item_id, available_qty=qty, min_item=min_item))
+                else:
+                    row.available_qty, row.min_item = qty, min_item
+            db.info.pop(_DIRTY_KEY, None)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return {"low_stock": len(low)}
+
+    @staticmethod
+    def _event(kind: str, item, available: int) -> dict:
+        return {
+            "event": kind,
+            "item_id": item.id,
+            "code": item.code,
+            "name": item.name,
+            "available_qty": available,
+            "min_item": item.min_item,
+            "at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+
+def _stock_fields_changed(obj) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in _ITEM_TRIGGER_FIELDS)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_after_flush(session: Session, flush_context):
+    """Remember which items had their stock (batches) or threshold changed in this transaction."""
+    dirty: Set[int] = set()
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, BatchStock):
+            dirty.add(obj.item_id)
+        elif isinstance(obj, Item) and (obj in session.new or _stock_fields_changed(obj)):
+            dirty.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, BatchStock):
+            dirty.add(obj.item_id)
+    if dirty:
+        LowStockService.touch(session, dirty)
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_before_commit(session: Session):
+    # commit() flushes only after before_commit, so flush here to collect pending changes first
+    if session.new or session.dirty or session.deleted:
+        session.flush()
+    if not session.info.get(_DIRTY_KEY):
+        return
+    item_ids = session.info.pop(_DIRTY_KEY, set())
+    # bookkeeping only: whatever goes wrong here must not fail the sale / adjustment being
+    # committed. The savepoint undoes a partial refresh; the next change or startup rebuild resyncs.
+    try:
+        with session.begin_nested():
+            events = LowStockService.refresh(session, item_ids)
+    except SQLAlchemyError as e:
+        print(f"⚠️ low_stock_items refresh skipped for items {sorted(item_ids)}: {e}")
+        return
+    if events:
+        session.info.setdefault(_EVENTS_KEY, []).extend(events)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session):
+    events: Optional[List[dict]] = session.info.pop(_EVENTS_KEY, None)
+    if events:
+        broadcaster.publish(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session):
+    session.info.pop(_DIRTY_KEY, None)
+    session.info.pop(_EVENTS_KEY, None)
+
+
+if __name__ == "__main__":
+    # python -m services.low_stock_services
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild low_stock_items from open FIFO batches")
+    parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        print(json.dumps(LowStockService.rebuild(session), indent=2))
+    finally:
+        session.close()
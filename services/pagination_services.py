@@ -0,0 +1,195 @@
+import base64
+import binascii
+import enum
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, DateTime, String, and_, cast, false, literal, or_
+from sqlalchemy.orm import Query
+
+# (expression, descending). The last key must be unique (usually the primary key).
+SortKey = Tuple[Any, bool]
+
+
+class KeysetPage(NamedTuple):
+    rows: list
+    total: Optional[int]
+    next_cursor: Optional[str]
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"$n": str(value)}
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$d" in value:
+            return date.fromisoformat(value["$d"])
+        if "$n" in value:
+            return Decimal(value["$n"])
+    return value
+
+
+def _is_nullable(expr) -> bool:
+    # Mapped columns know their nullability; computed expressions are treated as NOT NULL
+    column = getattr(expr, "expression", expr)
+    return bool(getattr(column, "nullable", False))
+
+
+def _is_temporal(expr) -> bool:
+    return isinstance(getattr(expr, "type", None), (Date, DateTime))
+
+
+def _signature(sort: Sequence[SortKey]) -> str:
+    spec = "|".join(f"{expr}:{'d' if descending else 'a'}" for expr, descending in sort)
+    return hashlib.sha1(spec.encode("utf-8")).hexdigest()[:8]
+
+
+class PaginationService:
+    """
+    Keyset (cursor) pagination for list endpoints.
+
+    The cursor is an opaque token holding the sort key values of the last row
+    on the page, plus the total counted on the first page. The next page is
+    a range condition on those keys, so page 500 costs the same as page 1 and
+    doesn't re-run COUNT(*).
+    """
+
+    @staticmethod
+    def encode_cursor(sort: Sequence[SortKey], values: Sequence[Any], total: Optional[int]) -> str:
+        payload = {
+            "s": _signature(sort),
+            "k": [_encode_value(v) for v in values],
+            "t": total,
+        }
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(sort: Sequence[SortKey], cursor: str) -> Tuple[List[Any], Optional[int]]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(raw)
+            values = [_decode_value(v) for v in payload["k"]]
+            total = payload.get("t")
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise ValueError("Invalid cursor")
+
+        if payload.get("s") != _signature(sort) or len(values) != len(sort):
+            raise ValueError("Cursor does not match the current sort order")
+        return values, total
+
+    @staticmethod
+    def _order_by(sort: Sequence[SortKey]) -> list:
+        # NULLs always sort last, emulated with "IS NULL" so MySQL works too
+        clauses = []
+        for expr, descending in sort:
+            if _is_nullable(expr):
+                clauses.append(expr.is_(None))
+            clauses.append(expr.desc() if descending else expr.asc())
+        return clauses
+
+    @staticmethod
+    def _key_column(expr, raw_text: bool):
+        # SQLite keeps datetimes as text in whatever format wrote them (CURRENT_TIMESTAMP
+        # has no microseconds, Python values do) and orders them as text, so the cursor
+        # carries the stored text and compares against that.
+        return cast(expr, String) if raw_text and _is_temporal(expr) else expr
+
+    @staticmethod
+    def _after(sort: Sequence[SortKey], values: Sequence[Any], raw_text: bool = False):
+        """Rows strictly after `values` in `sort` order: k1 > v1 OR (k1 = v1 AND (k2 > v2 OR ...))."""
+        values = [
+            literal(value, String) if raw_text and value is not None and _is_temporal(expr) else value
+            for (expr, _), value in zip(sort, values)
+        ]
+        condition = None
+        for (expr, descending), value in reversed(list(zip(sort, values))):
+            nullable = _is_nullable(expr)
+            if value is None:
+                greater = false()
+                equal = expr.is_(None)
+            else:
+                greater = expr < value if descending else expr > value
+                if nullable:
+                    greater = or_(greater, expr.is_(None))
+                equal = expr == value
+
+            condition = greater if condition is None else or_(greater, and_(equal, condition))
+
+        # Leading bound on the first key lets the database range-scan its index
+        first_expr, first_desc = sort[0]
+        if values[0] is not None and not _is_nullable(first_expr):
+            bound = first_expr <= values[0] if first_desc else first_expr >= values[0]
+            condition = and_(bound, condition)
+        return condition
+
+    @staticmethod
+    def paginate(
+        query: Query,
+        sort: Sequence[SortKey],
+        limit: int,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        with_total: bool = True,
+        columns: Sequence[Any] = (),
+    ) -> KeysetPage:
+        """
+        Page through `query` ordered by `sort`.
+
+        - cursor given: keyset page after the cursor (offset is ignored);
+          total is the one carried in the cursor.
+        - no cursor: plain OFFSET page, so existing page / skip params keep working.
+        Either way next_cursor points at the page after this one (None on the last page).
+        with_total=False skips COUNT(*) entirely.
+
+        `columns` are extra expressions (e.g. correlated counts) selected for the
+        page rows only, not in COUNT(*); rows are then (entity, *columns) tuples.
+        """
+        raw_text = query.session.get_bind().dialect.name == "sqlite"
+
+        total = None
+        if cursor:
+            values, total = PaginationService.decode_cursor(sort, cursor)
+            if with_total and total is None:
+                total = query.count()
+            page_query = query.filter(PaginationService._after(sort, values, raw_text))
+        else:
+            if with_total:
+                total = query.count()
+            page_query = query
+
+        labels = [
+            PaginationService._key_column(expr, raw_text).label(f"_page_key_{i}")
+            for i, (expr, _) in enumerate(sort)
+        ]
+        page_query = (
+            page_query.order_by(None)
+            .order_by(*PaginationService._order_by(sort))
+            .add_columns(*columns, *labels)
+        )
+        if not cursor and offset:
+            page_query = page_query.offset(offset)
+        result = page_query.limit(limit + 1).all()
+
+        n_keys = len(labels)
+        rows = [row[0] if not columns else tuple(row[:-n_keys]) for row in result[:limit]]
+        next_cursor = None
+        if len(result) > limit:
+            last = result[limit - 1]
+            next_cursor = PaginationService.encode_cursor(sort, list(last[-n_keys:]), total if with_total else None)
+
+        return KeysetPage(rows, total if with_total else None, next_cursor)
@@ -0,0 +1,255 @@
+import argparse
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, case, func, insert, literal, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.BatchStock import FifoLog
+from models.Item import Item
+from models.ProfitDaily import ProfitDaily
+
+
+# columns apply_logs adds deltas to
+_SUMMED_COLUMNS = ("qty", "hpp", "revenue", "gross_profit")
+
+
+def _is_rollback(invoice_id: str) -> bool:
+    return invoice_id.endswith("-ROLLBACK")
+
+
+def _is_adjustment(invoice_id: str) -> bool:
+    return invoice_id.startswith("ADJ-")
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+class ProfitDailyService:
+    """Service untuk ringkasan laba rugi harian (tabel profit_daily)"""
+
+    @staticmethod
+    def apply_logs(db: Session, fifo_logs: Iterable[FifoLog]) -> None:
+        """
+        Tambahkan efek FifoLog baru ke profit_daily.
+        Dipanggil di path sale / rollback sebelum commit, jadi ikut transaksi yang sama.
+
+        Rollback log menyimpan qty positif dan nilai uang negatif,
+        jadi qty di-negasikan di sini supaya ringkasan berisi angka net.
+        """
+        deltas: Dict[Tuple[int, date, bool], List] = {}
+        for log in fifo_logs:
+            key = (log.item_id, _as_date(log.invoice_date), _is_adjustment(log.invoice_id))
+            delta = deltas.setdefault(key, [0, Decimal("0"), Decimal("0"), Decimal("0")])
+            qty = log.qty_terpakai or 0
+            delta[0] += -qty if _is_rollback(log.invoice_id) else qty
+            delta[1] += Decimal(log.total_hpp or 0)
+            delta[2] += Decimal(log.total_penjualan or 0)
+            delta[3] += Decimal(log.laba_kotor or 0)
+
+        # urutan tetap: dua transaksi dengan item yang sama mengunci baris dalam urutan yang sama
+        for (item_id, day, is_adjustment), (qty, hpp, revenue, gross_profit) in sorted(deltas.items()):
+            ProfitDailyService._add(db, {
+                "item_id": item_id,
+                "date": day,
+                "is_adjustment": is_adjustment,
+                "qty": qty,
+                "hpp": hpp,
+                "revenue": revenue,
+                "gross_profit": gross_profit,
+                "updated_at": datetime.utcnow(),
+            })
+
+    @staticmethod
+    def _add(db: Session, values: dict) -> None:
+        """
+        Tambahkan delta ke baris (item_id, date, is_adjustment) secara atomik.
+        Upsert per dialect, jadi dua penjualan pertama item yang sama di hari
+        yang sama tidak saling bentrok di uq_profit_daily_item_date_adj.
+        """
+        table = ProfitDaily.__table__
+        dialect = db.get_bind().dialect.name
+
+        if dialect in ("mysql", "mariadb"):
+            stmt = mysql_insert(table).values(**values)
+            db.execute(stmt.on_duplicate_key_update(
+                updated_at=stmt.inserted.updated_at,
+                **{name: table.c[name] + stmt.inserted[name] for name in _SUMMED_COLUMNS},
+            ))
+            return
+
+        if dialect in ("postgresql", "sqlite"):
+            insert_fn = pg_insert if dialect == "postgresql" else sqlite_insert
+            stmt = insert_fn(table).values(**values)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.item_id, table.c.date, table.c.is_adjustment],
+                set_={"updated_at": stmt.excluded.updated_at, **{name: table.c[name] + stmt.excluded[name] for name in _SUMMED_COLUMNS}},
+            ))
+            return
+
+        # lainnya: UPDATE dulu, INSERT di savepoint; kalah balapan -> ulangi UPDATE
+        key = and_(
+            table.c.item_id == values["item_id"],
+            table.c.date == values["date"],
+            table.c.is_adjustment == values["is_adjustment"],
+        )
+        sums = {name: table.c[name] + values[name] for name in _SUMMED_COLUMNS}
+        for _ in range(2):
+            if db.execute(update(table).where(key).values(updated_at=values["updated_at"], **sums)).rowcount:
+                return
+            try:
+                with db.begin_nested():
+                    db.execute(insert(table).values(**values))
+                return
+            except IntegrityError:
+                continue
+        raise ValueError(f"Could not update profit_daily for item {values['item_id']} on {values['date']}")
+
+    @staticmethod
+    def rebuild(
+        db: Session,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> dict:
+        """
+        Bangun ulang profit_daily dari fifo_log (seluruhnya, atau hanya rentang tanggal).
+        Satu DELETE + satu INSERT ... SELECT GROUP BY, tanpa load log ke Python.
+        """
+        log_filters = []
+        summary_filters = []
+        if start_date is not None:
+            log_filters.append(FifoLog.invoice_date >= start_date)
+            summary_filters.append(ProfitDaily.date >= start_date)
+        if end_date is not None:
+            log_filters.append(FifoLog.invoice_date <= end_date)
+            summary_filters.append(ProfitDaily.date <= end_date)
+
+        is_adjustment = case((FifoLog.invoice_id.like("ADJ-%"), literal(True)), else_=literal(False))
+        signed_qty = case(
+            (FifoLog.invoice_id.like("%-ROLLBACK"), -FifoLog.qty_terpakai),
+            else_=FifoLog.qty_terpakai,
+        )
+
+        aggregate = select(
+            FifoLog.item_id,
+            FifoLog.invoice_date,
+            is_adjustment,
+            func.coalesce(func.sum(signed_qty), 0),
+            func.coalesce(func.sum(FifoLog.total_hpp), 0),
+            func.coalesce(func.sum(FifoLog.total_penjualan), 0),
+            func.coalesce(func.sum(FifoLog.laba_kotor), 0),
+            func.now(),
+        ).group_by(FifoLog.item_id, FifoLog.invoice_date, is_adjustment)
+        if log_filters:
+            aggregate = aggregate.where(and_(*log_filters))
+
+        try:
+            deleted = db.query(ProfitDaily).filter(*summary_filters).delete(synchronize_session=False)
+            result = db.execute(
+                insert(ProfitDaily).from_select(
+                    [
+                        ProfitDaily.item_id,
+                        ProfitDaily.date,
+                        ProfitDaily.is_adjustment,
+                        ProfitDaily.qty,
+                        ProfitDaily.hpp,
+                        ProfitDaily.revenue,
+                        ProfitDaily.gross_profit,
+                        ProfitDaily.updated_at,
+                    ],
+                    aggregate,
+                )
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        return {
+            "start_date": start_date.isoformat() if start_date else None,
+            "end_date": end_date.isoformat() if end_date else None,
+            "rows_deleted": deleted,
+            "rows_inserted": result.rowcount,
+        }
+
+    @staticmethod
+    def ensure_built(db: Session) -> Optional[dict]:
+        """Rebuild sekali kalau profit_daily masih kosong tapi fifo_log sudah ada isinya."""
+        has_summary = db.query(ProfitDaily.id).first() is not None
+        has_logs = db.query(FifoLog.id).first() is not None
+        if has_summary or not has_logs:
+            return None
+        return ProfitDailyService.rebuild(db)
+
+    @staticmethod
+    def get_daily_rows(
+        db: Session,
+        start_date: date,
+        end_date: date,
+        item_id: Optional[int] = None,
+        include_adjustments: bool = False,
+    ) -> list:
+        """
+        Baris laba rugi per (tanggal, item) dari profit_daily, tanpa detail invoice.
+        Baris yang net-nya nol (penjualan yang sudah di-rollback penuh) dibuang.
+        """
+        query = (
+            db.query(
+                ProfitDaily.date.label("invoice_date"),
+                ProfitDaily.item_id,
+                Item.code.label("item_code"),
+                Item.name.label("item_name"),
+                func.sum(ProfitDaily.qty).label("qty_terjual"),
+                func.sum(ProfitDaily.hpp).label("total_hpp"),
+                func.sum(ProfitDaily.revenue).label("total_penjualan"),
+                func.sum(ProfitDaily.gross_profit).label("laba_kotor"),
+            )
+            .join(Item, Item.id == ProfitDaily.item_id)
+            .filter(
+                ProfitDaily.date >= start_date,
+                ProfitDaily.date <= end_date,
+            )
+        )
+
+        if not include_adjustments:
+            query = query.filter(ProfitDaily.is_adjustment.is_(False))
+
+        if item_id is not None:
+            query = query.filter(ProfitDaily.item_id == item_id)
+
+        rows = (
+            query.group_by(ProfitDaily.date, ProfitDaily.item_id, Item.code, Item.name)
+            .order_by(ProfitDaily.date.asc(), Item.code.asc())
+            .all()
+        )
+
+        return [
+            row for row in rows
+            if not (
+                (abs(float(row.total_hpp or 0)) < 0.01) and
+                (abs(float(row.total_penjualan or 0)) < 0.01)
+            )
+        ]
+
+
+if __name__ == "__main__":
+    # python -m services.profit_daily_services [--start 2025-01-01] [--end 2025-12-31]
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild profit_daily from fifo_log")
+    parser.add_argument("--start", type=date.fromisoformat, default=None)
+    parser.add_argument("--end", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        print(json.dumps(ProfitDailyService.rebuild(session, args.start, args.end), indent=2))
+    finally:
+        session.close()
@@ -0,0 +1,99 @@
+import argparse
+import json
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from models.mixin.RecordNumberMixin import split_record_number
+from models.Pembelian import Pembelian
+from models.Penjualan import Penjualan
+
+# model -> document number column
+RECORD_NUMBER_MODELS = {
+    Penjualan: "no_penjualan",
+    Pembelian: "no_pembelian",
+}
+RECORD_NUMBER_PART_COLUMNS = ("no_year", "no_month", "no_seq")
+BACKFILL_CHUNK_SIZE = 2000
+
+
+class RecordNumberService:
+    """Migration + backfill for the no_year / no_month / no_seq columns (RecordNumberMixin)"""
+
+    @staticmethod
+    def ensure_columns(engine: Engine) -> list:
+        """
+        create_all() doesn't add columns to existing tables, so add the part
+        columns and their index here. Idempotent; returns the tables changed.
+        """
+        changed = []
+        inspector = inspect(engine)
+        for model in RECORD_NUMBER_MODELS:
+            table = model.__table__
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            missing = [name for name in RECORD_NUMBER_PART_COLUMNS if name not in existing]
+            if not missing:
+                continue
+
+            with engine.begin() as conn:
+                for name in missing:
+                    conn.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0"
+                    ))
+                for index in table.indexes:
+                    if set(index.columns.keys()) & set(RECORD_NUMBER_PART_COLUMNS):
+                        index.create(conn, checkfirst=True)
+            changed.append(table.name)
+        return changed
+
+    @staticmethod
+    def backfill(db: Session) -> dict:
+        """Fill the part columns of rows that still have no_year = 0 but a number set."""
+        counts = {}
+        try:
+            for model, number_field in RECORD_NUMBER_MODELS.items():
+                number_col = getattr(model, number_field)
+                updated = 0
+                last_id = 0
+                while True:
+                    rows = (
+                        db.query(model.id, number_col)
+                        .filter(model.no_year == 0, model.id > last_id, number_col != "")
+                        .order_by(model.id)
+                        .limit(BACKFILL_CHUNK_SIZE)
+                        .all()
+                    )
+                    if not rows:
+                        break
+                    last_id = rows[-1][0]
+
+                    mappings = []
+                    for row_id, number in rows:
+                        year, month, seq = split_record_number(number)
+                        if seq:
+                            mappings.append({"id": row_id, "no_year": year, "no_month": month, "no_seq": seq})
+                    if mappings:
+                        db.bulk_update_mappings(model, mappings)
+                        updated += len(mappings)
+                    db.commit()
+                counts[model.__tablename__] = updated
+        except Exception:
+            db.rollback()
+            raise
+        return counts
+
+
+if __name__ == "__main__":
+    # python -m services.record_number_services
+    from database import SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="Add and backfill document number part columns")
+    parser.parse_args()
+
+    RecordNumberService.ensure_columns(engine)
+    session = SessionLocal()
+    try:
+        print(json.dumps(RecordNumberService.backfill(session), indent=2))
+    finally:
+        session.close()
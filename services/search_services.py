@@ -0,0 +1,400 @@
+import argparse
+import json
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import Integer, cast, column, delete, event, insert, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from models.Customer import Customer
+from models.Item import Item
+from models.Pembelian import Pembelian
+from models.Penjualan import Penjualan
+from models.SearchIndex import SearchIndex
+from models.Vendor import Vendor
+
+# entity type -> how to index it
+#   fields:   columns whose text is searched (substring)
+#   title:    display text, also prefix-matched by /search/suggest
+#   key:      code / number, also prefix-matched by /search/suggest
+#   subtitle: secondary display text
+SEARCH_ENTITIES = {
+    "item": {
+        "model": Item,
+        "fields": ("name", "sku", "code"),
+        "title": "name",
+        "key": "sku",
+        "subtitle": "code",
+    },
+    "customer": {
+        "model": Customer,
+        "fields": ("name", "code", "id"),
+        "title": "name",
+        "key": "code",
+        "subtitle": "code",
+    },
+    "vendor": {
+        "model": Vendor,
+        "fields": ("name", "id"),
+        "title": "name",
+        "key": "id",
+        "subtitle": "id",
+    },
+    "penjualan": {
+        "model": Penjualan,
+        "fields": ("no_penjualan",),
+        "title": "no_penjualan",
+        "key": "no_penjualan",
+        "subtitle": "customer_name",
+    },
+    "pembelian": {
+        "model": Pembelian,
+        "fields": ("no_pembelian",),
+        "title": "no_pembelian",
+        "key": "no_pembelian",
+        "subtitle": None,
+    },
+}
+
+_ENTITY_BY_MODEL = {config["model"]: name for name, config in SEARCH_ENTITIES.items()}
+
+# Trigram / ngram indexes can't answer terms shorter than this
+MIN_INDEXED_TERM = 3
+REBUILD_CHUNK_SIZE = 5000
+
+# Set by SearchService.ensure_backend(): fts5 | fulltext | trgm | like
+_backend = "like"
+
+
+def _norm(value) -> Optional[str]:
+    if value is None:
+        return None
+    return str(value).strip().lower()[:255]
+
+
+def _glob_escape(term: str) -> str:
+    return "".join(f"[{ch}]" if ch in "*?[" else ch for ch in term)
+
+
+class SearchService:
+    """Dialect-aware substring search + prefix autocomplete on the search_index table"""
+
+    @staticmethod
+    def backend() -> str:
+        return _backend
+
+    @staticmethod
+    def ensure_backend(engine: Engine) -> str:
+        """
+        Create the dialect specific index on search_index.content (idempotent).
+        Falls back to plain LIKE when the database can't provide one.
+        """
+        global _backend
+        dialect = engine.dialect.name
+
+        try:
+            with engine.begin() as conn:
+                if dialect == "sqlite":
+                    exists = conn.execute(text(
+                        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='search_index_fts'"
+                    )).first()
+                    conn.execute(text(
+                        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index_fts USING fts5("
+                        "content, content='search_index', content_rowid='id', tokenize='trigram')"
+                    ))
+                    conn.execute(text(
+                        "CREATE TRIGGER IF NOT EXISTS search_index_ai AFTER INSERT ON search_index BEGIN "
+                        "INSERT INTO search_index_fts(rowid, content) VALUES (new.id, new.content); END"
+                    ))
+                    conn.execute(text(
+                        "CREATE TRIGGER IF NOT EXISTS search_index_ad AFTER DELETE ON search_index BEGIN "
+                        "INSERT INTO search_index_fts(search_index_fts, rowid, content) "
+                        "VALUES ('delete', old.id, old.content); END"
+                    ))
+                    conn.execute(text(
+                        "CREATE TRIGGER IF NOT EXISTS search_index_au AFTER UPDATE ON search_index BEGIN "
+                        "INSERT INTO search_index_fts(search_index_fts, rowid, content) "
+                        "VALUES ('delete', old.id, old.content); "
+                        "INSERT INTO search_index_fts(rowid, content) VALUES (new.id, new.content); END"
+                    ))
+                    if not exists:
+                        conn.execute(text("INSERT INTO search_index_fts(search_index_fts) VALUES ('rebuild')"))
+                    _backend = "fts5"
+
+                elif dialect in ("mysql", "mariadb"):
+                    exists = conn.execute(text(
+                        "SELECT COUNT(*) FROM information_schema.statistics "
+                        "WHERE table_schema = DATABASE() AND table_name = 'search_index' "
+                        "AND index_name = 'ft_search_index_content'"
+                    )).scalar()
+                    if not exists:
+                        conn.execute(text(
+                            "ALTER TABLE search_index ADD FULLTEXT INDEX ft_search_index_content (content) WITH PARSER ngram"
+                        ))
+                    _backend = "fulltext"
+
+                elif dialect == "postgresql":
+                    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                    conn.execute(text(
+                        "CREATE INDEX IF NOT EXISTS ix_search_index_content_trgm "
+                        "ON search_index USING gin (content gin_trgm_ops)"
+                    ))
+                    _backend = "trgm"
+
+                else:
+                    _backend = "like"
+        except Exception as e:
+            print(f"⚠️ Search index backend unavailable on {dialect}, using LIKE: {e}")
+            _backend = "like"
+
+        return _backend
+
+    @staticmethod
+    def _row(entity_type: str, entity_id, values: Dict[str, object]) -> dict:
+        config = SEARCH_ENTITIES[entity_type]
+        title = values.get(config["title"])
+        key = values.get(config["key"])
+        subtitle = values.get(config["subtitle"]) if config["subtitle"] else None
+        content = " | ".join(
+            str(values.get(field)).strip().lower()
+            for field in config["fields"]
+            if values.get(field) is not None
+        )
+        return {
+            "entity_type": entity_type,
+            "entity_id": str(entity_id),
+            "title": str(title)[:255] if title is not None else None,
+            "subtitle": str(subtitle)[:255] if subtitle is not None else None,
+            "title_norm": _norm(title),
+            "key_norm": _norm(key),
+            "content": content,
+        }
+
+    @staticmethod
+    def write_rows(conn: Connection, entity_type: str, rows: List[dict], removed_ids: Iterable = ()) -> None:
+        """Replace the index rows of the given entities (delete + insert) on `conn`."""
+        ids = [r["entity_id"] for r in rows] + [str(i) for i in removed_ids]
+        for start in range(0, len(ids), 500):
+            conn.execute(
+                delete(SearchIndex.__table__).where(
+                    SearchIndex.entity_type == entity_type,
+                    SearchIndex.entity_id.in_(ids[start:start + 500]),
+                )
+            )
+        if rows:
+            conn.execute(insert(SearchIndex.__table__), rows)
+
+    @staticmethod
+    def index_mappings(db: Session, entity_type: str, mappings: List[dict]) -> None:
+        """
+        Index rows written with bulk_insert_mappings (which bypasses flush events).
+        Each mapping needs 'id' plus the entity's indexed fields.
+        """
+        rows = [SearchService._row(entity_type, m["id"], m) for m in mappings]
+        SearchService.write_rows(db.connection(), entity_type, rows)
+
+    @staticmethod
+    def matching_ids(entity_type: str, term: str):
+        """
+        SELECT of entity ids whose indexed text contains `term` (case-insensitive),
+        typed to match the entity's primary key. Use as `Model.id.in_(...)`.
+        """
+        term = term.strip().lower()
+        model = SEARCH_ENTITIES[entity_type]["model"]
+        pk_type = inspect(model).primary_key[0].type
+
+        entity_id = SearchIndex.entity_id
+        if isinstance(pk_type, Integer):
+            entity_id = cast(SearchIndex.entity_id, Integer)
+
+        stmt = select(entity_id).where(SearchIndex.entity_type == entity_type)
+
+        if len(term) < MIN_INDEXED_TERM or _backend == "like":
+            return stmt.where(SearchIndex.content.contains(term, autoescape=True))
+
+        if _backend == "fts5":
+            phrase = '"' + term.replace('"', '""') + '"'
+            fts_ids = text(
+                "SELECT rowid FROM search_index_fts WHERE search_index_fts MATCH :fts_phrase"
+            ).bindparams(fts_phrase=phrase).columns(column("rowid", Integer))
+            return stmt.where(SearchIndex.id.in_(fts_ids))
+
+        if _backend == "fulltext":
+            phrase = '"' + term.replace('"', ' ') + '"'
+            return stmt.where(
+                text("MATCH (search_index.content) AGAINST (:ft_phrase IN BOOLEAN MODE)").bindparams(ft_phrase=phrase)
+            )
+
+        # trgm: the gin_trgm_ops index serves LIKE '%term%'
+        return stmt.where(SearchIndex.content.contains(term, autoescape=True))
+
+    @staticmethod
+    def _prefix(col, term: str):
+        if _backend == "fts5":
+            # SQLite LIKE is case-insensitive and skips the BINARY index; GLOB uses it
+            return col.op("GLOB")(_glob_escape(term) + "*")
+        return col.startswith(term, autoescape=True)
+
+    @staticmethod
+    def suggest(db: Session, term: str, entity_types: Optional[List[str]] = None, limit: int = 10) -> List[dict]:
+        """Prefix autocomplete on title / key, served by (entity_type, *_norm) index range scans."""
+        term = term.strip().lower()
+        if not term:
+            return []
+        entity_types = entity_types or list(SEARCH_ENTITIES.keys())
+
+        results = []
+        seen = set()
+        for col in (SearchIndex.title_norm, SearchIndex.key_norm):
+            rows = (
+                db.query(SearchIndex.entity_type, SearchIndex.entity_id, SearchIndex.title, SearchIndex.subtitle)
+                .filter(SearchIndex.entity_type.in_(entity_types), SearchService._prefix(col, term))
+                .order_by(SearchIndex.entity_type, col)
+                .limit(limit)
+                .all()
+            )
+            for row in rows:
+                key = (row.entity_type, row.entity_id)
+                if key in seen:
+                    continue
+                seen.add(key)
+                results.append({
+                    "type": row.entity_type,
+                    "id": row.entity_id,
+                    "title": row.title,
+                    "subtitle": row.subtitle,
+                })
+
+        results.sort(key=lambda r: (not (r["title"] or "").lower().startswith(term), (r["title"] or "").lower()))
+        return results[:limit]
+
+    @staticmethod
+    def rebuild(db: Session, entity_types: Optional[List[str]] = None) -> dict:
+        """Recreate search_index from the source tables, streaming them in chunks."""
+        entity_types = entity_types or list(SEARCH_ENTITIES.keys())
+        unknown = [t for t in entity_types if t not in SEARCH_ENTITIES]
+        if unknown:
+            raise ValueError(f"Unknown entity type(s): {', '.join(unknown)}")
+
+        counts = {}
+        try:
+            conn = db.connection()
+            for entity_type in entity_types:
+                config = SEARCH_ENTITIES[entity_type]
+                model = config["model"]
+                names = {"id", config["title"], config["key"], *config["fields"]}
+                if config["subtitle"]:
+                    names.add(config["subtitle"])
+                cols = [getattr(model, name) for name in sorted(names)]
+
+                conn.execute(delete(SearchIndex.__table__).where(SearchIndex.entity_type == entity_type))
+
+                count = 0
+                stmt = select(*cols)
+                if hasattr(model, "is_deleted"):
+                    stmt = stmt.where(model.is_deleted == False)
+                result = conn.execute(stmt.execution_options(yield_per=REBUILD_CHUNK_SIZE))
+                for partition in result.mappings().partitions():
+                    rows = [SearchService._row(entity_type, r["id"], r) for r in partition]
+                    conn.execute(insert(SearchIndex.__table__), rows)
+                    count += len(rows)
+                counts[entity_type] = count
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        return {"backend": _backend, "indexed": counts}
+
+    @staticmethod
+    def purge_deleted(db: Session) -> dict:
+        """Drop index rows of soft-deleted entities (left behind by builds that still indexed them)."""
+        counts = {}
+        conn = db.connection()
+        for entity_type, config in SEARCH_ENTITIES.items():
+            model = config["model"]
+            if not hasattr(model, "is_deleted"):
+                continue
+            ids = [str(i) for (i,) in db.query(model.id).filter(model.is_deleted == True).all()]
+            if ids:
+                SearchService.write_rows(conn, entity_type, [], ids)
+            counts[entity_type] = len(ids)
+        db.commit()
+        return counts
+
+    @staticmethod
+    def ensure_built(db: Session) -> Optional[dict]:
+        """Rebuild once when search_index is empty but source tables already have rows."""
+        if db.query(SearchIndex.id).first() is not None:
+            return None
+        if not any(db.query(config["model"].id).first() is not None for config in SEARCH_ENTITIES.values()):
+            return None
+        return SearchService.rebuild(db)
+
+
+def _searchable_changed(obj, config) -> bool:
+    state = inspect(obj)
+    names = set(config["fields"]) | {config["title"], config["key"]}
+    if config["subtitle"]:
+        names.add(config["subtitle"])
+    # soft delete / restore: the row leaves / re-enters the index
+    if "is_deleted" in state.attrs:
+        names.add("is_deleted")
+    return any(state.attrs[name].history.has_changes() for name in names)
+
+
+@event.listens_for(Session, "after_flush")
+def _index_after_flush(session: Session, flush_context):
+    """
+    Keep search_index in step with ORM create / update / delete, inside the same
+    transaction. Soft-deleted rows are removed and re-indexed when restored.
+    """
+    upserts: Dict[str, Dict[str, dict]] = {}
+    removals: Dict[str, set] = {}
+
+    for obj in list(session.new) + list(session.dirty):
+        entity_type = _ENTITY_BY_MODEL.get(type(obj))
+        if entity_type is None:
+            continue
+        config = SEARCH_ENTITIES[entity_type]
+        if obj in session.dirty and not _searchable_changed(obj, config):
+            continue
+        if getattr(obj, "is_deleted", False):
+            removals.setdefault(entity_type, set()).add(str(obj.id))
+            continue
+        values = {name: getattr(obj, name, None) for name in
+                  set(config["fields"]) | {config["title"], config["key"], config["subtitle"]} if name}
+        upserts.setdefault(entity_type, {})[str(obj.id)] = SearchService._row(entity_type, obj.id, values)
+
+    for obj in session.deleted:
+        entity_type = _ENTITY_BY_MODEL.get(type(obj))
+        if entity_type is not None:
+            removals.setdefault(entity_type, set()).add(str(obj.id))
+
+    if not upserts and not removals:
+        return
+
+    conn = session.connection()
+    for entity_type in set(upserts) | set(removals):
+        SearchService.write_rows(
+            conn,
+            entity_type,
+            list(upserts.get(entity_type, {}).values()),
+            removals.get(entity_type, ()),
+        )
+
+
+if __name__ == "__main__":
+    # python -m services.search_services [--types item customer]
+    from database import SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="Rebuild the search index")
+    parser.add_argument("--types", nargs="*", default=None, choices=list(SEARCH_ENTITIES.keys()))
+    args = parser.parse_args()
+
+    SearchService.ensure_backend(engine)
+    session = SessionLocal()
+    try:
+        print(json.dumps(SearchService.rebuild(session, args.types), indent=2))
+    finally:
+        session.close()
@@ -0,0 +1,176 @@
+"""
+Mixed read / write load against a scratch SQLite file, once per SQLite setup:
+
+    python -m services.sqlite_benchmark [--readers 8] [--writers 4] [--seconds 10]
+
+Each profile runs in its own interpreter (database.py builds its engine at
+import time from the environment), using the same engine, pool and session
+setup as the app. Writers mimic a finalize: insert the lines, then update the
+stock rows, with some Python work in between while the transaction is open.
+Readers run the kind of aggregate queries the list / report pages do.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# name -> env overrides for database.py
+PROFILES = {
+    "defaults": {"DB_SQLITE_PROFILE": "off", "DB_SQLITE_WRITE_QUEUE": "false"},
+    "pragmas": {"DB_SQLITE_PROFILE": "production", "DB_SQLITE_WRITE_QUEUE": "false"},
+    "pragmas+write_queue": {"DB_SQLITE_PROFILE": "production", "DB_SQLITE_WRITE_QUEUE": "true"},
+}
+
+ITEMS = 200
+LINES_PER_WRITE = 5
+
+
+def _percentile(samples, p):
+    return round(samples[min(len(samples) - 1, int(len(samples) * p))], 2) if samples else 0.0
+
+
+def _setup(session_factory):
+    from sqlalchemy import text
+
+    db = session_factory()
+    try:
+        db.execute(text("CREATE TABLE IF NOT EXISTS bench_stock (item_id INTEGER PRIMARY KEY, qty INTEGER NOT NULL)"))
+        db.execute(text(
+            "CREATE TABLE IF NOT EXISTS bench_lines (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "item_id INTEGER NOT NULL, qty INTEGER NOT NULL, price NUMERIC NOT NULL)"
+        ))
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_bench_lines_item ON bench_lines (item_id)"))
+        db.execute(text("INSERT INTO bench_stock (item_id, qty) VALUES (:id, 1000000)"), [{"id": i} for i in range(ITEMS)])
+        db.commit()
+    finally:
+        db.close()
+
+
+def _write(db, rng):
+    from sqlalchemy import text
+
+    items = rng.sample(range(ITEMS), LINES_PER_WRITE)
+    db.execute(
+        text("INSERT INTO bench_lines (item_id, qty, price) VALUES (:item_id, :qty, :price)"),
+        [{"item_id": i, "qty": rng.randint(1, 5), "price": rng.randint(1000, 90000)} for i in items],
+    )
+    # totals / FIFO bookkeeping between the statements
+    time.sleep(0.002)
+    for item_id in items:
+        db.execute(text("UPDATE bench_stock SET qty = qty - 1 WHERE item_id = :id"), {"id": item_id})
+    db.commit()
+
+
+def _read(db, rng):
+    from sqlalchemy import text
+
+    db.execute(
+        text("SELECT COUNT(*), SUM(qty * price) FROM bench_lines WHERE item_id = :id"),
+        {"id": rng.randrange(ITEMS)},
+    ).one()
+    db.execute(text(
+        "SELECT s.item_id, s.qty, COUNT(l.id) FROM bench_stock s "
+        "LEFT JOIN bench_lines l ON l.item_id = s.item_id "
+        "GROUP BY s.item_id ORDER BY s.qty LIMIT 20"
+    )).all()
+    db.rollback()
+
+
+def run_profile(readers: int, writers: int, seconds: float) -> dict:
+    """Runs in the child interpreter; DATABASE_URL and the profile are already in the environment."""
+    from database import SessionLocal, pool_status
+
+    _setup(SessionLocal)
+    results = {"read": {"ok": 0, "errors": 0, "latencies": []}, "write": {"ok": 0, "errors": 0, "latencies": []}}
+    errors = {}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+
+    def worker(kind: str, seed: int):
+        rng = random.Random(seed)
+        operation = _write if kind == "write" else _read
+        while time.perf_counter() < stop_at:
+            db = SessionLocal()
+            start = time.perf_counter()
+            try:
+                operation(db, rng)
+                ok = True
+            except Exception as e:
+                db.rollback()
+                ok = False
+                message = str(getattr(e, "orig", e)).splitlines()[0]
+            finally:
+                db.close()
+            latency = (time.perf_counter() - start) * 1000
+            with lock:
+                bucket = results[kind]
+                if ok:
+                    bucket["ok"] += 1
+                    bucket["latencies"].append(latency)
+                else:
+                    bucket["errors"] += 1
+                    errors[message] = errors.get(message, 0) + 1
+
+    threads = [threading.Thread(target=worker, args=("read", i)) for i in range(readers)]
+    threads += [threading.Thread(target=worker, args=("write", 1000 + i)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    report = {}
+    for kind, bucket in results.items():
+        latencies = sorted(bucket["latencies"])
+        report[kind] = {
+            "ops_per_sec": round(bucket["ok"] / seconds, 1),
+            "ok": bucket["ok"],
+            "errors": bucket["errors"],
+            "p50_ms": _percentile(latencies, 0.50),
+            "p95_ms": _percentile(latencies, 0.95),
+            "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        }
+    report["error_messages"] = errors
+    report["sqlite_writer"] = pool_status().get("sqlite_writer")
+    return report
+
+
+def benchmark(readers: int, writers: int, seconds: float, profiles=None) -> dict:
+    """Run every profile on a fresh database file, each in a child interpreter."""
+    reports = {}
+    with tempfile.TemporaryDirectory(prefix="sqlite-bench-") as directory:
+        for name in profiles or PROFILES:
+            env = dict(os.environ, **PROFILES[name])
+            env["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, name.replace('+', '_'))}.db"
+            # one connection per thread, so pool waits don't show up as database waits
+            env.setdefault("DB_POOL_SIZE", str(readers + writers))
+            completed = subprocess.run(
+                [sys.executable, "-m", "services.sqlite_benchmark", "--child",
+                 "--readers", str(readers), "--writers", str(writers), "--seconds", str(seconds)],
+                env=env, capture_output=True, text=True,
+            )
+            if completed.returncode != 0:
+                reports[name] = {"failed": completed.stderr.strip().splitlines()[-1:]}
+                continue
+            # database.py prints its banner on import; the report is the last line
+            reports[name] = json.loads(completed.stdout.strip().splitlines()[-1])
+    return reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite throughput under mixed read / write load")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--profile", action="append", choices=list(PROFILES), help="default: all")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_profile(args.readers, args.writers, args.seconds)))
+    else:
+        print(json.dumps(benchmark(args.readers, args.writers, args.seconds, args.profile), indent=2))
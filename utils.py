@@ -7,7 +7,7 @@ from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from typing import Union, Any, Optional, Type
-from sqlalchemy import and_, desc, func, Integer, text
+from sqlalchemy import desc, func, text
 from sqlalchemy.orm import Session
 import jwt
 
@@ -104,10 +104,7 @@ def soft_delete_record(session: Session, model_class, record_id):
     else:
         raise ValueError(f"{model_class.__name__} does not support soft delete")
     session.commit()
-import time
-import random
 from datetime import datetime
-from sqlalchemy import and_
 from sqlalchemy.orm import Session
 
 # def generate_incremental_id(
@@ -158,214 +155,59 @@ def file_to_data_url(path: str) -> str:
 def generate_incremental_id(
                 db: Session, model, id_field="code", prefix="CUS-", padding=5
         ) -> str:
-    col = getattr(model, id_field)
+    """Next code PREFIX00001 from the per-prefix counter (code_sequences)."""
+    from services.code_sequence_services import CodeSequenceService
+
+    return CodeSequenceService.next_codes(db, prefix, 1, getattr(model, id_field), padding)[0]
+
+def _record_number_field(model_class):
+    """Column holding the PREFIX/NNNN/MM/YYYY number of a document model."""
+    for name in ('no_pembelian', 'no_penjualan', 'no_pembayaran', 'no_pengembalian', 'record_number', 'no_adjustment'):
+        if hasattr(model_class, name):
+            return getattr(model_class, name)
+    raise Exception(f"Model {model_class.__name__} does not have a recognized record number field")
+
+
+def _max_record_sequence(db: Session, model_class, record_number_field, prefix: str, year: int, month: int) -> int:
+    """Highest sequence already used for prefix in month/year (seeds document_sequences once per month)."""
+    pattern = f"{prefix}/%/{month:02d}/{year}"
+    if hasattr(model_class, 'no_seq'):
+        # Penjualan / Pembelian keep the parts in indexed columns (RecordNumberMixin)
+        return db.query(func.coalesce(func.max(model_class.no_seq), 0)).filter(
+            model_class.no_year == year,
+            model_class.no_month == month,
+            record_number_field.like(pattern),
+        ).scalar()
 
-    # MAX on the numeric tail after the prefix
-    max_num = db.query(
-        func.coalesce(
-            func.max(
-                func.cast(func.substring(col, len(prefix)+1), Integer)
-            ),
-            0
-        )
-    ).filter(col.like(f"{prefix}%")).scalar()
+    max_seq = 0
+    for (record_number,) in db.query(record_number_field).filter(record_number_field.like(pattern)):
+        # The prefix itself contains "/", so count from the end
+        parts = (record_number or "").split('/')
+        if len(parts) >= 4 and parts[-3].isdigit():
+            max_seq = max(max_seq, int(parts[-3]))
+    return max_seq
 
-    n = max_num + 1
-    return f"{prefix}{n:0{padding}d}"
 
 def generate_unique_record_number(
         db: Session,
         model_class,
-        prefix: str = "QP/SI",
-        max_retries: int = 5
+        prefix: str = "QP/SI"
 ) -> str:
-    """Generate unique record number for any model with soft delete support.
+    """Generate the next record number PREFIX/NoUrut/MM/YYYY (sequence resets every month).
 
-    Format: PREFIX/NoUrut/MM/YYYY
-    Sequence resets every month.
-    
-    Args:
-        db: Database session
-        model_class: The model class to check against
-        prefix: Prefix for the record number
-        max_retries: Maximum number of retries if collision occurs
-    
-    Returns:
-        Unique record number string
-        
-    Raises:
-        Exception: If unable to generate unique number after max_retries
+    Backed by document_sequences: one atomic increment per call instead of
+    scanning this month's numbers. The counter row stays locked until the
+    caller commits or rolls back, so call it inside the create transaction.
     """
-    
-    today = datetime.now()
-    bulan = today.strftime("%m")
-    tahun = today.strftime("%Y")
-    
-    start_of_month = datetime(today.year, today.month, 1)
-    if today.month == 12:
-        start_of_next_month = datetime(today.year + 1, 1, 1)
-    else:
-        start_of_next_month = datetime(today.year, today.month + 1, 1)
-    
-    # Determine which field contains the record number
-    record_number_field = None
-    if hasattr(model_class, 'no_pembelian'):
-        record_number_field = model_class.no_pembelian
-    elif hasattr(model_class, 'no_penjualan'):
-        record_number_field = model_class.no_penjualan
-    elif hasattr(model_class, 'no_pembayaran'):
-        record_number_field = model_class.no_pembayaran
-    elif hasattr(model_class, 'no_pengembalian'):
-        record_number_field = model_class.no_pengembalian
-    elif hasattr(model_class, 'record_number'):
-        record_number_field = model_class.record_number
-    
-    if record_number_field is None:
-        raise Exception(f"Model {model_class.__name__} does not have a recognized record number field")
-    
-    prefix_part = prefix.split('/')[0]  # Get first part of prefix for comparison
-    pattern = f"{prefix}/%/{bulan}/{tahun}"
-    
-    for attempt in range(max_retries):
-        try:
-            # Get all existing record numbers for this month/year pattern
-            # We'll be more flexible with the date filter to catch edge cases
-            existing_numbers_query = (
-                db.query(record_number_field)
-                .filter(
-                    record_number_field.like(pattern)
-                )
-            )
-            
-            existing_numbers = existing_numbers_query.all()
-            
-            # Extract sequence numbers from existing records
-            max_seq = 0
-            for (record_number,) in existing_numbers:  # Note: query returns tuples
-                if record_number:
-                    try:
-                        parts = record_number.split('/')
-                        # Check if it matches our pattern: PREFIX/NoUrut/MM/YYYY
-                        if (len(parts) >= 4 and 
-                            parts[0] == prefix_part and 
-                            parts[2] == bulan and 
-                            parts[3] == tahun):
-                            seq_num = int(parts[1])
-                            max_seq = max(max_seq, seq_num)
-                    except (ValueError, IndexError, TypeError):
-                        continue
-            
-            # Generate next sequence number
-            nomor_urut = max_seq + 1
-            record_number = f"{prefix}/{nomor_urut:04d}/{bulan}/{tahun}"
-            
-            # Double-check that this exact record number doesn't exist
-            existing_check = db.query(model_class).filter(
-                record_number_field == record_number
-            ).first()
-            
-            if not existing_check:
-                return record_number
-            else:
-                # If it exists, continue to next iteration to try max_seq + 2, etc.
-                print(f"Attempt {attempt + 1}: Record number {record_number} already exists, retrying...")
-                continue
-                
-        except Exception as e:
-            print(f"Attempt {attempt + 1} failed with error: {str(e)}")
-            if attempt == max_retries - 1:
-                # For debugging, let's provide more info
-                try:
-                    total_records = db.query(model_class).count()
-                    records_this_month = db.query(model_class).filter(
-                        and_(
-                            model_class.created_at >= start_of_month,
-                            model_class.created_at < start_of_next_month
-                        )
-                    ).count()
-                    
-                    raise Exception(
-                        f"Failed to generate unique record number after {max_retries} attempts. "
-                        f"Last error: {str(e)}. "
-                        f"Total records: {total_records}, "
-                        f"Records this month: {records_this_month}, "
-                        f"Pattern: {pattern}, "
-                        f"Field: {record_number_field.name if record_number_field else 'None'}"
-                    )
-                except:
-                    raise Exception(f"Failed to generate unique record number after {max_retries} attempts: {str(e)}")
-            
-            # Add small random delay to reduce collision probability
-            time.sleep(0.01 + random.uniform(0, 0.05))
-    
-    raise Exception(f"Failed to generate unique record number after {max_retries} attempts")
-
+    from services.document_sequence_services import DocumentSequenceService
 
-def generate_unique_record_number(
-        db: Session,
-        model_class,
-        prefix: str = "QP/SI"
-) -> str:
-    """Generate unique record number by incrementing until we find one that doesn't exist."""
-    
     today = datetime.now()
-    bulan = today.strftime("%m")
-    tahun = today.strftime("%Y")
-    
-    # Determine which field contains the record number
-    record_number_field = None
-    if hasattr(model_class, 'no_pembelian'):
-        record_number_field = model_class.no_pembelian
-    elif hasattr(model_class, 'no_penjualan'):
-        record_number_field = model_class.no_penjualan
-    elif hasattr(model_class, 'no_pembayaran'):
-        record_number_field = model_class.no_pembayaran
-    elif hasattr(model_class, 'no_pengembalian'):
-        record_number_field = model_class.no_pengembalian
-    elif hasattr(model_class, 'record_number'):
-        record_number_field = model_class.record_number
-    elif hasattr(model_class, 'no_adjustment'):
-        record_number_field = model_class.no_adjustment
-    
-    if record_number_field is None:
-        raise Exception(f"Model {model_class.__name__} does not have a recognized record number field")
-    
-    max_seq = 0
-    pattern = f"{prefix}/%/{bulan}/{tahun}"
-    existing_numbers = db.query(record_number_field).filter(
-        record_number_field.like(pattern)
-    ).all()
-
-    for (record_number,) in existing_numbers:
-        if record_number:
-            try:
-                parts = record_number.split('/')
-                if len(parts) >= 4 and parts[2] == bulan and parts[3] == tahun:
-                    seq_num = int(parts[1])
-                    max_seq = max(max_seq, seq_num)
-            except:
-                continue
-
-    # Start checking from max+1
-    nomor_urut = max_seq + 1
-    while True:
-        record_number = f"{prefix}/{nomor_urut:04d}/{bulan}/{tahun}"
-        
-        # Check if this exact record number exists in the database
-        existing = db.query(model_class).filter(
-            record_number_field == record_number
-        ).first()
-        
-        if not existing:
-            return record_number
-        
-        nomor_urut += 1
-        
-        # Safety check to prevent infinite loop
-        if nomor_urut > 9999:
-            raise Exception(f"Could not generate unique record number - exceeded limit of 9999")
-    
-    return record_number
+    record_number_field = _record_number_field(model_class)
+    nomor_urut = DocumentSequenceService.next_value(
+        db, prefix, today.year, today.month,
+        seed=lambda: _max_record_sequence(db, model_class, record_number_field, prefix, today.year, today.month),
+    )
+    return DocumentSequenceService.format_number(prefix, nomor_urut, today.year, today.month)
 
 def get_record_number_field_name(model_class):
     """Helper function to get the record number field name for a given model."""
@@ -391,13 +233,32 @@ def generate_unique_record_code(
 ) -> str:
     """Generate unique record number for any model  column.
 
-    Format: PREFIX-00001
+    Format: PREFIX-00001, numbered per prefix (code_sequences)
  
     """
-    counter =  db.query(model_class).count()
+    return generate_unique_record_codes(db, model_class, [prefix])[0]
+
 
-    nomor_urut = counter + 1
-    return f"{prefix}-{nomor_urut:05d}"
+def generate_unique_record_codes(
+        db: Session,
+        model_class,
+        prefixes: list
+) -> list:
+    """Bulk version of generate_unique_record_code.
+
+    One counter reservation per distinct prefix for the whole batch, then one code per
+    entry in `prefixes` (in order).
+    """
+    from services.code_sequence_services import CodeSequenceService
+
+    wanted = {}
+    for prefix in prefixes:
+        wanted[prefix] = wanted.get(prefix, 0) + 1
+    codes = {
+        prefix: iter(CodeSequenceService.next_codes(db, f"{prefix}-", count, model_class.code))
+        for prefix, count in wanted.items()
+    }
+    return [next(codes[prefix]) for prefix in prefixes]
 
 
 class AuditQueryHelper: